@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cache persistant des adaptations
+Évite de repayer gpt-4o pour un texte déjà adapté avec le même prompt et le même modèle
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from config import config
+
+
+def cache_key(*parts: str) -> str:
+    """Empreinte SHA-256 d'une liste de composants (texte, version de prompt, modèle...)"""
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def completion_cost(usage: Optional[Dict[str, int]]) -> float:
+    """Coût en dollars d'un appel de chat d'après son usage de tokens"""
+    if not usage:
+        return 0.0
+    return (usage.get('prompt_tokens', 0) * config.CHAT_INPUT_COST_PER_1M
+            + usage.get('completion_tokens', 0) * config.CHAT_OUTPUT_COST_PER_1M) / 1_000_000
+
+
+class AdaptationCache:
+    """
+    Cache SQLite des réponses d'adaptation, indexé par empreinte de contenu.
+
+    La clé est calculée par l'appelant à partir de tout ce qui détermine la
+    réponse : texte à adapter, version des prompts, modèle et exemple réel
+    utilisé. Une même section présente dans plusieurs cours (ou dans deux
+    éditions d'un même cours) n'est donc adaptée qu'une fois.
+
+    Le cache est partagé entre threads ; chaque accès est protégé par un verrou.
+    """
+    def __init__(self, path: str = None):
+        self.path = path or config.ADAPTATION_CACHE_PATH
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS adaptations (
+                key TEXT PRIMARY KEY,
+                answer TEXT NOT NULL,
+                sources TEXT NOT NULL,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                model TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.dollars_saved = 0.0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Retourner la réponse en cache (marquée 'cached') ou None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, sources, prompt_tokens, completion_tokens FROM adaptations WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE adaptations SET hits = hits + 1 WHERE key = ?", (key,))
+            self._conn.commit()
+            usage = {'prompt_tokens': row[2], 'completion_tokens': row[3]}
+            self.hits += 1
+            self.dollars_saved += completion_cost(usage)
+
+        return {'answer': row[0], 'sources': json.loads(row[1]), 'usage': usage, 'cached': True}
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """Enregistrer une réponse réussie"""
+        if response.get('error'):
+            return
+        usage = response.get('usage') or {}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO adaptations "
+                "(key, answer, sources, prompt_tokens, completion_tokens, model, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response['answer'], json.dumps(response.get('sources', []), ensure_ascii=False),
+                 usage.get('prompt_tokens', 0), usage.get('completion_tokens', 0),
+                 config.CHAT_MODEL, datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'dollars_saved': round(self.dollars_saved, 4)
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
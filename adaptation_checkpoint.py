@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Points de reprise pour l'adaptation de cours
+Chaque étape terminée est enregistrée sur disque pour pouvoir reprendre un traitement interrompu
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def file_hash(path: str) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class AdaptationCheckpoint:
+    """
+    Point de reprise d'un cours : une réponse enregistrée par étape terminée.
+
+    Le fichier est associé à l'empreinte du PDF et à la version des prompts :
+    si l'un des deux change, le point de reprise est ignoré et recommencé.
+    Chaque enregistrement réécrit le fichier de façon atomique (fichier
+    temporaire puis os.replace), donc un arrêt brutal ne le corrompt jamais.
+    """
+    def __init__(self, path: str, course_hash: str, prompt_version: str):
+        self.path = path
+        self.course_hash = course_hash
+        self.prompt_version = prompt_version
+        self._lock = threading.Lock()
+        self.data: Dict[str, Any] = {
+            "course_hash": course_hash,
+            "prompt_version": prompt_version,
+            "completed": False,
+            "steps": {}
+        }
+
+    @classmethod
+    def for_course(cls, pdf_path: str, checkpoint_dir: str, prompt_version: str,
+                   resume: bool = True) -> "AdaptationCheckpoint":
+        """Ouvrir (ou créer) le point de reprise d'un cours
+
+        Sans resume, un point de reprise existant est ignoré et sera écrasé.
+        """
+        os.makedirs(checkpoint_dir, exist_ok=True)
+        path = os.path.join(checkpoint_dir, f"{Path(pdf_path).stem}.checkpoint.json")
+        checkpoint = cls(path, file_hash(pdf_path), prompt_version)
+
+        if resume and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if (saved.get("course_hash") == checkpoint.course_hash
+                        and saved.get("prompt_version") == prompt_version):
+                    checkpoint.data = saved
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Point de reprise illisible, recommencé : {path} ({e})")
+
+        return checkpoint
+
+    @property
+    def completed(self) -> bool:
+        return self.data.get("completed", False)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.data["steps"]
+
+    def __len__(self) -> int:
+        return len(self.data["steps"])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.data["steps"].get(key)
+
+    def record(self, key: str, response: Dict[str, Any]) -> None:
+        """Enregistrer la réponse d'une étape dès qu'elle est terminée"""
+        with self._lock:
+            self.data["steps"][key] = {
+                "answer": response["answer"],
+                "sources": response.get("sources", [])
+            }
+            self._write()
+
+    def mark_completed(self) -> None:
+        """Marquer le cours comme entièrement adapté et sauvegardé"""
+        with self._lock:
+            self.data["completed"] = True
+            self._write()
+
+    def _write(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Écriture progressive des adaptations de cours
+Chaque élément adapté est ajouté aux fichiers de sortie dès qu'il est terminé
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict
+
+from profiling import span
+
+# Titre et champ du texte adapté pour chaque type d'élément
+ITEM_HEADINGS = {
+    "introduction": ("📚 Introduction", "adapted_introduction"),
+    "section": ("📖 {adapted_title}", "adapted_content"),
+    "exercise": ("🎯 Exercice", "adapted_exercise"),
+    "instruction": ("📝 Consigne", "adapted_instruction"),
+    "formatting": ("🎨 Guide de Présentation", "guide"),
+    "assessment": ("📊 Exemple d'Évaluation Adaptée", "example_assessment"),
+}
+
+
+class ProgressiveWriter:
+    """
+    Sortie partielle d'un cours, complétée au fil de l'adaptation.
+
+    - markdown / texte : chaque élément terminé est ajouté à la fin du fichier
+      de sortie, dans l'ordre d'arrivée, sous un bandeau « adaptation en cours » ;
+    - json : un fichier JSON Lines (.jsonl) reçoit une ligne par élément, donc
+      le document est valide à tout moment et peut être lu en flux.
+
+    La passe finale (CourseAdapter.save_adaptations) réécrit ensuite le
+    markdown ou le texte dans l'ordre du cours, avec le sommaire et les
+    métadonnées ; finalize() ajoute la ligne de bilan au fichier JSON Lines.
+    """
+    def __init__(self, output_dir: str, filename: str, course_title: str, output_format: str = "markdown"):
+        self.course_title = course_title
+        self.output_format = output_format
+        extension = {"markdown": "md", "json": "jsonl"}.get(output_format, "txt")
+        self.path = os.path.join(output_dir, f"{filename}.{extension}")
+        self.items_written = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Créer (ou vider) le fichier partiel et écrire l'en-tête"""
+        started_at = datetime.now()
+        with open(self.path, 'w', encoding='utf-8') as f:
+            if self.output_format == "markdown":
+                f.write(f"# {self.course_title} - Version Adaptée aux Dyslexiques\n\n")
+                f.write(f"> ⏳ Adaptation en cours (commencée le {started_at.strftime('%d/%m/%Y à %H:%M')}). "
+                        f"Les parties apparaissent au fur et à mesure ; l'ordre définitif et le sommaire "
+                        f"seront rétablis à la fin.\n\n---\n\n")
+            elif self.output_format == "json":
+                self._write_record(f, {"type": "header", "course_title": self.course_title,
+                                       "started_at": started_at.isoformat()})
+            else:
+                f.write(f"COURS ADAPTÉ POUR DYSLEXIQUES : {self.course_title}\n")
+                f.write("=" * 60 + "\n\n")
+                f.write("(adaptation en cours...)\n\n")
+
+    def add(self, key: str, kind: str, entry: Dict[str, Any]) -> None:
+        """Ajouter un élément adapté dès qu'il est terminé"""
+        with span("write_output"), self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            if self.output_format == "json":
+                self._write_record(f, {"type": "item", "key": key, "kind": kind, **entry})
+            else:
+                heading, field = ITEM_HEADINGS[kind]
+                title = heading.format(**entry)
+                if self.output_format == "markdown":
+                    f.write(f"## {title}\n\n{entry[field]}\n\n---\n\n")
+                else:
+                    f.write(f"{title.upper()}\n{'-' * 25}\n{entry[field]}\n\n")
+            self.items_written += 1
+
+    def finalize(self, adaptations: Dict[str, Any]) -> None:
+        """Clore le fichier JSON Lines par une ligne de bilan (sans effet pour les autres formats)"""
+        if self.output_format != "json":
+            return
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            self._write_record(f, {
+                "type": "summary",
+                "course_title": adaptations["course_title"],
+                "items": self.items_written,
+                "failed_steps": adaptations.get("failed_steps", []),
+                "generation_seconds": adaptations.get("generation_seconds"),
+                "generated_at": datetime.now().isoformat()
+            })
+
+    @staticmethod
+    def _write_record(f, record: Dict[str, Any]) -> None:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Rendre la ligne visible immédiatement aux lecteurs du fichier
+        f.flush()
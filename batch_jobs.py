@@ -0,0 +1,146 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+EMBEDDINGS_URL = "/v1/embeddings"
+
+
+class BatchJob:
+    """
+    Offline batch job stored in a directory.
+
+    A job has two files:
+    - requests.jsonl: one request per line in the provider batch input format
+      ({"custom_id", "method", "url", "body"}), ready to be submitted as is;
+    - manifest.json: everything needed to turn the results back into outputs
+      (which course, step or chunks each custom_id belongs to).
+
+    Submitting requests.jsonl and downloading the results file are done
+    separately (provider dashboard or API). The results are then ingested by
+    the component that prepared the job (CourseAdapter or VectorStore).
+
+    Note:
+        Providers cap the size of one batch file (50,000 requests / 200 MB for
+        OpenAI); very large corpora should be split into several jobs.
+
+    Attributes:
+        job_dir: Directory holding the job files
+        manifest: Job type, creation date and per-request context
+    """
+    def __init__(self, job_dir: str, manifest: Dict[str, Any]) -> None:
+        self.job_dir = job_dir
+        self.requests_path = os.path.join(job_dir, "requests.jsonl")
+        self.manifest_path = os.path.join(job_dir, "manifest.json")
+        self.manifest = manifest
+        self._requests_file = None
+
+    @classmethod
+    def create(cls, job_dir: str, job_type: str, **fields: Any) -> "BatchJob":
+        """Start a new job, overwriting any previous job in the same directory"""
+        os.makedirs(job_dir, exist_ok=True)
+        job = cls(job_dir, {
+            "type": job_type,
+            "created_at": datetime.now().isoformat(),
+            **fields,
+            "requests": {}
+        })
+        job._requests_file = open(job.requests_path, 'w', encoding='utf-8')
+        return job
+
+    @classmethod
+    def open(cls, job_dir: str, job_type: str) -> "BatchJob":
+        """Load a prepared job to ingest its results"""
+        with open(os.path.join(job_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("type") != job_type:
+            raise ValueError(f"{job_dir} is a '{manifest.get('type')}' job, expected '{job_type}'")
+        return cls(job_dir, manifest)
+
+    def __len__(self) -> int:
+        return len(self.manifest["requests"])
+
+    def add_request(self, custom_id: str, url: str, body: Dict[str, Any], **context: Any) -> None:
+        """Append one request; context is kept in the manifest under its custom_id"""
+        if custom_id in self.manifest["requests"]:
+            raise ValueError(f"Duplicate custom_id in batch job: {custom_id}")
+        line = {"custom_id": custom_id, "method": "POST", "url": url, "body": body}
+        self._requests_file.write(json.dumps(line, ensure_ascii=False) + "\n")
+        self.manifest["requests"][custom_id] = context
+
+    def close(self) -> None:
+        """Flush the requests file and write the manifest atomically"""
+        if self._requests_file is not None:
+            self._requests_file.close()
+            self._requests_file = None
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def __enter__(self) -> "BatchJob":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def read_batch_results(*paths: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Read provider batch output files (results and, optionally, errors).
+
+    Each line has the form {"custom_id", "response": {"status_code", "body"},
+    "error"}. Lines may come in any order.
+
+    Returns:
+        Dict mapping custom_id to {"body": response body or None,
+        "error": error message or None}
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                body = response.get("body")
+                error = record.get("error")
+
+                message = None
+                if error:
+                    message = error.get("message", str(error)) if isinstance(error, dict) else str(error)
+                elif response.get("status_code") != 200:
+                    body_error = (body or {}).get("error") or {}
+                    message = body_error.get("message") or f"HTTP {response.get('status_code')}"
+
+                results[record["custom_id"]] = {"body": None if message else body, "error": message}
+    return results
+
+
+def chat_completion_result(result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Turn one batch result of a chat completion into the fields of a RAG answer.
+
+    Returns:
+        Dict with answer, usage and finish_reason, or with an error key when
+        the request failed or has no result
+    """
+    if result is None:
+        return {"error": "missing_result"}
+    if result["error"]:
+        return {"error": result["error"]}
+
+    body = result["body"]
+    choice = body["choices"][0]
+    usage = body.get("usage") or {}
+    return {
+        "answer": choice["message"]["content"],
+        "usage": {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0)
+        },
+        "finish_reason": choice.get("finish_reason")
+    }
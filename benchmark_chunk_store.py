@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark mémoire : liste de DocumentChunk vs ChunkStore colonnaire
+Génère un corpus synthétique et compare l'empreinte mémoire des deux représentations
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from chunk_store import ChunkStore
+from pdf_processor import DocumentChunk
+
+VOCABULARY = (
+    "la le les des une un dyslexie élève élèves lecture écriture consigne cours "
+    "phonologie mémoire attention enseignant adaptation police interligne syllabe "
+    "compréhension orthographe exercice évaluation temps tiers aménagement l’école "
+    "apprentissage trouble langage écrit oral vocabulaire phrase courte structure"
+).split()
+
+
+def synthetic_chunks(count: int, words_per_chunk: int, sources: int, seed: int = 42):
+    """Génère des segments synthétiques avec des métadonnées répétées comme dans un vrai corpus"""
+    rng = random.Random(seed)
+    for i in range(count):
+        source = f"document_{i % sources:04d}.pdf"
+        page = (i // sources) % 40 + 1
+        yield DocumentChunk(
+            text=" ".join(rng.choices(VOCABULARY, k=words_per_chunk)),
+            source=source,
+            author=f"Auteur {i % sources:04d}",
+            page_number=page,
+            section=rng.choice(["Introduction", "Méthodologie", "Résultats", "Discussion", "Content"]),
+            chunk_id=f"{source}_page{page}_chunk{i}"
+        )
+
+
+def measure(build):
+    """Retourne (objet construit, mémoire retenue en octets, pic en octets, durée en secondes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark mémoire du ChunkStore")
+    parser.add_argument('--chunks', type=int, default=100_000, help='Nombre de segments synthétiques')
+    parser.add_argument('--words', type=int, default=150, help='Mots par segment')
+    parser.add_argument('--sources', type=int, default=500, help='Nombre de documents sources distincts')
+    args = parser.parse_args()
+
+    print(f"📊 Corpus synthétique : {args.chunks} segments × {args.words} mots, {args.sources} sources")
+    print("=" * 60)
+
+    chunks, list_current, list_peak, list_time = measure(
+        lambda: list(synthetic_chunks(args.chunks, args.words, args.sources))
+    )
+    del chunks
+
+    store, store_current, store_peak, store_time = measure(
+        lambda: ChunkStore.from_chunks(synthetic_chunks(args.chunks, args.words, args.sources))
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chunks.store")
+        start = time.perf_counter()
+        store.save(path)
+        save_time = time.perf_counter() - start
+        file_size = os.path.getsize(path)
+        del store
+
+        loaded, load_current, _, load_time = measure(lambda: ChunkStore.load(path))
+        start = time.perf_counter()
+        sample = [loaded[i].text for i in range(0, len(loaded), max(1, len(loaded) // 1000))]
+        access_time = time.perf_counter() - start
+        loaded.close()
+
+    mb = 1024 * 1024
+    print(f"{'Représentation':<28}{'Retenue':>12}{'Pic':>12}{'Temps':>10}")
+    print(f"{'Liste de DocumentChunk':<28}{list_current / mb:>10.1f}Mo{list_peak / mb:>10.1f}Mo{list_time:>9.2f}s")
+    print(f"{'ChunkStore (construction)':<28}{store_current / mb:>10.1f}Mo{store_peak / mb:>10.1f}Mo{store_time:>9.2f}s")
+    print(f"{'ChunkStore (mmap)':<28}{load_current / mb:>10.1f}Mo{'-':>12}{load_time:>9.3f}s")
+    print("-" * 60)
+    print(f"Gain mémoire : ×{list_current / max(store_current, 1):.1f}")
+    print(f"Fichier : {file_size / mb:.1f} Mo, écrit en {save_time:.2f}s")
+    print(f"Lecture de {len(sample)} segments après mmap : {access_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
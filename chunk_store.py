@@ -0,0 +1,226 @@
+import json
+import mmap
+import struct
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Union
+
+from pdf_processor import DocumentChunk
+
+
+_MAGIC = b"DYSCHNK1"
+_ALIGNMENT = 8
+
+# Column name -> array typecode. Offsets are 64-bit, everything else 32-bit.
+_COLUMNS = {
+    "text_offsets": "Q",
+    "id_offsets": "Q",
+    "page_numbers": "I",
+    "source_ids": "I",
+    "author_ids": "I",
+    "section_ids": "I",
+    "dup_offsets": "Q",
+    "dup_ids": "I",
+}
+_BUFFERS = ("text_buffer", "id_buffer")
+
+
+class ChunkStore:
+    """
+    Columnar, memory-compact container for document chunks.
+
+    Instead of one ``DocumentChunk`` object per chunk, the store keeps:
+    - all chunk texts in one shared UTF-8 buffer addressed by an offsets array
+    - chunk IDs in a second buffer with its own offsets
+    - page numbers in a ``uint32`` array
+    - ``source``, ``author`` and ``section`` as ``uint32`` IDs into a single
+      table of interned strings (each distinct string is stored once)
+    - duplicate sources (see ``deduplication.py``) as a flat ID array with
+      per-chunk offsets
+
+    Chunks are materialised as ``DocumentChunk`` objects only when accessed,
+    so the store can be passed anywhere a sequence of chunks is expected.
+
+    A store can be saved to a single binary file and loaded back with
+    ``mmap``: columns are then ``memoryview`` slices of the mapped file and
+    nothing is copied until a chunk is read. Loaded stores are read-only.
+    """
+    def __init__(self) -> None:
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self.text_buffer: Union[bytearray, memoryview] = bytearray()
+        self.id_buffer: Union[bytearray, memoryview] = bytearray()
+        self.text_offsets = array("Q", [0])
+        self.id_offsets = array("Q", [0])
+        self.page_numbers = array("I")
+        self.source_ids = array("I")
+        self.author_ids = array("I")
+        self.section_ids = array("I")
+        self.dup_offsets = array("Q", [0])
+        self.dup_ids = array("I")
+        self._mmap = None
+        self._file = None
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def _intern(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(value)
+            self._string_ids[value] = string_id
+        return string_id
+
+    def append(self, chunk: DocumentChunk) -> None:
+        """Append a chunk to the store"""
+        if self._mmap is not None:
+            raise TypeError("Un ChunkStore chargé depuis un fichier est en lecture seule")
+
+        self.text_buffer += chunk.text.encode("utf-8")
+        self.text_offsets.append(len(self.text_buffer))
+        self.id_buffer += chunk.chunk_id.encode("utf-8")
+        self.id_offsets.append(len(self.id_buffer))
+        self.page_numbers.append(chunk.page_number)
+        self.source_ids.append(self._intern(chunk.source))
+        self.author_ids.append(self._intern(chunk.author))
+        self.section_ids.append(self._intern(chunk.section))
+        for source in chunk.duplicate_sources:
+            self.dup_ids.append(self._intern(source))
+        self.dup_offsets.append(len(self.dup_ids))
+
+    def extend(self, chunks: Iterable[DocumentChunk]) -> None:
+        for chunk in chunks:
+            self.append(chunk)
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[DocumentChunk]) -> "ChunkStore":
+        store = cls()
+        store.extend(chunks)
+        return store
+
+    # ------------------------------------------------------------------
+    # Access
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.page_numbers)
+
+    def text(self, index: int) -> str:
+        """Decode the text of one chunk without materialising the others"""
+        return bytes(self.text_buffer[self.text_offsets[index]:self.text_offsets[index + 1]]).decode("utf-8")
+
+    def chunk_id(self, index: int) -> str:
+        return bytes(self.id_buffer[self.id_offsets[index]:self.id_offsets[index + 1]]).decode("utf-8")
+
+    def source(self, index: int) -> str:
+        return self.strings[self.source_ids[index]]
+
+    def duplicate_sources(self, index: int) -> List[str]:
+        return [self.strings[self.dup_ids[k]] for k in range(self.dup_offsets[index], self.dup_offsets[index + 1])]
+
+    def __getitem__(self, index: int) -> DocumentChunk:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ChunkStore index out of range")
+
+        return DocumentChunk(
+            text=self.text(index),
+            source=self.strings[self.source_ids[index]],
+            author=self.strings[self.author_ids[index]],
+            page_number=self.page_numbers[index],
+            section=self.strings[self.section_ids[index]],
+            chunk_id=self.chunk_id(index),
+            duplicate_sources=self.duplicate_sources(index)
+        )
+
+    def __iter__(self) -> Iterator[DocumentChunk]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def texts(self, start: int = 0, stop: int = None) -> List[str]:
+        """Decode a contiguous range of chunk texts"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        return [self.text(index) for index in range(start, stop)]
+
+    def subset(self, indices: Iterable[int]) -> "ChunkStore":
+        """Build a new store holding only the given chunks"""
+        return ChunkStore.from_chunks(self[index] for index in indices)
+
+    def nbytes(self) -> int:
+        """Size of the columnar payload (excluding the string table)"""
+        total = len(self.text_buffer) + len(self.id_buffer)
+        for name, typecode in _COLUMNS.items():
+            total += len(getattr(self, name)) * array(typecode).itemsize
+        return total
+
+    # ------------------------------------------------------------------
+    # Serialization
+    # ------------------------------------------------------------------
+    def save(self, path: str) -> None:
+        """
+        Write the store to a single binary file.
+
+        Layout: magic, header length (uint32), JSON header (string table and
+        column positions), then every column padded to 8-byte alignment so it
+        can be cast in place after ``mmap``.
+        """
+        payloads = [(name, bytes(getattr(self, name))) for name in _BUFFERS]
+        payloads += [(name, getattr(self, name).tobytes()) for name in _COLUMNS]
+
+        columns = {}
+        position = 0
+        for name, data in payloads:
+            columns[name] = [position, len(data)]
+            position += len(data) + (-len(data) % _ALIGNMENT)
+
+        header = json.dumps({"strings": self.strings, "columns": columns}, ensure_ascii=False).encode("utf-8")
+        data_start = len(_MAGIC) + 4 + len(header)
+        padding = -data_start % _ALIGNMENT
+
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(struct.pack("<I", len(header) + padding))
+            f.write(header + b" " * padding)
+            for _, data in payloads:
+                f.write(data)
+                f.write(b"\0" * (-len(data) % _ALIGNMENT))
+
+    @classmethod
+    def load(cls, path: str) -> "ChunkStore":
+        """Map a saved store into memory without copying its columns"""
+        store = cls()
+        store._file = open(path, "rb")
+        store._mmap = mmap.mmap(store._file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(store._mmap)
+
+        if bytes(view[:len(_MAGIC)]) != _MAGIC:
+            store.close()
+            raise ValueError(f"{path} n'est pas un fichier ChunkStore")
+
+        (header_length,) = struct.unpack("<I", view[len(_MAGIC):len(_MAGIC) + 4])
+        header_start = len(_MAGIC) + 4
+        header = json.loads(bytes(view[header_start:header_start + header_length]).decode("utf-8"))
+        data_start = header_start + header_length
+
+        store.strings = header["strings"]
+        store._string_ids = {value: i for i, value in enumerate(store.strings)}
+        for name, (offset, length) in header["columns"].items():
+            column = view[data_start + offset:data_start + offset + length]
+            if name in _COLUMNS:
+                column = column.cast(_COLUMNS[name])
+            setattr(store, name, column)
+
+        return store
+
+    def close(self) -> None:
+        """Release the memory map of a loaded store"""
+        if self._mmap is not None:
+            for name in list(_COLUMNS) + list(_BUFFERS):
+                setattr(self, name, None)
+            self._mmap.close()
+            self._file.close()
+            self._mmap = None
+            self._file = None
+
+
+ChunkSequence = Union[Sequence[DocumentChunk], ChunkStore]
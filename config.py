@@ -21,7 +21,8 @@ class Config:
         PINECONE_API_KEY: Pinecone API key for vector database operations
         PINECONE_INDEX_NAME: Name of the Pinecone index for storing embeddings
         PINECONE_ENVIRONMENT: Pinecone environment (e.g., 'gcp-starter')
-        EMBEDDING_DIMENSION: Dimension of the embedding vectors (1536 for text-embedding-3-small)
+        EMBEDDING_DIMENSION: Dimension of the stored embedding vectors (index, searches, example sidecar)
+        EMBEDDING_MODEL_DIMENSION: Native dimension of the embedding model (1536 for text-embedding-3-small)
         EMBEDDING_MODEL: OpenAI model used for generating embeddings
         CHAT_MODEL: OpenAI model used for chat completions
         PDF_DIRECTORY: Directory containing academic research PDFs
@@ -29,6 +30,43 @@ class Config:
         CHUNK_OVERLAP: Overlap between consecutive chunks in tokens
         TOP_K_RESULTS: Number of most relevant chunks to retrieve for each query
         MAX_CONTEXT_LENGTH: Maximum context length for chat completions
+        CONTEXT_COMPRESSION: Keep only the retrieved sentences that best match the query in the prompt
+        COMPRESSED_CONTEXT_LENGTH: Token budget of the compressed context
+        HIERARCHICAL_SEARCH: Search chunks only inside the documents and sections whose summaries best match the query
+        HIERARCHICAL_TOP_GROUPS: Number of document or section summaries selected by the coarse search
+        HIERARCHICAL_SUMMARY_WORDS: Maximum words of a document or section summary
+        DEDUPLICATE_CHUNKS: Collapse near-duplicate chunks before embedding
+        DEDUP_THRESHOLD: Estimated Jaccard similarity above which chunks are merged
+        MINHASH_NUM_PERM: Number of MinHash bins per chunk signature
+        LSH_BANDS: Number of LSH bands used to find candidate duplicates
+        SHINGLE_SIZE: Number of consecutive words per shingle
+        CHAT_REQUESTS_PER_MINUTE: Shared request budget for the chat model
+        CHAT_TOKENS_PER_MINUTE: Shared token budget for the chat model
+        EMBEDDING_REQUESTS_PER_MINUTE: Shared request budget for the embedding model
+        EMBEDDING_TOKENS_PER_MINUTE: Shared token budget for the embedding model
+        ADAPTATION_WORKERS: Number of courses adapted concurrently
+        QUERY_BATCH_CONCURRENCY: Number of questions answered concurrently by main.py batch
+        ADAPTATION_STEP_CONCURRENCY: Number of adaptation steps run concurrently per course
+        ADAPTATION_BATCHED: Adapt every section/exercise/instruction in multi-item JSON calls
+        ADAPTATION_BATCH_INPUT_TOKENS: Maximum original text tokens packed into one batch call
+        ADAPTATION_BATCH_OUTPUT_TOKENS: Maximum completion tokens for one batch call
+        ADAPTATION_BATCH_OUTPUT_RATIO: Expected adapted/original length ratio used to size batches
+        ADAPTATION_CACHE_ENABLED: Reuse cached adaptations of identical content
+        ADAPTATION_CACHE_PATH: SQLite file holding the adaptation cache
+        CHAT_INPUT_COST_PER_1M: Chat model price per million prompt tokens (USD)
+        CHAT_OUTPUT_COST_PER_1M: Chat model price per million completion tokens (USD)
+        EDITION_REUSE_THRESHOLD: Text similarity above which a section of a new edition reuses the old adaptation
+        EXAMPLE_EXTRACTION_WORKERS: Processes extracting real adaptation examples from course pairs
+        EXAMPLE_MAX_SECTIONS: Sections read from each version of a course pair (PDF reading stops after them)
+        SECTION_ALIGNMENT_THRESHOLD: Minimum similarity for an original and an adapted section to be paired
+        REAL_EXAMPLES_PATH: Real adaptation examples, as JSON or as a sharded SQLite store (.sqlite)
+        REAL_EXAMPLES_USE_EMBEDDINGS: Pick real adaptation examples by embedding similarity when available
+        PROFILE_DIR: Directory receiving the --profile captures (collapsed stacks, summary, cProfile, memory)
+        WATCH_POLL_SECONDS: Interval between two scans of the course directory in watch mode
+        WATCH_SETTLE_SECONDS: Time a new PDF must stay unchanged before it is queued
+        WATCH_STATE_PATH: JSON file holding the persistent watch queue
+        WATCH_MAX_RETRIES: Times a failed or partial course is re-queued (resumed) before giving up
+        WATCH_RETRY_SECONDS: Delay before a failed or partial course is retried
     """
     # API Keys - Set via environment variables or direct file reading
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "your-openai-api-key-here")
@@ -46,9 +84,13 @@ class Config:
     # Pinecone Vector Database Configuration
     PINECONE_INDEX_NAME: str = "dyslexia-research"  # Index name for storing research embeddings
     PINECONE_ENVIRONMENT: str = "gcp-starter"  # Pinecone environment (update for your setup)
-    # Embedding dimensions must match the chosen OpenAI embedding model:
+    # Native dimension of the chosen OpenAI embedding model:
     # - text-embedding-3-small: 1536 dimensions
     # - text-embedding-3-large: 3072 dimensions
+    EMBEDDING_MODEL_DIMENSION: int = 1536
+    # Stored dimension: lower values (256, 512) keep the first dimensions of each
+    # vector, re-normalized (Matryoshka embeddings). Changing it needs a new index;
+    # measure the recall loss first with eval_embedding_dimensions.py
     EMBEDDING_DIMENSION: int = 1536
     
     # OpenAI Model Configuration
@@ -63,6 +105,61 @@ class Config:
     # RAG (Retrieval-Augmented Generation) Configuration
     TOP_K_RESULTS: int = 5  # Number of most relevant chunks to retrieve per query
     MAX_CONTEXT_LENGTH: int = 4000  # Maximum context length for chat completions (tokens)
+    CONTEXT_COMPRESSION: bool = False  # Sentence selection by BM25 overlap with the query
+    COMPRESSED_CONTEXT_LENGTH: int = 1500  # Tokens kept when compression is on
+    
+    # Two-stage retrieval: document/section summaries first, then their chunks
+    HIERARCHICAL_SEARCH: bool = False  # Summaries are synced by setup; run it once after enabling
+    HIERARCHICAL_TOP_GROUPS: int = 8  # Documents or sections whose chunks are searched
+    HIERARCHICAL_SUMMARY_WORDS: int = 300  # Opening words of evenly spaced chunks of the group, up to this budget
+    
+    # Near-duplicate detection before embedding (DYS versions, yearly editions...)
+    DEDUPLICATE_CHUNKS: bool = True
+    DEDUP_THRESHOLD: float = 0.85  # Estimated Jaccard similarity to collapse two chunks
+    MINHASH_NUM_PERM: int = 128  # Signature size (bins)
+    LSH_BANDS: int = 16  # 16 bands x 8 rows: candidates from ~0.7 similarity
+    SHINGLE_SIZE: int = 3  # Words per shingle
+    
+    # API rate limits shared by all worker threads (set to your OpenAI tier, 0 = unlimited)
+    CHAT_REQUESTS_PER_MINUTE: int = 500
+    CHAT_TOKENS_PER_MINUTE: int = 30000
+    EMBEDDING_REQUESTS_PER_MINUTE: int = 3000
+    EMBEDDING_TOKENS_PER_MINUTE: int = 1000000
+    
+    # Batch course adaptation
+    ADAPTATION_WORKERS: int = 4  # Courses adapted in parallel by process_all_courses
+    QUERY_BATCH_CONCURRENCY: int = 8  # Questions in flight at once (bounded by the rate limiter)
+    ADAPTATION_STEP_CONCURRENCY: int = 12  # Steps (intro, sections, exercises...) run in parallel per course
+    ADAPTATION_BATCHED: bool = False  # Whole-course mode: several items per call instead of the first 3 only
+    ADAPTATION_BATCH_INPUT_TOKENS: int = 6000  # Original text per batch call (gpt-4o context: 128k)
+    ADAPTATION_BATCH_OUTPUT_TOKENS: int = 12000  # Completion budget per batch call (gpt-4o max: 16k)
+    ADAPTATION_BATCH_OUTPUT_RATIO: float = 1.5  # Adapted text is usually longer (titles, lists)
+    
+    # Adaptation cache (keyed by content, prompt version and model)
+    ADAPTATION_CACHE_ENABLED: bool = True
+    ADAPTATION_CACHE_PATH: str = "cours-adaptes/.cache/adaptations.sqlite"
+    CHAT_INPUT_COST_PER_1M: float = 2.50  # gpt-4o pricing, used to report savings
+    CHAT_OUTPUT_COST_PER_1M: float = 10.00
+    
+    # Incremental re-adaptation of new course editions
+    EDITION_REUSE_THRESHOLD: float = 0.98  # Similarity ratio for "unchanged" (typos, spacing)
+    
+    # Real adaptation examples inserted in prompts
+    EXAMPLE_EXTRACTION_WORKERS: int = 4  # PDF parsing is CPU-bound: one process per pair
+    EXAMPLE_MAX_SECTIONS: int = 60  # Bounds alignment cost on very long documents
+    SECTION_ALIGNMENT_THRESHOLD: float = 0.2  # Dice coefficient of word and word-pair shingles
+    REAL_EXAMPLES_PATH: str = "real_adaptation_examples.json"  # example_store.py import → .sqlite
+    REAL_EXAMPLES_USE_EMBEDDINGS: bool = True  # Needs the sidecar written by real_examples_extractor.py
+    
+    # Profiling (--profile on main.py and course_adapter.py)
+    PROFILE_DIR: str = "profiles"
+    
+    # Watch mode (course_adapter.py watch)
+    WATCH_POLL_SECONDS: float = 5.0  # Directory scan interval
+    WATCH_SETTLE_SECONDS: float = 10.0  # Debounce for files still being copied
+    WATCH_STATE_PATH: str = "cours-adaptes/.watch/queue.json"
+    WATCH_MAX_RETRIES: int = 3  # Transient API failures: resumed from the checkpoint
+    WATCH_RETRY_SECONDS: float = 60.0
 
 # Global configuration instance - import this in other modules
 config: Config = Config() 
\ No newline at end of file
@@ -0,0 +1,113 @@
+import math
+import re
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from text_utils import tokenize
+
+# End of a sentence: punctuation followed by a capital, digit, bullet or quote
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?;…])\s+(?=[A-ZÀ-ÖØ-Ý0-9«"(•▪–-])')
+# PDF text often has long runs without punctuation (lists, tables): cut them into pieces
+MAX_SENTENCE_WORDS = 60
+# BM25 parameters: term frequency saturation and sentence length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split chunk text into sentences of at most MAX_SENTENCE_WORDS words"""
+    sentences = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        words = sentence.split()
+        for start in range(0, len(words), MAX_SENTENCE_WORDS):
+            sentences.append(' '.join(words[start:start + MAX_SENTENCE_WORDS]))
+    return sentences
+
+
+def score_sentences(query: str, sentences: Sequence[str]) -> List[float]:
+    """
+    BM25 score of each sentence for the query terms.
+
+    Document frequencies are taken over the given sentences (the retrieved
+    chunks), so terms found everywhere in the context, such as "dyslexie",
+    weigh less than the specific terms of the question.
+
+    Args:
+        query: Question or search query
+        sentences: Candidate sentences
+
+    Returns:
+        List[float]: One score per sentence (0 when no query term occurs)
+    """
+    query_terms = set(tokenize(query))
+    sentence_terms = [tokenize(sentence) for sentence in sentences]
+    if not query_terms or not sentence_terms:
+        return [0.0] * len(sentences)
+
+    document_frequency = {term: sum(term in terms for terms in sentence_terms) for term in query_terms}
+    average_length = sum(len(terms) for terms in sentence_terms) / len(sentence_terms) or 1.0
+    scores = []
+    for terms in sentence_terms:
+        score = 0.0
+        for term in query_terms:
+            frequency = terms.count(term)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(sentence_terms) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * len(terms) / average_length)
+            score += idf * frequency * (BM25_K1 + 1) / (frequency + norm)
+        scores.append(score)
+    return scores
+
+
+def compress_results(query: str, search_results: List[Dict[str, Any]], budget: int,
+                     count_tokens: Callable[[str], int],
+                     header: Callable[[Dict[str, Any]], str]) -> Tuple[List[Tuple[Dict[str, Any], str]], int]:
+    """
+    Keep the sentences of the retrieved chunks that best answer the query.
+
+    Sentences are scored with BM25 (score_sentences), weighted by the search
+    score of their chunk (similarity of the stored chunk embedding to the
+    query), and added best first while the budget allows, counting the source
+    header of each chunk once. Sentences without any query term are dropped.
+    Kept sentences go back to their original order inside each chunk; gaps
+    are marked with "[…]".
+
+    Args:
+        query: Question or search query
+        search_results: Results of VectorStore.search, most relevant first
+        budget: Maximum tokens of the compressed context (headers included)
+        count_tokens: Token counter of the chat model
+        header: Source line written before the text of a result
+
+    Returns:
+        (result, compressed text) pairs in search order for the results that
+        kept at least one sentence, and the tokens used
+    """
+    sentences = []  # (result position, sentence position, text)
+    for position, result in enumerate(search_results):
+        sentences.extend((position, index, text) for index, text in enumerate(split_sentences(result['text'])))
+    scores = score_sentences(query, [text for _, _, text in sentences])
+
+    kept: Dict[int, List[Tuple[int, str]]] = {}
+    used = 0
+    ranked = sorted(range(len(sentences)), key=lambda i: -scores[i] * search_results[sentences[i][0]].get('score', 1.0))
+    for i in ranked:
+        if scores[i] <= 0:
+            break
+        position, index, text = sentences[i]
+        tokens = count_tokens(text) + (0 if position in kept else count_tokens(header(search_results[position])))
+        if used + tokens > budget:
+            continue
+        kept.setdefault(position, []).append((index, text))
+        used += tokens
+
+    compressed = []
+    for position in sorted(kept):
+        parts, previous = [], None
+        for index, text in sorted(kept[position]):
+            if previous is not None and index != previous + 1:
+                parts.append("[…]")
+            parts.append(text)
+            previous = index
+        compressed.append((search_results[position], ' '.join(parts)))
+    return compressed, used
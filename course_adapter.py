@@ -7,24 +7,62 @@ Analyse les cours existants et génère des versions adaptées aux élèves dysl
 import os
 import fitz  # PyMuPDF
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
+from tqdm import tqdm
 
 from rag_system import DyslexiaRAG
 from pdf_processor import PDFProcessor
 from config import config
-from real_examples_provider import get_real_example_for_prompt
+from real_examples_provider import get_examples_provider, get_examples_version, get_real_example_for_prompt
+from adaptation_checkpoint import AdaptationCheckpoint
+from adaptation_cache import AdaptationCache, cache_key, completion_cost
+from edition_diff import PreviousEdition, content_hash
+from adaptation_writer import ProgressiveWriter
+from course_watcher import CourseWatcher
+from batch_jobs import BatchJob, CHAT_COMPLETIONS_URL, chat_completion_result, read_batch_results
+from profiling import run_profiled, span
+
+# Version des prompts : à incrémenter dès qu'un prompt change, pour invalider
+# les points de reprise des exécutions précédentes
+PROMPT_VERSION = "1"
+
+@dataclass
+class AdaptationStep:
+    """Une étape indépendante de l'adaptation d'un cours (un appel RAG)"""
+    key: str
+    kind: str
+    build_query: Callable[[], str]
+    item: Any = None
+    seconds: float = 0.0
+    batch: Optional[List[Tuple[str, Any]]] = None  # (clé, élément) traités en un seul appel
+    course_title: str = ""  # entrée des étapes globales (introduction, mise en forme, évaluation)
+    real_example: Optional[str] = None  # exemple des prompts d'un lot, choisi une fois pour tout le lot
+    
+    def entries(self) -> List[Tuple[str, Any]]:
+        """Clés de résultat produites par l'étape, avec l'élément adapté"""
+        return self.batch if self.batch is not None else [(self.key, self.item)]
 
 class CourseAdapter:
-    def __init__(self):
+    def __init__(self, use_cache: bool = None):
         self.rag_system = DyslexiaRAG()
         self.pdf_processor = PDFProcessor()
         self.courses_dir = "pdf-cours"
         self.output_dir = "cours-adaptes"
+        self.checkpoint_dir = os.path.join(self.output_dir, ".checkpoints")
         
         # Créer le répertoire de sortie s'il n'existe pas
         os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Cache des adaptations partagé entre cours (sections identiques, nouvelles éditions...)
+        if use_cache is None:
+            use_cache = config.ADAPTATION_CACHE_ENABLED
+        self.cache = AdaptationCache() if use_cache else None
     
     def extract_course_content(self, pdf_path: str) -> Dict[str, Any]:
         """Extraire le contenu structuré d'un cours"""
@@ -141,44 +179,22 @@ class CourseAdapter:
                 if len(line) > 10 and len(line) < 200:
                     course_content["instructions"].append(line.strip())
     
-    def generate_adaptations(self, course_content: Dict[str, Any]) -> Dict[str, Any]:
-        """Générer les adaptations dyslexiques pour le cours"""
-        print(f"🔄 Génération des adaptations pour : {course_content['title']}")
+    def _introduction_query(self, course_content: Dict[str, Any]) -> str:
+        # Exemple le plus proche du titre : le même à chaque exécution, pour que l'étape profite du cache
+        real_example = get_real_example_for_prompt("section", course_content['title'], "Histoire")
         
-        adaptations = {
-            "course_title": course_content["title"],
-            "original_sections": len(course_content["sections"]),
-            "adapted_sections": [],
-            "general_adaptations": {},
-            "exercise_adaptations": [],
-            "instruction_adaptations": [],
-            "formatting_recommendations": {},
-            "assessment_adaptations": {}
-        }
-        
-        # 1. Introduction adaptée pour le cours
-        real_example = get_real_example_for_prompt("section", "", "Histoire")
-        
-        intro_query = f"""{real_example}
+        return f"""{real_example}
 
 Réécris une introduction adaptée aux élèves dyslexiques pour un cours sur '{course_content['title']}'. Crée directement le texte d'introduction du cours adapté, avec un langage simple, des phrases courtes et une structure claire.
 
 COURS À ADAPTER : {course_content['title']}"""
-        
-        intro_response = self.rag_system.query(intro_query)
-        adaptations["general_adaptations"] = {
-            "adapted_introduction": intro_response["answer"],
-            "sources": intro_response["sources"]
-        }
-        
-        # 2. Adapter chaque section
-        for i, section in enumerate(course_content["sections"][:3]):  # Limiter à 3 sections pour éviter trop d'appels API
-            print(f"   📖 Section {i+1}/{min(3, len(course_content['sections']))}: {section['title'][:50]}...")
-            
-            # Obtenir un exemple réel similaire au contenu
+    
+    def _section_query(self, section: Dict[str, Any], real_example: str = None) -> str:
+        # Obtenir un exemple réel similaire au contenu
+        if real_example is None:
             real_example = get_real_example_for_prompt("section", section['content'][:200], "Histoire")
-            
-            section_query = f"""{real_example}
+        
+        return f"""{real_example}
 
 TITRE ORIGINAL: {section['title']}
 CONTENU ORIGINAL: {section['content'][:800]}...
@@ -191,25 +207,12 @@ INSTRUCTIONS: Réécris cette section avec :
 - Points clés mis en évidence
 
 CRÉE LE TEXTE ADAPTÉ DE LA SECTION:"""
-            
-            section_response = self.rag_system.query(section_query)
-            
-            adapted_section = {
-                "original_title": section["title"],
-                "adapted_title": self._simplify_title(section["title"]),
-                "original_content_preview": section["content"][:200] + "...",
-                "adapted_content": section_response["answer"],
-                "sources": section_response["sources"],
-                "page": section["page"]
-            }
-            
-            adaptations["adapted_sections"].append(adapted_section)
-        
-        # 3. Adapter les exercices
-        for exercise in course_content["exercises"][:3]:  # Limiter à 3 exercices
+    
+    def _exercise_query(self, exercise: str, real_example: str = None) -> str:
+        if real_example is None:
             real_example = get_real_example_for_prompt("section", exercise, "Histoire")
-            
-            exercise_query = f"""{real_example}
+        
+        return f"""{real_example}
 
 EXERCICE ORIGINAL: {exercise}
 
@@ -220,20 +223,12 @@ INSTRUCTIONS: Crée un exercice adapté avec :
 - Aide visuelle ou structurée si nécessaire
 
 CRÉE L'EXERCICE ADAPTÉ:"""
-            
-            exercise_response = self.rag_system.query(exercise_query)
-            
-            adaptations["exercise_adaptations"].append({
-                "original_exercise": exercise,
-                "adapted_exercise": exercise_response["answer"],
-                "sources": exercise_response["sources"]
-            })
-        
-        # 4. Adapter les consignes
-        for instruction in course_content["instructions"][:3]:  # Limiter à 3 consignes
+    
+    def _instruction_query(self, instruction: str, real_example: str = None) -> str:
+        if real_example is None:
             real_example = get_real_example_for_prompt("section", instruction, "Histoire")
-            
-            instruction_query = f"""{real_example}
+        
+        return f"""{real_example}
 
 CONSIGNE ORIGINALE: {instruction}
 
@@ -244,38 +239,419 @@ INSTRUCTIONS: Réécris la consigne avec :
 - Éviter les négations complexes
 
 CRÉE LA CONSIGNE ADAPTÉE:"""
+    
+    def _formatting_query(self, course_content: Dict[str, Any]) -> str:
+        return f"Crée un guide de mise en forme spécifique pour ce cours '{course_content['title']}' adapté aux dyslexiques. Donne des instructions concrètes et pratiques pour la présentation du document."
+    
+    def _assessment_query(self, course_content: Dict[str, Any]) -> str:
+        return f"Crée un exemple concret d'évaluation adaptée pour ce cours '{course_content['title']}' destinée aux élèves dyslexiques. Produis un modèle d'exercice d'évaluation avec les adaptations nécessaires."
+    
+    def _build_steps(self, course_content: Dict[str, Any], batched: bool = False) -> List[AdaptationStep]:
+        """Lister les étapes indépendantes de l'adaptation, dans l'ordre du document final"""
+        title = course_content['title']
+        steps = [AdaptationStep("introduction", "introduction", partial(self._introduction_query, course_content),
+                                course_title=title)]
+        
+        if batched:
+            # Mode lots : tous les éléments du cours, regroupés en quelques appels
+            for kind, items in (("section", course_content["sections"]),
+                                ("exercise", course_content["exercises"]),
+                                ("instruction", course_content["instructions"])):
+                keyed_items = [(f"{kind}_{i}", item) for i, item in enumerate(items)]
+                for n, batch in enumerate(self._pack_batches(kind, keyed_items)):
+                    steps.append(AdaptationStep(f"{kind}_batch_{n}", kind, None, batch=batch))
+        else:
+            # Limiter à 3 sections, exercices et consignes pour éviter trop d'appels API
+            for i, section in enumerate(course_content["sections"][:3]):
+                steps.append(AdaptationStep(f"section_{i}", "section", partial(self._section_query, section), section))
             
-            instruction_response = self.rag_system.query(instruction_query)
+            for i, exercise in enumerate(course_content["exercises"][:3]):
+                steps.append(AdaptationStep(f"exercise_{i}", "exercise", partial(self._exercise_query, exercise), exercise))
             
-            adaptations["instruction_adaptations"].append({
-                "original_instruction": instruction,
-                "adapted_instruction": instruction_response["answer"],
-                "sources": instruction_response["sources"]
-            })
+            for i, instruction in enumerate(course_content["instructions"][:3]):
+                steps.append(AdaptationStep(f"instruction_{i}", "instruction", partial(self._instruction_query, instruction), instruction))
         
-        # 5. Guide de mise en forme adapté
-        formatting_query = f"Crée un guide de mise en forme spécifique pour ce cours '{course_content['title']}' adapté aux dyslexiques. Donne des instructions concrètes et pratiques pour la présentation du document."
+        steps.append(AdaptationStep("formatting", "formatting", partial(self._formatting_query, course_content),
+                                    course_title=title))
+        steps.append(AdaptationStep("assessment", "assessment", partial(self._assessment_query, course_content),
+                                    course_title=title))
+        return steps
+    
+    # ------------------------------------------------------------------
+    # Mode lots : plusieurs éléments par appel, réponse JSON structurée
+    # ------------------------------------------------------------------
+    BATCH_LABELS = {"section": "sections", "exercise": "exercices", "instruction": "consignes"}
+    BATCH_GUIDELINES = {
+        "section": "- Phrases courtes et simples\n- Vocabulaire accessible\n- Structure claire avec des sous-titres\n- Exemples concrets\n- Points clés mis en évidence",
+        "exercise": "- Consignes claires et courtes\n- Instructions étape par étape\n- Vocabulaire simple\n- Aide visuelle ou structurée si nécessaire",
+        "instruction": "- Mots simples et précis\n- Une seule instruction par phrase\n- Ordre logique des étapes\n- Éviter les négations complexes",
+    }
+    
+    def _item_text(self, kind: str, item: Any) -> str:
+        if kind == "section":
+            return f"TITRE ORIGINAL: {item['title']}\nCONTENU ORIGINAL: {item['content']}"
+        return f"ORIGINAL: {item}"
+    
+    def _single_query(self, kind: str, item: Any, real_example: str = None) -> str:
+        if kind == "section":
+            return self._section_query(item, real_example)
+        if kind == "exercise":
+            return self._exercise_query(item, real_example)
+        return self._instruction_query(item, real_example)
+    
+    def _pack_batches(self, kind: str, items: List[Tuple[str, Any]]) -> List[List[Tuple[str, Any]]]:
+        """Regrouper les éléments en lots qui tiennent dans la fenêtre de contexte
+        
+        Un lot est fermé dès que le texte original dépasse ADAPTATION_BATCH_INPUT_TOKENS
+        ou que la réponse attendue (estimée à ADAPTATION_BATCH_OUTPUT_RATIO fois
+        l'original) risque de dépasser ADAPTATION_BATCH_OUTPUT_TOKENS.
+        """
+        input_budget = config.ADAPTATION_BATCH_INPUT_TOKENS
+        output_budget = config.ADAPTATION_BATCH_OUTPUT_TOKENS / config.ADAPTATION_BATCH_OUTPUT_RATIO
+        budget = min(input_budget, output_budget)
         
-        formatting_response = self.rag_system.query(formatting_query)
-        adaptations["formatting_recommendations"] = {
-            "guide": formatting_response["answer"],
-            "sources": formatting_response["sources"]
+        batches, current, current_tokens = [], [], 0
+        for key, item in items:
+            tokens = len(self.rag_system.encoding.encode(self._item_text(kind, item)))
+            if current and current_tokens + tokens > budget:
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append((key, item))
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+    
+    def _batch_example(self, step: AdaptationStep) -> str:
+        """Exemple réel d'un lot, choisi d'après tous ses éléments
+        
+        Le même exemple sert au lot, à ses moitiés et aux éléments refaits
+        seuls : il entre dans la clé de cache de chaque élément.
+        """
+        if step.real_example is None:
+            sample = " ".join(self._item_text(step.kind, item) for _, item in step.batch)
+            step.real_example = get_real_example_for_prompt("section", sample[:200], "Histoire")
+        return step.real_example
+    
+    def _batch_query(self, kind: str, items: List[Tuple[str, Any]], real_example: str) -> str:
+        blocks = "\n\n".join(f"### ID: {key}\n{self._item_text(kind, item)}" for key, item in items)
+        
+        return f"""{real_example}
+
+Adapte chacun des {len(items)} {self.BATCH_LABELS[kind]} ci-dessous pour des élèves dyslexiques, avec :
+{self.BATCH_GUIDELINES[kind]}
+
+{blocks}
+
+FORMAT DE RÉPONSE : réponds uniquement avec un objet JSON de la forme
+{{"adaptations": {{"<ID>": "<texte adapté en Markdown>"}}}}
+contenant exactement les IDs ci-dessus ({", ".join(key for key, _ in items)})."""
+    
+    def _parse_batch_answer(self, response: Dict[str, Any], keys: List[str]) -> Dict[str, str]:
+        """Extraire les textes adaptés valides d'une réponse JSON (vide si tronquée ou invalide)"""
+        if response.get("finish_reason") == "length":
+            return {}
+        try:
+            adaptations = json.loads(response["answer"]).get("adaptations", {})
+        except (TypeError, ValueError, AttributeError):
+            return {}
+        return {
+            key: adaptations[key] for key in keys
+            if isinstance(adaptations.get(key), str) and adaptations[key].strip()
+        }
+    
+    def _batch_request_args(self, kind: str, items: List[Tuple[str, Any]], real_example: str) -> Dict[str, Any]:
+        """Arguments de DyslexiaRAG.query (ou prepare_query) pour un lot de plusieurs éléments"""
+        return {
+            "question": self._batch_query(kind, items, real_example),
+            "search_query": " ".join(self._item_text(kind, item)[:300] for _, item in items),
+            "max_tokens": config.ADAPTATION_BATCH_OUTPUT_TOKENS,
+            "response_format": {"type": "json_object"}
         }
+    
+    def _split_batch_response(self, response: Dict[str, Any], keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Découper la réponse d'un lot en une réponse par élément valide"""
+        adapted = self._parse_batch_answer(response, keys)
+        # L'usage du lot est réparti entre ses éléments (pour le calcul des économies du cache) ;
+        # le reste de la division va au premier, pour que la somme des parts reste celle du lot
+        usage = response.get("usage") or {}
+        results = {}
+        for n, (key, text) in enumerate(adapted.items()):
+            usage_share = {
+                name: count // len(adapted) + (count % len(adapted) if n == 0 else 0) for name, count in usage.items()
+            }
+            results[key] = {"answer": text, "sources": response["sources"], "usage": usage_share}
+        return results
+    
+    def _run_batch(self, kind: str, items: List[Tuple[str, Any]], real_example: str) -> Dict[str, Dict[str, Any]]:
+        """Adapter un lot en un appel ; les lots trop gros ou mal formés sont coupés en deux"""
+        if len(items) == 1:
+            key, item = items[0]
+            return {key: self.rag_system.query(self._single_query(kind, item, real_example))}
+        
+        response = self.rag_system.query(**self._batch_request_args(kind, items, real_example))
+        results = self._split_batch_response(response, [key for key, _ in items])
+        
+        missing = [(key, item) for key, item in items if key not in results]
+        if missing:
+            print(f"   ✂️  Lot de {len(items)} {self.BATCH_LABELS[kind]} : {len(missing)} à refaire en lots plus petits")
+            if len(missing) == len(items):
+                halves = [missing[:len(missing) // 2], missing[len(missing) // 2:]]
+            else:
+                halves = [missing]
+            for half in halves:
+                results.update(self._run_batch(kind, half, real_example))
+        return results
+    
+    def _lookup_step(self, step: AdaptationStep,
+                     checkpoint: Optional[AdaptationCheckpoint] = None,
+                     previous_edition: Optional[PreviousEdition] = None
+                     ) -> Tuple[Dict[str, Dict[str, Any]], List[Tuple[str, Any]], Dict[str, str]]:
+        """Réponses déjà connues d'une étape et éléments restant à générer
+        
+        Consulte dans l'ordre le point de reprise, l'édition précédente puis le
+        cache. Les réponses trouvées hors du point de reprise y sont enregistrées.
         
-        # 6. Exemple d'évaluation adaptée
-        assessment_query = f"Crée un exemple concret d'évaluation adaptée pour ce cours '{course_content['title']}' destinée aux élèves dyslexiques. Produis un modèle d'exercice d'évaluation avec les adaptations nécessaires."
+        La clé de cache porte sur tout ce qui détermine le prompt : le texte de
+        chaque élément et l'exemple réel du lot, ou pour une étape simple son
+        entrée et l'empreinte des exemples réels (l'exemple en découle). La
+        question d'une étape simple n'est construite qu'en cas d'absence du
+        cache, car le choix de l'exemple peut demander un embedding.
         
-        assessment_response = self.rag_system.query(assessment_query)
-        adaptations["assessment_adaptations"] = {
-            "example_assessment": assessment_response["answer"],
-            "sources": assessment_response["sources"]
+        Retourne (réponses connues, éléments à générer, clé de cache de chaque
+        élément à générer).
+        """
+        responses = {}
+        pending = []
+        for key, item in step.entries():
+            if checkpoint is not None and key in checkpoint:
+                responses[key] = checkpoint.get(key)
+                continue
+            reused = previous_edition.find(step.kind, item) if previous_edition and item is not None else None
+            if reused is not None:
+                responses[key] = reused
+                if checkpoint is not None:
+                    checkpoint.record(key, reused)
+            else:
+                pending.append((key, item))
+        
+        if not pending:
+            return responses, [], {}
+        
+        if step.batch is not None:
+            real_example = self._batch_example(step)
+            cache_keys = {
+                key: cache_key(PROMPT_VERSION, config.CHAT_MODEL, "batch", step.kind,
+                               self._item_text(step.kind, item), real_example)
+                for key, item in pending
+            }
+        else:
+            step_input = self._item_text(step.kind, step.item) if step.item is not None else step.course_title
+            cache_keys = {step.key: cache_key(PROMPT_VERSION, config.CHAT_MODEL, step.kind, step_input,
+                                              get_examples_version())}
+        
+        if self.cache is not None:
+            for key in list(cache_keys):
+                cached = self.cache.get(cache_keys[key])
+                if cached is not None:
+                    responses[key] = cached
+                    del cache_keys[key]
+                    if checkpoint is not None:
+                        checkpoint.record(key, cached)
+            pending = [(key, item) for key, item in pending if key in cache_keys]
+        
+        return responses, pending, cache_keys
+    
+    def _store_responses(self, responses: Dict[str, Dict[str, Any]], cache_keys: Dict[str, str],
+                         checkpoint: Optional[AdaptationCheckpoint] = None):
+        """Enregistrer les nouvelles réponses dans le cache et le point de reprise"""
+        for key, response in responses.items():
+            if self.cache is not None:
+                self.cache.put(cache_keys[key], response)
+            if checkpoint is not None and not response.get("error"):
+                checkpoint.record(key, response)
+    
+    def _run_step(self, step: AdaptationStep,
+                  checkpoint: Optional[AdaptationCheckpoint] = None,
+                  previous_edition: Optional[PreviousEdition] = None) -> Dict[str, Dict[str, Any]]:
+        """Exécuter une étape (récupération + génération) et mesurer sa durée
+        
+        Retourne les réponses indexées par clé de résultat (une seule clé, sauf
+        pour les étapes en lots). Les éléments déjà connus (point de reprise,
+        édition précédente, cache) ne sont pas regénérés ; les nouvelles
+        réponses sont enregistrées dans le cache et le point de reprise.
+        """
+        start = time.perf_counter()
+        responses, pending, cache_keys = self._lookup_step(step, checkpoint, previous_edition)
+        
+        if pending:
+            if step.batch is not None:
+                print(f"   📦 Lot de {len(pending)} {self.BATCH_LABELS[step.kind]}...")
+                generated = self._run_batch(step.kind, pending, self._batch_example(step))
+            else:
+                if step.kind == "section":
+                    print(f"   📖 Section : {step.item['title'][:50]}...")
+                generated = {step.key: self.rag_system.query(step.build_query())}
+            self._store_responses(generated, cache_keys, checkpoint)
+            responses.update(generated)
+        
+        step.seconds = time.perf_counter() - start
+        return responses
+    
+    def _run_steps(self, steps: List[AdaptationStep], max_concurrency: int,
+                   checkpoint: Optional[AdaptationCheckpoint] = None,
+                   previous_edition: Optional[PreviousEdition] = None,
+                   on_result: Optional[Callable[[str, str, Dict[str, Any]], None]] = None) -> Dict[str, Dict[str, Any]]:
+        """Exécuter les étapes en parallèle (au plus max_concurrency à la fois)
+        
+        on_result(clé, type, élément mis en forme) est appelé depuis le thread
+        appelant pour chaque élément, dès que son étape est terminée.
+        """
+        entries = {key: (step.kind, item) for step in steps for key, item in step.entries()}
+        responses = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            futures = [executor.submit(self._run_step, step, checkpoint, previous_edition) for step in steps]
+            for future in as_completed(futures):
+                step_responses = future.result()
+                responses.update(step_responses)
+                if on_result is not None:
+                    for key, response in step_responses.items():
+                        kind, item = entries[key]
+                        on_result(key, kind, self._step_entry(kind, item, response))
+        return responses
+    
+    def _assemble_adaptations(self, course_content: Dict[str, Any], steps: List[AdaptationStep],
+                              responses: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Assembler les réponses des étapes dans l'ordre d'origine"""
+        adaptations = {
+            "course_title": course_content["title"],
+            "original_sections": len(course_content["sections"]),
+            "adapted_sections": [],
+            "general_adaptations": {},
+            "exercise_adaptations": [],
+            "instruction_adaptations": [],
+            "formatting_recommendations": {},
+            "assessment_adaptations": {}
         }
         
+        for step in steps:
+            for key, item in step.entries():
+                self._add_step_result(adaptations, step.kind, item, responses[key])
+        
         return adaptations
     
+    def _step_entry(self, kind: str, item: Any, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Mettre en forme la réponse d'un élément comme dans le fichier de sortie"""
+        if kind == "introduction":
+            return {"adapted_introduction": response["answer"], "sources": response["sources"]}
+        if kind == "section":
+            return {
+                "original_title": item["title"],
+                "adapted_title": self._simplify_title(item["title"]),
+                "original_content_preview": item["content"][:200] + "...",
+                "original_content_hash": content_hash(item["content"]),
+                "adapted_content": response["answer"],
+                "sources": response["sources"],
+                "page": item["page"]
+            }
+        if kind == "exercise":
+            return {"original_exercise": item, "adapted_exercise": response["answer"], "sources": response["sources"]}
+        if kind == "instruction":
+            return {"original_instruction": item, "adapted_instruction": response["answer"],
+                    "sources": response["sources"]}
+        if kind == "formatting":
+            return {"guide": response["answer"], "sources": response["sources"]}
+        return {"example_assessment": response["answer"], "sources": response["sources"]}
+    
+    def _add_step_result(self, adaptations: Dict[str, Any], kind: str, item: Any, response: Dict[str, Any]):
+        """Ranger la réponse d'un élément au bon endroit des adaptations"""
+        entry = self._step_entry(kind, item, response)
+        if kind == "introduction":
+            adaptations["general_adaptations"] = entry
+        elif kind == "section":
+            adaptations["adapted_sections"].append(entry)
+        elif kind == "exercise":
+            adaptations["exercise_adaptations"].append(entry)
+        elif kind == "instruction":
+            adaptations["instruction_adaptations"].append(entry)
+        elif kind == "formatting":
+            adaptations["formatting_recommendations"] = entry
+        elif kind == "assessment":
+            adaptations["assessment_adaptations"] = entry
+    
+    def generate_adaptations(self, course_content: Dict[str, Any], max_concurrency: int = None,
+                             batched: bool = None,
+                             checkpoint: Optional[AdaptationCheckpoint] = None,
+                             previous_edition: Optional[PreviousEdition] = None,
+                             on_result: Optional[Callable[[str, str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Générer les adaptations dyslexiques pour le cours
+        
+        Les étapes (introduction, sections, exercices, consignes, guide de mise
+        en forme, évaluation) sont indépendantes : elles sont exécutées en
+        parallèle, puis assemblées dans l'ordre d'origine. La durée de chaque
+        étape est enregistrée dans "step_timings".
+        
+        En mode lots (batched), toutes les sections, exercices et consignes sont
+        adaptés, regroupés en quelques appels à réponse JSON au lieu d'un appel
+        par élément limité aux 3 premiers.
+        
+        Avec un point de reprise, les étapes déjà terminées sont relues depuis le
+        disque et chaque nouvelle étape y est enregistrée dès qu'elle se termine.
+        
+        Avec l'adaptation de l'édition précédente (previous_edition), seules les
+        sections, exercices et consignes modifiés ou nouveaux sont envoyés au LLM.
+        
+        on_result est appelé pour chaque élément dès qu'il est prêt (écriture
+        progressive, voir adaptation_writer.py).
+        """
+        print(f"🔄 Génération des adaptations pour : {course_content['title']}")
+        
+        if max_concurrency is None:
+            max_concurrency = config.ADAPTATION_STEP_CONCURRENCY
+        if batched is None:
+            batched = config.ADAPTATION_BATCHED
+        
+        steps = self._build_steps(course_content, batched)
+        if checkpoint is not None and len(checkpoint):
+            print(f"   ♻️  {len(checkpoint)} étapes reprises du point de reprise")
+        
+        start = time.perf_counter()
+        responses = self._run_steps(steps, max_concurrency, checkpoint, previous_edition, on_result)
+        wall_seconds = time.perf_counter() - start
+        
+        adaptations = self._assemble_adaptations(course_content, steps, responses)
+        adaptations["step_timings"] = [{"step": step.key, "seconds": round(step.seconds, 2)} for step in steps]
+        adaptations["generation_seconds"] = round(wall_seconds, 2)
+        adaptations["failed_steps"] = [key for key, response in responses.items() if response.get("error")]
+        
+        if previous_edition is not None:
+            reused = sum(1 for response in responses.values() if response.get("reused"))
+            print(f"   ♻️  {reused}/{len(responses)} éléments repris de l'édition précédente")
+        
+        cached = [response for response in responses.values() if response.get("cached")]
+        if self.cache is not None and responses:
+            saved = sum(completion_cost(response.get("usage")) for response in cached)
+            print(f"   💾 Cache : {len(cached)}/{len(responses)} réponses réutilisées "
+                  f"({len(cached) / len(responses):.0%}), {saved:.2f} $ économisés")
+        
+        slowest = max(steps, key=lambda step: step.seconds)
+        print(f"   ⏱️  {len(steps)} étapes en {wall_seconds:.1f}s "
+              f"(la plus lente : {slowest.key} {slowest.seconds:.1f}s, "
+              f"cumul : {sum(step.seconds for step in steps):.1f}s)")
+        
+        return adaptations
+    
+    @staticmethod
+    def _output_filename(course_title: str) -> str:
+        return f"{course_title}_adapte_dyslexie"
+    
     def save_adaptations(self, adaptations: Dict[str, Any], output_format: str = "markdown"):
-        """Sauvegarder les adaptations dans un fichier"""
-        filename = f"{adaptations['course_title']}_adapte_dyslexie"
+        """Sauvegarder les adaptations dans un fichier
+        
+        C'est la passe finale de l'écriture progressive : le fichier est
+        réécrit dans l'ordre du cours, avec le sommaire et les métadonnées.
+        """
+        filename = self._output_filename(adaptations['course_title'])
         
         if output_format == "markdown":
             self._save_as_markdown(adaptations, filename)
@@ -291,6 +667,19 @@ CRÉE LA CONSIGNE ADAPTÉE:"""
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(f"# {adaptations['course_title']} - Version Adaptée aux Dyslexiques\n\n")
             f.write(f"*Version adaptée générée le {datetime.now().strftime('%d/%m/%Y à %H:%M')}*\n\n")
+            
+            # Sommaire
+            f.write("## Sommaire\n\n")
+            f.write("- Introduction\n")
+            f.write("- Contenu du Cours\n")
+            for i, section in enumerate(adaptations['adapted_sections'], 1):
+                f.write(f"  {i}. {section.get('adapted_title', section['original_title'])}\n")
+            if adaptations['exercise_adaptations']:
+                f.write(f"- Exercices ({len(adaptations['exercise_adaptations'])})\n")
+            if adaptations['instruction_adaptations']:
+                f.write(f"- Instructions et Consignes ({len(adaptations['instruction_adaptations'])})\n")
+            f.write("- Guide de Présentation\n")
+            f.write("- Exemple d'Évaluation Adaptée\n\n")
             f.write("---\n\n")
             
             # Introduction adaptée
@@ -378,17 +767,100 @@ CRÉE LA CONSIGNE ADAPTÉE:"""
             f.write("=" * 60 + "\n\n")
             f.write(f"Généré le {datetime.now().strftime('%d/%m/%Y à %H:%M')}\n\n")
             
-            f.write("ADAPTATIONS GÉNÉRALES :\n")
+            f.write("INTRODUCTION :\n")
+            f.write("-" * 25 + "\n")
+            f.write(adaptations['general_adaptations']['adapted_introduction'])
+            f.write("\n\n")
+            
+            for i, section in enumerate(adaptations['adapted_sections'], 1):
+                f.write(f"{i}. {section.get('adapted_title', section['original_title']).upper()}\n")
+                f.write("-" * 25 + "\n")
+                f.write(section['adapted_content'])
+                f.write("\n\n")
+            
+            for i, exercise in enumerate(adaptations['exercise_adaptations'], 1):
+                f.write(f"EXERCICE {i} :\n")
+                f.write("-" * 25 + "\n")
+                f.write(exercise['adapted_exercise'])
+                f.write("\n\n")
+            
+            for i, instruction in enumerate(adaptations['instruction_adaptations'], 1):
+                f.write(f"CONSIGNE {i} :\n")
+                f.write("-" * 25 + "\n")
+                f.write(instruction['adapted_instruction'])
+                f.write("\n\n")
+            
+            f.write("GUIDE DE PRÉSENTATION :\n")
             f.write("-" * 25 + "\n")
-            f.write(adaptations['general_adaptations']['recommendations'])
+            f.write(adaptations['formatting_recommendations']['guide'])
             f.write("\n\n")
             
-            # Continuer avec les autres sections...
+            f.write("EXEMPLE D'ÉVALUATION ADAPTÉE :\n")
+            f.write("-" * 25 + "\n")
+            f.write(adaptations['assessment_adaptations']['example_assessment'])
+            f.write("\n")
         
         print(f"✅ Adaptations sauvegardées : {filepath}")
     
-    def process_all_courses(self, output_format: str = "markdown"):
-        """Traiter tous les cours dans le répertoire pdf-cours"""
+    def process_course(self, pdf_file: Path, output_format: str = "markdown", batched: bool = None,
+                       resume: bool = False, previous_edition: Optional[PreviousEdition] = None) -> Dict[str, Any]:
+        """Adapter un cours et retourner son bilan (statut, durée, erreur éventuelle)
+        
+        Chaque étape terminée est enregistrée dans un point de reprise. Avec
+        resume, un cours déjà terminé (même PDF, même version des prompts) est
+        ignoré et un cours interrompu reprend là où il s'était arrêté.
+        
+        Le fichier de sortie est écrit au fil de l'eau (voir ProgressiveWriter) :
+        un cours interrompu laisse une sortie partielle lisible.
+        """
+        start = time.perf_counter()
+        result = {"course": pdf_file.name, "status": "ok", "seconds": 0.0, "error": None}
+        
+        try:
+            checkpoint = AdaptationCheckpoint.for_course(str(pdf_file), self.checkpoint_dir, PROMPT_VERSION, resume)
+            if resume and checkpoint.completed:
+                result["status"] = "déjà fait"
+                return result
+            
+            # Extraire le contenu
+            with span("pdf_parse"):
+                course_content = self.extract_course_content(str(pdf_file))
+            
+            writer = ProgressiveWriter(self.output_dir, self._output_filename(course_content["title"]),
+                                       course_content["title"], output_format)
+            writer.start()
+            
+            # Générer les adaptations (chaque élément est écrit dès qu'il est prêt)
+            adaptations = self.generate_adaptations(course_content, batched=batched, checkpoint=checkpoint,
+                                                    previous_edition=previous_edition, on_result=writer.add)
+            
+            # Sauvegarder (réécriture ordonnée, sommaire et métadonnées)
+            with span("write_output"):
+                self.save_adaptations(adaptations, output_format)
+                writer.finalize(adaptations)
+            
+            if adaptations["failed_steps"]:
+                result["status"] = "partiel"
+                result["error"] = f"{len(adaptations['failed_steps'])} étapes en échec (relancer avec --resume)"
+            else:
+                checkpoint.mark_completed()
+            
+        except Exception as e:
+            # L'échec d'un cours ne doit pas arrêter le lot
+            result["status"] = "erreur"
+            result["error"] = str(e)
+        
+        result["seconds"] = time.perf_counter() - start
+        return result
+    
+    def process_all_courses(self, output_format: str = "markdown", workers: int = None, batched: bool = None,
+                            resume: bool = False):
+        """Traiter tous les cours dans le répertoire pdf-cours
+        
+        Avec plusieurs workers, les cours sont adaptés en parallèle. Tous les
+        workers partagent le même DyslexiaRAG, donc le même budget de requêtes
+        et de tokens par minute (voir rate_limiter.py).
+        """
         courses_path = Path(self.courses_dir)
         
         if not courses_path.exists():
@@ -401,55 +873,233 @@ CRÉE LA CONSIGNE ADAPTÉE:"""
             print(f"❌ Aucun fichier PDF trouvé dans {self.courses_dir}")
             return
         
-        print(f"🚀 Traitement de {len(pdf_files)} cours...")
+        if workers is None:
+            workers = config.ADAPTATION_WORKERS
+        workers = max(1, min(workers, len(pdf_files)))
+        
+        print(f"🚀 Traitement de {len(pdf_files)} cours avec {workers} worker(s)...")
         print("=" * 60)
         
-        for i, pdf_file in enumerate(pdf_files, 1):
-            print(f"\n📚 Cours {i}/{len(pdf_files)} : {pdf_file.name}")
-            
-            try:
-                # Extraire le contenu
-                course_content = self.extract_course_content(str(pdf_file))
-                
-                # Générer les adaptations
-                adaptations = self.generate_adaptations(course_content)
-                
-                # Sauvegarder
-                self.save_adaptations(adaptations, output_format)
-                
-                print(f"✅ Cours {pdf_file.name} traité avec succès")
-                
-            except Exception as e:
-                print(f"❌ Erreur lors du traitement de {pdf_file.name}: {e}")
+        batch_start = time.perf_counter()
+        results = []
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self.process_course, pdf_file, output_format, batched, resume) for pdf_file in pdf_files]
+            with tqdm(total=len(futures), desc="Cours adaptés", unit="cours") as progress:
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    if result["status"] == "ok":
+                        tqdm.write(f"✅ Cours {result['course']} traité avec succès ({result['seconds']:.1f}s)")
+                    elif result["status"] == "déjà fait":
+                        tqdm.write(f"⏭️  Cours {result['course']} déjà adapté, ignoré")
+                    else:
+                        tqdm.write(f"❌ Erreur lors du traitement de {result['course']}: {result['error']}")
+                    progress.update(1)
         
+        self._print_batch_summary(results, time.perf_counter() - batch_start)
         print(f"\n🎉 Traitement terminé ! Résultats dans le dossier '{self.output_dir}'")
+        return results
+    
+    def _print_batch_summary(self, results: List[Dict[str, Any]], wall_seconds: float):
+        """Afficher le temps de chaque cours et le bilan du lot"""
+        print("\n📊 Résumé du traitement :")
+        print(f"   {'Cours':<45}{'Statut':>8}{'Durée':>10}")
+        for result in sorted(results, key=lambda r: r["seconds"], reverse=True):
+            print(f"   {result['course'][:44]:<45}{result['status']:>8}{result['seconds']:>9.1f}s")
+        
+        succeeded = sum(1 for r in results if r["status"] == "ok")
+        total_seconds = sum(r["seconds"] for r in results)
+        limiter_stats = self.rag_system.rate_limiter.get_stats()
+        print(f"\n   Réussis : {succeeded}/{len(results)}")
+        print(f"   Temps total : {wall_seconds:.1f}s (somme des cours : {total_seconds:.1f}s, "
+              f"gain ×{total_seconds / max(wall_seconds, 1e-9):.1f})")
+        print(f"   Attente due au limiteur de débit : {limiter_stats['wait_seconds']:.1f}s")
+        if self.cache is not None:
+            cache_stats = self.cache.get_stats()
+            print(f"   Cache : {cache_stats['hits']} réponses réutilisées ({cache_stats['hit_rate']:.0%}), "
+                  f"{cache_stats['dollars_saved']:.2f} $ économisés")
+        examples_stats = get_examples_provider().get_cache_stats()
+        print(f"   Exemples réels : {examples_stats['loads']} chargement(s) en {examples_stats['load_seconds']:.2f}s, "
+              f"{examples_stats['hits']} appels sans relecture")
+
+    def prepare_batch_job(self, job_dir: str, batched: bool = None) -> int:
+        """Écrire les requêtes de tous les cours dans un fichier batch du fournisseur
+        
+        Mode hors ligne pour les gros traitements (réadapter tous les cours la
+        nuit) : la recherche dans la base est faite maintenant, mais les appels
+        au modèle sont écrits dans job_dir/requests.jsonl au lieu d'être
+        envoyés. Ce fichier est à soumettre à l'API batch du fournisseur ;
+        ingest_batch_results termine ensuite le traitement.
+        
+        Les éléments déjà connus (point de reprise, cache) ne sont pas demandés.
+        Retourne le nombre de requêtes écrites.
+        """
+        if batched is None:
+            batched = config.ADAPTATION_BATCHED
+        pdf_files = sorted(Path(self.courses_dir).glob("*.pdf"))
+        if not pdf_files:
+            print(f"❌ Aucun fichier PDF trouvé dans {self.courses_dir}")
+            return 0
+        
+        with BatchJob.create(job_dir, "course_adaptation", batched=batched) as job:
+            for pdf_file in pdf_files:
+                checkpoint = AdaptationCheckpoint.for_course(str(pdf_file), self.checkpoint_dir, PROMPT_VERSION)
+                if checkpoint.completed:
+                    print(f"⏭️  Cours {pdf_file.name} déjà adapté, ignoré")
+                    continue
+                
+                course_content = self.extract_course_content(str(pdf_file))
+                for step in self._build_steps(course_content, batched):
+                    _, pending, cache_keys = self._lookup_step(step, checkpoint)
+                    if not pending:
+                        continue
+                    
+                    if step.batch is None:
+                        prepared = self.rag_system.prepare_query(step.build_query())
+                    elif len(pending) == 1:
+                        prepared = self.rag_system.prepare_query(
+                            self._single_query(step.kind, pending[0][1], self._batch_example(step)))
+                    else:
+                        prepared = self.rag_system.prepare_query(
+                            **self._batch_request_args(step.kind, pending, self._batch_example(step)))
+                    if prepared.get("error"):
+                        print(f"   ⚠️  {step.key} : aucune recherche pertinente, étape non demandée")
+                        continue
+                    
+                    job.add_request(
+                        f"{pdf_file.name}::{step.key}", CHAT_COMPLETIONS_URL, prepared["request"],
+                        course=str(pdf_file), course_hash=checkpoint.course_hash,
+                        items=[key for key, _ in pending], cache_keys=cache_keys,
+                        sources=self.rag_system.format_sources(prepared["search_results"])
+                    )
+        
+        print(f"📝 {len(job)} requêtes écrites dans {job.requests_path}")
+        print("   Soumettez ce fichier à l'API batch, puis relancez avec batch-ingest et le fichier de résultats.")
+        return len(job)
+    
+    def ingest_batch_results(self, job_dir: str, results_paths: List[str],
+                             output_format: str = "markdown") -> List[Dict[str, Any]]:
+        """Intégrer le fichier de résultats d'un job batch et écrire les cours adaptés
+        
+        Chaque réponse est enregistrée dans le cache et dans le point de reprise
+        du cours, puis le cours est terminé comme avec --resume : les éléments
+        absents des résultats (requêtes en échec, lots incomplets) sont adaptés
+        en direct.
+        """
+        job = BatchJob.open(job_dir, "course_adaptation")
+        results = read_batch_results(*results_paths)
+        
+        by_course: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+        for custom_id, request in job.manifest["requests"].items():
+            by_course.setdefault(request["course"], []).append((custom_id, request))
+        
+        summaries = []
+        for course, requests in by_course.items():
+            checkpoint = AdaptationCheckpoint.for_course(course, self.checkpoint_dir, PROMPT_VERSION)
+            if checkpoint.course_hash != requests[0][1]["course_hash"]:
+                print(f"⚠️  {Path(course).name} a changé depuis la préparation du job : résultats ignorés")
+                continue
+            
+            ingested, missing = 0, 0
+            for custom_id, request in requests:
+                response = chat_completion_result(results.get(custom_id))
+                if response.get("error"):
+                    missing += len(request["items"])
+                    continue
+                response["sources"] = request["sources"]
+                if len(request["items"]) > 1:
+                    responses = self._split_batch_response(response, request["items"])
+                else:
+                    responses = {request["items"][0]: response}
+                self._store_responses(responses, request["cache_keys"], checkpoint)
+                ingested += len(responses)
+                missing += len(request["items"]) - len(responses)
+            
+            print(f"📥 {Path(course).name} : {ingested} éléments intégrés"
+                  + (f", {missing} à adapter en direct" if missing else ""))
+            summaries.append(self.process_course(Path(course), output_format, job.manifest["batched"], resume=True))
+        
+        self._print_batch_summary(summaries, sum(result["seconds"] for result in summaries))
+        return summaries
 
 def main():
     """Point d'entrée principal"""
     import argparse
     
     parser = argparse.ArgumentParser(description="Adaptateur de Cours pour Dyslexiques")
+    parser.add_argument('command', nargs='?', choices=['watch', 'batch-prepare', 'batch-ingest'],
+                       help="watch : surveiller pdf-cours/ et adapter les nouveaux cours dès leur arrivée ; "
+                            "batch-prepare / batch-ingest : adaptation hors ligne via l'API batch")
     parser.add_argument('--format', choices=['markdown', 'json', 'text'], default='markdown',
                        help='Format de sortie (défaut: markdown)')
     parser.add_argument('--course', type=str, help='Traiter un cours spécifique (nom du fichier)')
+    parser.add_argument('--workers', type=int, default=config.ADAPTATION_WORKERS,
+                       help=f'Nombre de cours adaptés en parallèle (défaut: {config.ADAPTATION_WORKERS})')
+    parser.add_argument('--batched', action='store_true', default=config.ADAPTATION_BATCHED,
+                       help='Adapter tout le cours en regroupant plusieurs sections par appel')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Ne pas réutiliser les adaptations déjà en cache')
+    parser.add_argument('--previous-adaptation', type=str,
+                       help="Adaptation JSON de l'édition précédente du cours (avec --course) : "
+                            "les sections inchangées sont réutilisées")
+    parser.add_argument('--previous-source', type=str,
+                       help="PDF de l'édition précédente, pour aligner les sections des anciennes sorties JSON")
+    parser.add_argument('--resume', action='store_true',
+                       help='Reprendre un traitement interrompu (ignore les cours et étapes déjà terminés)')
+    parser.add_argument('--job-dir', type=str, default='batch-jobs/adaptation',
+                       help='Dossier du job batch (batch-prepare, batch-ingest)')
+    parser.add_argument('--results', type=str, nargs='+',
+                       help='Fichier(s) de résultats du fournisseur à intégrer (batch-ingest)')
+    parser.add_argument('--poll-interval', type=float, default=config.WATCH_POLL_SECONDS,
+                       help=f'Intervalle de surveillance en secondes (watch, défaut: {config.WATCH_POLL_SECONDS:g})')
+    parser.add_argument('--profile', action='store_true',
+                       help=f'Mesurer le temps passé par étape (tableau + fichier flame graph dans {config.PROFILE_DIR}/)')
+    parser.add_argument('--profile-cpu', action='store_true', help='Avec --profile : capture cProfile (.prof)')
+    parser.add_argument('--profile-memory', action='store_true', help='Avec --profile : capture tracemalloc')
     
     args = parser.parse_args()
     
-    adapter = CourseAdapter()
-    
-    if args.course:
-        # Traiter un cours spécifique
-        course_path = os.path.join(adapter.courses_dir, args.course)
-        if os.path.exists(course_path):
-            print(f"🎯 Traitement du cours spécifique : {args.course}")
-            course_content = adapter.extract_course_content(course_path)
-            adaptations = adapter.generate_adaptations(course_content)
-            adapter.save_adaptations(adaptations, args.format)
+    def run():
+        adapter = CourseAdapter(use_cache=not args.no_cache)
+        
+        if args.command == 'watch':
+            CourseWatcher(adapter, args.format, workers=args.workers, poll_seconds=args.poll_interval).run()
+        elif args.command == 'batch-prepare':
+            adapter.prepare_batch_job(args.job_dir, batched=args.batched)
+        elif args.command == 'batch-ingest':
+            if not args.results:
+                print("❌ Indiquez le fichier de résultats : --results <fichier.jsonl>")
+                return
+            adapter.ingest_batch_results(args.job_dir, args.results, args.format)
+        elif args.course:
+            # Traiter un cours spécifique
+            course_path = os.path.join(adapter.courses_dir, args.course)
+            if os.path.exists(course_path):
+                print(f"🎯 Traitement du cours spécifique : {args.course}")
+                previous_edition = None
+                if args.previous_adaptation:
+                    previous_content = adapter.extract_course_content(args.previous_source) if args.previous_source else None
+                    previous_edition = PreviousEdition(args.previous_adaptation, previous_content)
+                result = adapter.process_course(Path(course_path), args.format, batched=args.batched, resume=args.resume,
+                                                previous_edition=previous_edition)
+                if result["status"] == "déjà fait":
+                    print(f"⏭️  Cours {args.course} déjà adapté (relancer sans --resume pour le refaire)")
+                elif result["error"]:
+                    print(f"❌ Erreur lors du traitement de {args.course}: {result['error']}")
+            else:
+                print(f"❌ Cours {args.course} non trouvé dans {adapter.courses_dir}")
         else:
-            print(f"❌ Cours {args.course} non trouvé dans {adapter.courses_dir}")
+            if args.previous_adaptation:
+                print("⚠️  --previous-adaptation s'utilise avec --course : option ignorée")
+            # Traiter tous les cours
+            adapter.process_all_courses(args.format, workers=args.workers, batched=args.batched, resume=args.resume)
+    
+    if args.profile or args.profile_cpu or args.profile_memory:
+        run_profiled(args.command or "adapt", run, cpu=args.profile_cpu, memory=args.profile_memory,
+                     output_dir=config.PROFILE_DIR)
     else:
-        # Traiter tous les cours
-        adapter.process_all_courses(args.format)
+        run()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Surveillance du dossier des cours
+Adapte automatiquement les PDF déposés ou modifiés dans pdf-cours/
+"""
+
+import json
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import config
+
+Fingerprint = Tuple[int, int]  # (taille, mtime en ns)
+
+
+class CourseWatcher:
+    """
+    Démon qui adapte les cours au fur et à mesure de leur arrivée.
+
+    Le dossier est scruté toutes les WATCH_POLL_SECONDS secondes (un simple
+    os.scandir : seules la taille et la date de modification sont lues).
+    Un PDF nouveau ou modifié n'est mis en file qu'une fois stable pendant
+    WATCH_SETTLE_SECONDS, pour ne pas lire un fichier en cours de copie.
+
+    La file d'attente et l'empreinte des cours déjà traités sont enregistrées
+    (écriture atomique) dans WATCH_STATE_PATH : après un redémarrage, les cours
+    en attente ou interrompus sont repris, et les cours inchangés ne sont pas
+    refaits. Les cours sont adaptés avec resume=True, donc un cours interrompu
+    repart de son point de reprise.
+
+    Un cours en erreur ou partiel (échec passager de l'API) est remis en file
+    après WATCH_RETRY_SECONDS, au plus WATCH_MAX_RETRIES fois ; il reprend
+    alors de son point de reprise. Ce n'est qu'ensuite qu'il est mémorisé
+    comme traité, jusqu'à ce qu'il soit à nouveau déposé.
+    """
+    def __init__(self, adapter, output_format: str = "markdown", workers: int = None,
+                 poll_seconds: float = None, settle_seconds: float = None, state_path: str = None,
+                 max_retries: int = None, retry_seconds: float = None):
+        self.adapter = adapter
+        self.output_format = output_format
+        self.workers = max(1, workers or config.ADAPTATION_WORKERS)
+        self.poll_seconds = config.WATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self.settle_seconds = config.WATCH_SETTLE_SECONDS if settle_seconds is None else settle_seconds
+        self.state_path = state_path or config.WATCH_STATE_PATH
+        self.max_retries = config.WATCH_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_seconds = config.WATCH_RETRY_SECONDS if retry_seconds is None else retry_seconds
+
+        # [{"name", "fingerprint", "queued_at"}, plus "attempts" et "retry_at" (horodatage) pour une nouvelle tentative]
+        self.queue: List[Dict[str, Any]] = []
+        self.done: Dict[str, Dict[str, Any]] = {}  # nom -> {"fingerprint", "status", "finished_at"}
+        self._pending: Dict[str, Tuple[Fingerprint, float]] = {}  # nom -> (empreinte, stable depuis)
+        self._in_flight: Dict[str, Future] = {}
+        self._load_state()
+
+    def _load_state(self) -> None:
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  File d'attente illisible, recommencée : {self.state_path} ({e})")
+            return
+        self.queue = [dict(entry, fingerprint=tuple(entry["fingerprint"])) for entry in state.get("queue", [])]
+        self.done = {name: dict(entry, fingerprint=tuple(entry["fingerprint"]))
+                     for name, entry in state.get("done", {}).items()}
+        if self.queue:
+            print(f"♻️  {len(self.queue)} cours en attente repris de la session précédente")
+
+    def _save_state(self) -> None:
+        os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"queue": self.queue, "done": self.done}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def scan(self) -> Dict[str, Fingerprint]:
+        """Empreinte (taille, date de modification) de chaque PDF du dossier"""
+        fingerprints = {}
+        try:
+            with os.scandir(self.adapter.courses_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.name.lower().endswith(".pdf"):
+                        stat = entry.stat()
+                        fingerprints[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return fingerprints
+
+    def _enqueue_ready(self, fingerprints: Dict[str, Fingerprint], now: float) -> None:
+        """Mettre en file les PDF nouveaux ou modifiés restés stables assez longtemps"""
+        queued = {entry["name"]: entry["fingerprint"] for entry in self.queue}
+        changed = False
+
+        for name, fingerprint in fingerprints.items():
+            if self.done.get(name, {}).get("fingerprint") == fingerprint or queued.get(name) == fingerprint:
+                self._pending.pop(name, None)
+                continue
+            previous = self._pending.get(name)
+            if previous is None or previous[0] != fingerprint:
+                # Nouveau fichier, ou encore en cours d'écriture : relancer le délai
+                self._pending[name] = (fingerprint, now)
+                continue
+            if now - previous[1] >= self.settle_seconds and name not in self._in_flight:
+                # (un cours modifié pendant son adaptation attend la fin de celle-ci)
+                del self._pending[name]
+                # Une version plus ancienne encore en file est remplacée
+                self.queue = [entry for entry in self.queue if entry["name"] != name]
+                self.queue.append({"name": name, "fingerprint": fingerprint,
+                                   "queued_at": datetime.now().isoformat()})
+                print(f"📥 Nouveau cours en file : {name}")
+                changed = True
+
+        # Fichiers supprimés avant leur stabilisation
+        for name in list(self._pending):
+            if name not in fingerprints:
+                del self._pending[name]
+
+        if changed:
+            self._save_state()
+
+    def _collect_finished(self, fingerprints: Dict[str, Fingerprint]) -> None:
+        """Retirer de la file les cours terminés et mémoriser leur empreinte"""
+        for name, future in list(self._in_flight.items()):
+            if not future.done():
+                continue
+            del self._in_flight[name]
+            entry = next(entry for entry in self.queue if entry["name"] == name)
+            self.queue.remove(entry)
+
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"status": "erreur", "error": str(e), "seconds": 0.0}
+            if fingerprints.get(name) not in (None, entry["fingerprint"]):
+                print(f"🔁 {name} a changé pendant son adaptation : il sera refait")
+            elif result["status"] not in ("ok", "déjà fait") and entry.get("attempts", 0) < self.max_retries:
+                attempts = entry.get("attempts", 0) + 1
+                print(f"⚠️  Cours {name} : {result['error']} (nouvelle tentative {attempts}/{self.max_retries} "
+                      f"dans {self.retry_seconds:g}s)")
+                self.queue.append(dict(entry, attempts=attempts, retry_at=time.time() + self.retry_seconds))
+                self._save_state()
+                continue
+
+            if result["status"] in ("ok", "déjà fait"):
+                print(f"✅ Cours {name} adapté ({result['seconds']:.1f}s)")
+            else:
+                print(f"❌ Cours {name} : {result['error']} (sera refait s'il est à nouveau déposé)")
+
+            self.done[name] = {"fingerprint": entry["fingerprint"], "status": result["status"],
+                               "finished_at": datetime.now().isoformat()}
+            self._save_state()
+
+    def _submit_queued(self, executor: ThreadPoolExecutor, fingerprints: Dict[str, Fingerprint]) -> None:
+        """Lancer les cours en file, sans dépasser le nombre de workers"""
+        for entry in list(self.queue):
+            if len(self._in_flight) >= self.workers:
+                break
+            name = entry["name"]
+            if name in self._in_flight or entry.get("retry_at", 0) > time.time():
+                continue
+            if fingerprints.get(name) != entry["fingerprint"]:
+                # Supprimé ou modifié depuis sa mise en file : le scan le reprendra s'il existe encore
+                self.queue.remove(entry)
+                self._save_state()
+                continue
+            print(f"🚀 Adaptation de {name}...")
+            self._in_flight[name] = executor.submit(
+                self.adapter.process_course, Path(self.adapter.courses_dir) / name, self.output_format,
+                None, True
+            )
+
+    def run_once(self, executor: ThreadPoolExecutor, now: Optional[float] = None) -> None:
+        """Un cycle de surveillance : scan, mise en file, bilan des cours finis, lancement"""
+        fingerprints = self.scan()
+        self._collect_finished(fingerprints)
+        self._enqueue_ready(fingerprints, time.monotonic() if now is None else now)
+        self._submit_queued(executor, fingerprints)
+
+    def run(self) -> None:
+        """Surveiller le dossier jusqu'à Ctrl+C"""
+        print(f"👀 Surveillance de {self.adapter.courses_dir} "
+              f"(toutes les {self.poll_seconds:g}s, {self.workers} worker(s)) - Ctrl+C pour arrêter")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                while True:
+                    self.run_once(executor)
+                    time.sleep(self.poll_seconds)
+            except KeyboardInterrupt:
+                print("\n⏹️  Arrêt demandé : fin des cours en cours d'adaptation "
+                      f"({len(self._in_flight)}), la file est conservée")
+                executor.shutdown(wait=True)
+                self._collect_finished(self.scan())
@@ -0,0 +1,204 @@
+import hashlib
+import re
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from config import config
+from chunk_store import ChunkSequence, ChunkStore
+
+
+# Largest 64-bit value, used to mark empty MinHash bins before densification
+_EMPTY_BIN = (1 << 64) - 1
+
+
+@dataclass
+class DeduplicationReport:
+    """Summary of a near-duplicate detection pass"""
+    total_chunks: int = 0
+    unique_chunks: int = 0
+    duplicates_removed: int = 0
+    multi_source_vectors: int = 0
+    characters_saved: int = 0
+    merged_sources: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def embeddings_saved(self) -> int:
+        """Embedding requests avoided (one per collapsed chunk)"""
+        return self.duplicates_removed
+
+    @property
+    def index_entries_saved(self) -> int:
+        """Vectors that will not be written to the index"""
+        return self.duplicates_removed
+
+    @property
+    def index_bytes_saved(self) -> int:
+        """Approximate raw vector storage avoided (float32 values)"""
+        return self.duplicates_removed * config.EMBEDDING_DIMENSION * 4
+
+    def print_summary(self) -> None:
+        print("🧹 Détection des quasi-doublons :")
+        print(f"   • Segments analysés : {self.total_chunks}")
+        print(f"   • Segments uniques : {self.unique_chunks}")
+        print(f"   • Embeddings économisés : {self.embeddings_saved}")
+        print(f"   • Entrées d'index économisées : {self.index_entries_saved} "
+              f"(~{self.index_bytes_saved / 1024 / 1024:.1f} Mo)")
+        print(f"   • Vecteurs multi-sources : {self.multi_source_vectors}")
+
+
+class ChunkDeduplicator:
+    """
+    Near-duplicate detection for document chunks before embedding.
+
+    Each chunk is summarised by a MinHash signature over word shingles. The
+    signature is computed with one-permutation hashing: every shingle is hashed
+    once and routed to one of ``num_perm`` bins, which keeps the cost linear in
+    the chunk length instead of ``num_perm`` hashes per shingle. Signatures are
+    split into LSH bands so that only chunks sharing at least one band bucket
+    are compared.
+
+    Chunks are processed in order; a chunk whose estimated Jaccard similarity
+    with an already kept chunk reaches the threshold is collapsed into it and
+    its source is added to the kept chunk's ``duplicate_sources``.
+
+    Attributes:
+        threshold: Minimum estimated Jaccard similarity to collapse two chunks
+        num_perm: Number of MinHash bins in each signature
+        bands: Number of LSH bands (must divide num_perm)
+        shingle_size: Number of consecutive words per shingle
+    """
+    def __init__(self, threshold: float = None, num_perm: int = None,
+                 bands: int = None, shingle_size: int = None) -> None:
+        self.threshold = config.DEDUP_THRESHOLD if threshold is None else threshold
+        self.num_perm = config.MINHASH_NUM_PERM if num_perm is None else num_perm
+        self.bands = config.LSH_BANDS if bands is None else bands
+        self.shingle_size = config.SHINGLE_SIZE if shingle_size is None else shingle_size
+
+        if self.num_perm % self.bands != 0:
+            raise ValueError(f"num_perm ({self.num_perm}) doit être un multiple de bands ({self.bands})")
+        self.rows = self.num_perm // self.bands
+
+    @staticmethod
+    def _normalize(text: str) -> List[str]:
+        """Lowercase and strip punctuation so layout differences do not count"""
+        return re.findall(r"\w+", text.lower())
+
+    def _shingle_hashes(self, text: str) -> List[int]:
+        """Hash every word shingle of the text to a 64-bit integer"""
+        words = self._normalize(text)
+        if len(words) < self.shingle_size:
+            shingles = [" ".join(words)] if words else []
+        else:
+            shingles = {
+                " ".join(words[i:i + self.shingle_size])
+                for i in range(len(words) - self.shingle_size + 1)
+            }
+
+        return [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+            for s in shingles
+        ]
+
+    def signature(self, text: str) -> array:
+        """Compute the one-permutation MinHash signature of a text"""
+        bins = [_EMPTY_BIN] * self.num_perm
+        for h in self._shingle_hashes(text):
+            b = h % self.num_perm
+            value = h // self.num_perm
+            if value < bins[b]:
+                bins[b] = value
+
+        # Densification: empty bins borrow the value of the next non-empty bin
+        # (with an offset per hop) so that every band stays comparable.
+        if all(v == _EMPTY_BIN for v in bins):
+            return array("Q", bins)
+        for b in range(self.num_perm):
+            if bins[b] == _EMPTY_BIN:
+                hop = 1
+                while bins[(b + hop) % self.num_perm] == _EMPTY_BIN:
+                    hop += 1
+                bins[b] = bins[(b + hop) % self.num_perm] + hop
+
+        # Stored as uint64 arrays: ~1 KB per chunk instead of a tuple of ints
+        return array("Q", bins)
+
+    def similarity(self, sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+        """Estimate the Jaccard similarity of two signatures"""
+        matches = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return matches / self.num_perm
+
+    def band_keys(self, sig: Sequence[int]) -> List[Tuple[int, Tuple[int, ...]]]:
+        """Split a signature into (band, rows) keys for LSH bucketing"""
+        return [
+            (band, tuple(sig[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def deduplicate(self, chunks: ChunkSequence) -> Tuple[ChunkSequence, DeduplicationReport]:
+        """
+        Collapse near-duplicate chunks into a single representative.
+
+        Args:
+            chunks: Chunks in ingestion order (list of DocumentChunk or ChunkStore)
+
+        Returns:
+            Tuple of the kept chunks (in original order, same container type as
+            the input) and a report of the embeddings and index entries saved
+        """
+        report = DeduplicationReport(total_chunks=len(chunks))
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+        kept_indices: List[int] = []
+        kept_sources: List[str] = []
+        extra_sources: Dict[int, List[str]] = {}
+        signatures: List[array] = []
+
+        for position, chunk in enumerate(chunks):
+            sig = self.signature(chunk.text)
+            keys = self.band_keys(sig)
+
+            # Candidates are kept chunks sharing at least one band bucket
+            candidates = set()
+            for key in keys:
+                candidates.update(buckets.get(key, ()))
+
+            best_index, best_score = -1, 0.0
+            for index in candidates:
+                score = self.similarity(sig, signatures[index])
+                if score > best_score:
+                    best_index, best_score = index, score
+
+            if best_index >= 0 and best_score >= self.threshold:
+                merged = extra_sources.setdefault(best_index, [])
+                if chunk.source != kept_sources[best_index] and chunk.source not in merged:
+                    merged.append(chunk.source)
+                report.duplicates_removed += 1
+                report.characters_saved += len(chunk.text)
+                continue
+
+            index = len(kept_indices)
+            kept_indices.append(position)
+            kept_sources.append(chunk.source)
+            signatures.append(sig)
+            for key in keys:
+                buckets.setdefault(key, []).append(index)
+
+        # Rebuild the output in the input's container type, attaching merged sources
+        kept = ChunkStore() if isinstance(chunks, ChunkStore) else []
+        for index, position in enumerate(kept_indices):
+            chunk = chunks[position]
+            for source in extra_sources.get(index, ()):
+                if source not in chunk.duplicate_sources:
+                    chunk.duplicate_sources.append(source)
+            if chunk.duplicate_sources:
+                report.multi_source_vectors += 1
+                report.merged_sources[chunk.chunk_id] = [chunk.source] + chunk.duplicate_sources
+            kept.append(chunk)
+
+        report.unique_chunks = len(kept)
+        return kept, report
+
+
+def deduplicate_chunks(chunks: ChunkSequence) -> Tuple[ChunkSequence, DeduplicationReport]:
+    """Run near-duplicate detection with the configured parameters"""
+    return ChunkDeduplicator().deduplicate(chunks)
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Réadaptation incrémentale des nouvelles éditions d'un cours
+Réutilise les adaptations des sections inchangées depuis l'édition précédente
+"""
+
+import difflib
+import hashlib
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from config import config
+
+
+def normalize_content(text: str) -> str:
+    """Normaliser les espaces pour que la mise en page du PDF ne compte pas comme un changement"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def content_hash(text: str) -> str:
+    """Empreinte du contenu normalisé d'une section, d'un exercice ou d'une consigne"""
+    return hashlib.sha1(normalize_content(text).encode('utf-8')).hexdigest()
+
+
+class PreviousEdition:
+    """
+    Adaptation sauvegardée (JSON) de l'édition précédente d'un cours.
+
+    Les éléments de la nouvelle édition sont alignés avec ceux de l'ancienne :
+    - par empreinte exacte du contenu normalisé (champ "original_content_hash"
+      des sorties JSON récentes, ou recalculé depuis l'ancien PDF) ;
+    - sinon, si l'ancien PDF est fourni, par similarité de texte (difflib)
+      au-dessus de EDITION_REUSE_THRESHOLD, pour les corrections mineures.
+
+    Un élément aligné réutilise le texte adapté de l'édition précédente et ne
+    repasse pas par le LLM.
+    """
+    def __init__(self, adaptation_path: str, previous_content: Optional[Dict[str, Any]] = None,
+                 similarity_threshold: float = None):
+        with open(adaptation_path, 'r', encoding='utf-8') as f:
+            self.adaptations = json.load(f)
+        self.similarity_threshold = (config.EDITION_REUSE_THRESHOLD
+                                     if similarity_threshold is None else similarity_threshold)
+
+        # kind -> {empreinte: réponse réutilisable}
+        self.by_hash: Dict[str, Dict[str, Dict[str, Any]]] = {"section": {}, "exercise": {}, "instruction": {}}
+        # Sections de l'ancienne édition dont le texte complet est connu (pour la similarité)
+        self.previous_sections: List[tuple] = []
+        self.reused = 0
+        self._lock = threading.Lock()
+
+        self._index_sections(previous_content)
+        for entry in self.adaptations.get("exercise_adaptations", []):
+            self.by_hash["exercise"][content_hash(entry["original_exercise"])] = {
+                "answer": entry["adapted_exercise"], "sources": entry.get("sources", [])
+            }
+        for entry in self.adaptations.get("instruction_adaptations", []):
+            self.by_hash["instruction"][content_hash(entry["original_instruction"])] = {
+                "answer": entry["adapted_instruction"], "sources": entry.get("sources", [])
+            }
+
+    def _index_sections(self, previous_content: Optional[Dict[str, Any]]):
+        # Retrouver le contenu complet de chaque section adaptée dans l'ancien PDF
+        # (le JSON ne garde qu'un aperçu de 200 caractères)
+        full_texts = {}
+        if previous_content:
+            for section in previous_content["sections"]:
+                full_texts.setdefault((section["title"], section["content"][:200] + "..."), section["content"])
+
+        for entry in self.adaptations.get("adapted_sections", []):
+            response = {"answer": entry["adapted_content"], "sources": entry.get("sources", [])}
+            full_text = full_texts.get((entry["original_title"], entry["original_content_preview"]))
+
+            if entry.get("original_content_hash"):
+                self.by_hash["section"][entry["original_content_hash"]] = response
+            elif full_text is not None:
+                self.by_hash["section"][content_hash(full_text)] = response
+
+            if full_text is not None:
+                self.previous_sections.append((normalize_content(full_text), response))
+
+    def find(self, kind: str, item: Any) -> Optional[Dict[str, Any]]:
+        """Retourner l'adaptation réutilisable d'un élément inchangé, ou None"""
+        text = item["content"] if kind == "section" else item
+        response = self.by_hash.get(kind, {}).get(content_hash(text))
+
+        if response is None and kind == "section" and self.previous_sections:
+            normalized = normalize_content(text)
+            matcher = difflib.SequenceMatcher(autojunk=False)
+            matcher.set_seq2(normalized)
+            best_ratio = 0.0
+            for previous_text, previous_response in self.previous_sections:
+                matcher.set_seq1(previous_text)
+                # quick_ratio est une borne supérieure bon marché : inutile d'aller plus loin en dessous du seuil
+                if matcher.quick_ratio() < self.similarity_threshold:
+                    continue
+                ratio = matcher.ratio()
+                if ratio >= self.similarity_threshold and ratio > best_ratio:
+                    best_ratio, response = ratio, previous_response
+
+        if response is None:
+            return None
+        with self._lock:
+            self.reused += 1
+        return {**response, "reused": True}
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Embedding dimension evaluation
+Measures how much retrieval changes when stored embeddings are shortened (see EMBEDDING_DIMENSION)
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import time
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from config import config
+
+DEFAULT_DIMENSIONS = (128, 256, 512, 768, 1024, 1536)
+
+
+def reduce_matrix(vectors: np.ndarray, dimension: int) -> np.ndarray:
+    """Row-wise reduce_embedding: keep the first dimensions and re-normalize"""
+    head = vectors[:, :dimension]
+    norms = np.linalg.norm(head, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return head / norms
+
+
+def top_k_indices(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k most similar corpus rows for each query, best first"""
+    scores = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, best, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(best, order, axis=1)
+
+
+def dimension_recall(corpus: np.ndarray, queries: np.ndarray, dimensions: Sequence[int],
+                     k: int) -> List[Dict[str, float]]:
+    """
+    Compare the top-k results at each reduced dimension with the full-dimension top-k.
+
+    Args:
+        corpus: Full-dimension embeddings of the indexed chunks (one row each)
+        queries: Full-dimension embeddings of the evaluation questions
+        dimensions: Reduced dimensions to evaluate
+        k: Number of results per query (TOP_K_RESULTS in production)
+
+    Returns:
+        One row per dimension with recall@k (share of the full top-k found),
+        top-1 agreement, index size in MB and mean search time per query
+    """
+    full_dimension = corpus.shape[1]
+    reference = top_k_indices(reduce_matrix(corpus, full_dimension), reduce_matrix(queries, full_dimension), k)
+    rows = []
+    for dimension in sorted(set(min(d, full_dimension) for d in dimensions)):
+        reduced_corpus = reduce_matrix(corpus, dimension).astype(np.float32)
+        reduced_queries = reduce_matrix(queries, dimension).astype(np.float32)
+
+        start = time.perf_counter()
+        found = top_k_indices(reduced_corpus, reduced_queries, k)
+        elapsed = time.perf_counter() - start
+
+        overlap = [len(set(a) & set(b)) / len(a) for a, b in zip(reference, found)]
+        rows.append({
+            "dimension": dimension,
+            "recall_at_k": float(np.mean(overlap)),
+            "top1_agreement": float(np.mean(reference[:, 0] == found[:, 0])),
+            "index_mb": corpus.shape[0] * dimension * 4 / 1024 / 1024,
+            "search_ms": elapsed / len(queries) * 1000
+        })
+    return rows
+
+
+def load_or_embed(texts: List[str], cache_dir: str, name: str) -> np.ndarray:
+    """Full-dimension embeddings of texts, cached on disk so the evaluation can be re-run for free"""
+    digest = hashlib.sha1("\n".join([config.EMBEDDING_MODEL] + texts).encode('utf-8')).hexdigest()[:12]
+    cache_path = os.path.join(cache_dir, f"{name}-{digest}.npy")
+    if os.path.exists(cache_path):
+        cached = np.load(cache_path)
+        if cached.shape == (len(texts), config.EMBEDDING_MODEL_DIMENSION):
+            return cached
+
+    from vector_store import VectorStore
+    vectors = np.asarray(
+        VectorStore().batch_generate_embeddings(texts, dimension=config.EMBEDDING_MODEL_DIMENSION),
+        dtype=np.float32
+    )
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(cache_path, vectors)
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Évaluer le rappel des embeddings réduits face à la dimension complète")
+    parser.add_argument('--questions', help="Fichier de questions (une par ligne ; défaut : questions d'exemple)")
+    parser.add_argument('--sample', type=int, default=2000, help='Nombre de segments de recherche évalués (défaut: 2000)')
+    parser.add_argument('--dimensions', type=int, nargs='+', default=list(DEFAULT_DIMENSIONS))
+    parser.add_argument('--k', type=int, default=config.TOP_K_RESULTS, help='Résultats par requête')
+    parser.add_argument('--cache-dir', default="eval/embeddings", help='Cache des embeddings complets')
+    args = parser.parse_args()
+
+    from main import EXAMPLE_QUESTIONS, load_research_chunks, read_questions
+
+    if args.questions:
+        with open(args.questions, 'r', encoding='utf-8') as f:
+            questions = read_questions(f)
+    else:
+        questions = EXAMPLE_QUESTIONS
+
+    chunks, _ = load_research_chunks()
+    if chunks is None:
+        return
+    positions = list(range(len(chunks)))
+    random.Random(0).shuffle(positions)
+    texts = [chunks[i].text for i in sorted(positions[:args.sample])]
+
+    print(f"\n🧮 Embeddings complets ({config.EMBEDDING_MODEL_DIMENSION} dimensions) : "
+          f"{len(texts)} segments, {len(questions)} questions")
+    corpus = load_or_embed(texts, args.cache_dir, "corpus")
+    queries = load_or_embed(questions, args.cache_dir, "questions")
+
+    print(f"\n📊 Rappel@{args.k} par rapport à {config.EMBEDDING_MODEL_DIMENSION} dimensions :")
+    print(f"   {'Dimension':>9}  {'Rappel@k':>9}  {'Top-1 identique':>15}  {'Index (Mo)':>10}  {'Recherche (ms)':>14}")
+    for row in dimension_recall(corpus, queries, args.dimensions, args.k):
+        print(f"   {row['dimension']:>9}  {row['recall_at_k']:>9.3f}  {row['top1_agreement']:>15.3f}  "
+              f"{row['index_mb']:>10.1f}  {row['search_ms']:>14.3f}")
+    print(f"\n💡 Dimension actuelle : EMBEDDING_DIMENSION = {config.EMBEDDING_DIMENSION}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Évaluation de la recherche documentaire
+Mesure rappel@k, MRR, taille d'index, tokens d'embedding et latence sur un jeu de questions de référence,
+pour les réglages actuels ou pour une grille de réglages (--sweep), avec la frontière de Pareto
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import fitz  # PyMuPDF
+import numpy as np
+import tiktoken
+
+from config import config
+from eval_embedding_dimensions import reduce_matrix, top_k_indices
+from pdf_processor import DocumentChunk, PDFProcessor, summary_chunks
+from text_utils import tokenize
+
+Page = Tuple[Dict[str, str], int, str]
+
+
+def load_golden_set(path: str) -> List[Dict]:
+    """Questions de référence : une ligne JSON {"question", "expected": [{"source", "page"}]}
+
+    La page est facultative : sans elle, tout segment de la source compte.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_pages(pdf_directory: str) -> List[Page]:
+    """Texte de chaque page des PDFs de recherche, lu une seule fois pour tous les réglages"""
+    processor = PDFProcessor()
+    pages = []
+    for pdf_file in sorted(Path(pdf_directory).rglob("*.pdf")):
+        metadata = processor.extract_metadata(str(pdf_file))
+        doc = fitz.open(str(pdf_file))
+        for page_num in range(len(doc)):
+            text = doc[page_num].get_text()
+            if text.strip():
+                pages.append((metadata, page_num + 1, text))
+        doc.close()
+    return pages
+
+
+def build_chunks(pages: List[Page], chunk_size: int, chunk_overlap: int) -> List[DocumentChunk]:
+    """Découpage identique à PDFProcessor.process_pdf, avec d'autres paramètres"""
+    processor = PDFProcessor()
+    processor.chunk_size = chunk_size
+    processor.chunk_overlap = chunk_overlap
+    chunks = []
+    for metadata, page_num, text in pages:
+        chunks.extend(processor._chunk_text_by_structure(text, metadata, page_num))
+    return chunks
+
+
+def hashed_embeddings(texts: Sequence[str], dimension: int = None) -> np.ndarray:
+    """
+    Embeddings locaux, sans réseau : hachage des mots et paires de mots.
+
+    Chaque terme (accents pliés, mots vides retirés) est envoyé dans une case
+    du vecteur avec un signe, tous deux tirés de son CRC32 (stable d'une
+    exécution à l'autre), avec un poids 1 + log(tf). Ce n'est qu'un substitut
+    lexical des embeddings du modèle : il sert à comparer les découpages hors
+    ligne, pas les dimensions réduites (ses dimensions ne sont pas ordonnées).
+    """
+    dimension = dimension or config.EMBEDDING_MODEL_DIMENSION
+    vectors = np.zeros((len(texts), dimension), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = tokenize(text)
+        counts: Dict[int, int] = {}
+        for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            code = zlib.crc32(term.encode('utf-8'))
+            counts[code] = counts.get(code, 0) + 1
+        for code, count in counts.items():
+            sign = 1.0 if code & 0x80000000 else -1.0
+            vectors[row, code % dimension] += sign * (1 + math.log(count))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class OpenAIEmbeddings:
+    """Embeddings du modèle à la dimension complète, calculés une fois par texte pendant l'évaluation"""
+    def __init__(self):
+        from vector_store import VectorStore
+        self.vector_store = VectorStore()
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        keys = [hashlib.sha1(text.encode('utf-8')).hexdigest() for text in texts]
+        missing = [i for i, key in enumerate(keys) if key not in self._cache]
+        if missing:
+            vectors = self.vector_store.batch_generate_embeddings(
+                [texts[i] for i in missing], dimension=config.EMBEDDING_MODEL_DIMENSION
+            )
+            for i, vector in zip(missing, vectors):
+                self._cache[keys[i]] = np.asarray(vector, dtype=np.float32)
+        return np.vstack([self._cache[key] for key in keys])
+
+
+def group_members(summaries: List[DocumentChunk], chunks: List[DocumentChunk]) -> np.ndarray:
+    """Matrice (résumés × segments) : le segment fait-il partie du document ou de la section résumé ?
+
+    Même règle que le filtre de VectorStore._coarse_filter.
+    """
+    positions: Dict[Tuple[str, str], List[int]] = {}
+    for position, chunk in enumerate(chunks):
+        positions.setdefault((chunk.source, chunk.section), []).append(position)
+        for source in [chunk.source] + chunk.duplicate_sources:
+            positions.setdefault((source, ""), []).append(position)
+    members = np.zeros((len(summaries), len(chunks)), dtype=bool)
+    for row, summary in enumerate(summaries):
+        members[row, positions.get((summary.source, summary.section), [])] = True
+    return members
+
+
+def hierarchical_top_k(corpus: np.ndarray, queries: np.ndarray, summaries: np.ndarray, members: np.ndarray,
+                       groups: int, k: int) -> Tuple[np.ndarray, float]:
+    """Recherche en deux temps : les meilleurs résumés, puis les segments de leurs groupes
+
+    Returns:
+        Les indices des k meilleurs segments candidats par requête (-1 s'il y en a
+        moins de k) et le nombre moyen de segments candidats
+    """
+    selected = top_k_indices(summaries, queries, groups)
+    allowed = members[selected].any(axis=1)
+    scores = np.where(allowed, queries @ corpus.T, -np.inf)
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    found = np.where(np.take_along_axis(allowed, order, axis=1), order, -1)
+    return found, float(allowed.sum(axis=1).mean())
+
+
+def evaluate_chunking(chunks: List[DocumentChunk], golden: List[Dict], embed: Callable[[Sequence[str]], np.ndarray],
+                      dimensions: Sequence[int], top_ks: Sequence[int],
+                      count_tokens: Callable[[str], int], hierarchical: bool = False) -> List[Dict]:
+    """
+    Scores d'un découpage pour chaque dimension et chaque top_k.
+
+    Le corpus est embarqué une fois à la dimension complète puis réduit pour
+    chaque dimension (voir reduce_embedding). Une recherche par dimension
+    renvoie max(top_ks) résultats ; les top_k plus petits en sont les préfixes.
+    En mode hiérarchique, les résumés de documents et de sections comptent dans
+    la taille d'index et les tokens d'embedding.
+    """
+    indexed = chunks + (summary_chunks(chunks) if hierarchical else [])
+    vectors = embed([chunk.text for chunk in indexed])
+    corpus, summaries = vectors[:len(chunks)], vectors[len(chunks):]
+    members = group_members(indexed[len(chunks):], chunks) if hierarchical else None
+    queries = embed([item["question"] for item in golden])
+    embedding_tokens = sum(count_tokens(chunk.text) for chunk in indexed)
+    metadata_bytes = sum(len(chunk.text.encode('utf-8')) for chunk in indexed)
+    locations = [(chunk.source, chunk.page_number) for chunk in chunks]
+
+    rows = []
+    for dimension in dimensions:
+        reduced_corpus = reduce_matrix(corpus, dimension)
+        reduced_queries = reduce_matrix(queries, dimension)
+        start = time.perf_counter()
+        if hierarchical:
+            results, candidates = hierarchical_top_k(reduced_corpus, reduced_queries,
+                                                     reduce_matrix(summaries, dimension), members,
+                                                     config.HIERARCHICAL_TOP_GROUPS, max(top_ks))
+        else:
+            results, candidates = top_k_indices(reduced_corpus, reduced_queries, max(top_ks)), len(chunks)
+        search_ms = (time.perf_counter() - start) / len(golden) * 1000
+
+        for top_k in top_ks:
+            recalls, reciprocal_ranks = [], []
+            for item, found in zip(golden, results[:, :top_k]):
+                expected = [(e["source"], e.get("page")) for e in item["expected"]]
+
+                def relevant(position: int, target: Tuple[str, int]) -> bool:
+                    if position < 0:
+                        return False
+                    source, page = locations[position]
+                    return source == target[0] and (target[1] is None or page == target[1])
+
+                recalls.append(sum(any(relevant(p, target) for p in found) for target in expected) / len(expected))
+                rank = next((r for r, p in enumerate(found, 1) if any(relevant(p, t) for t in expected)), None)
+                reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+            rows.append({
+                "dimension": dimension,
+                "top_k": top_k,
+                "chunks": len(chunks),
+                "candidates": candidates,
+                "sources": float(np.mean([len({locations[p][0] for p in found if p >= 0})
+                                          for found in results[:, :top_k]])),
+                "recall_at_k": float(np.mean(recalls)),
+                "mrr": float(np.mean(reciprocal_ranks)),
+                # Vecteurs float32 + texte stocké en métadonnées (comme dans Pinecone)
+                "index_mb": (len(indexed) * dimension * 4 + metadata_bytes) / 1024 / 1024,
+                "embedding_tokens": embedding_tokens,
+                "search_ms": search_ms
+            })
+    return rows
+
+
+def pareto_frontier(rows: List[Dict], maximize: Sequence[str] = ("recall_at_k", "mrr"),
+                    minimize: Sequence[str] = ("top_k", "index_mb", "embedding_tokens", "search_ms")) -> List[Dict]:
+    """Réglages qu'aucun autre ne bat sur tous les critères à la fois
+
+    top_k compte comme un coût : chaque segment retrouvé allonge le contexte envoyé au modèle.
+    """
+    def dominates(a: Dict, b: Dict) -> bool:
+        at_least = all(a[m] >= b[m] for m in maximize) and all(a[m] <= b[m] for m in minimize)
+        better = any(a[m] > b[m] for m in maximize) or any(a[m] < b[m] for m in minimize)
+        return at_least and better
+
+    return [row for row in rows if not any(dominates(other, row) for other in rows if other is not row)]
+
+
+def print_rows(rows: List[Dict], frontier: List[Dict]) -> None:
+    print(f"   {'':2}{'Segment':>8}{'Recouv.':>8}{'Dim.':>6}{'k':>4}{'Segments':>10}{'Candidats':>11}"
+          f"{'Rappel@k':>10}{'MRR':>7}{'Sources':>9}{'Index (Mo)':>12}{'Tokens':>10}{'Recherche (ms)':>16}")
+    for row in rows:
+        mark = "★ " if any(row is best for best in frontier) else "  "
+        print(f"   {mark}{row['chunk_size']:>8}{row['chunk_overlap']:>8}{row['dimension']:>6}{row['top_k']:>4}"
+              f"{row['chunks']:>10}{row['candidates']:>11.0f}{row['recall_at_k']:>10.3f}{row['mrr']:>7.3f}"
+              f"{row['sources']:>9.1f}{row['index_mb']:>12.2f}{row['embedding_tokens']:>10}{row['search_ms']:>16.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Évaluer la recherche documentaire sur un jeu de questions de référence")
+    parser.add_argument('--golden', default="eval/golden_set.jsonl", help='Questions et pages attendues (JSONL)')
+    parser.add_argument('--pdf-dir', default=config.PDF_DIRECTORY)
+    parser.add_argument('--backend', choices=['local', 'openai'], default='local',
+                        help="local : embeddings hachés hors ligne ; openai : modèle d'embedding (payant)")
+    parser.add_argument('--sweep', action='store_true', help='Évaluer toute la grille de réglages ci-dessous')
+    parser.add_argument('--hierarchical', action='store_true',
+                        help='Recherche en deux temps : résumés de documents et de sections, puis leurs segments')
+    parser.add_argument('--chunk-sizes', type=int, nargs='+', default=[250, 500, 1000])
+    parser.add_argument('--overlaps', type=int, nargs='+', default=[0, 50, 200])
+    parser.add_argument('--top-k', type=int, nargs='+', default=[3, 5, 10])
+    parser.add_argument('--dimensions', type=int, nargs='+', default=[256, 512, 1536])
+    args = parser.parse_args()
+
+    if args.sweep:
+        chunkings = [(size, overlap) for size, overlap in itertools.product(args.chunk_sizes, args.overlaps)
+                     if overlap < size]
+        top_ks, dimensions = args.top_k, args.dimensions
+    else:
+        chunkings = [(config.CHUNK_SIZE, config.CHUNK_OVERLAP)]
+        top_ks, dimensions = [config.TOP_K_RESULTS], [config.EMBEDDING_DIMENSION]
+
+    golden = load_golden_set(args.golden)
+    print(f"📚 Lecture des PDFs de {args.pdf_dir}...")
+    pages = load_pages(args.pdf_dir)
+    print(f"   {len(pages)} pages, {len(golden)} questions de référence, {len(chunkings)} découpages")
+
+    embed = OpenAIEmbeddings() if args.backend == 'openai' else hashed_embeddings
+    encoding = tiktoken.encoding_for_model("gpt-4")
+
+    rows = []
+    for chunk_size, chunk_overlap in chunkings:
+        chunks = build_chunks(pages, chunk_size, chunk_overlap)
+        print(f"🔄 Segments de {chunk_size} mots, recouvrement {chunk_overlap} : {len(chunks)} segments")
+        for row in evaluate_chunking(chunks, golden, embed, dimensions, top_ks,
+                                     lambda text: len(encoding.encode(text)), args.hierarchical):
+            rows.append({"chunk_size": chunk_size, "chunk_overlap": chunk_overlap, **row})
+
+    frontier = pareto_frontier(rows)
+    mode = "deux temps" if args.hierarchical else "recherche à plat"
+    print(f"\n📊 Résultats ({args.backend}, {mode}) — ★ : frontière de Pareto")
+    print_rows(rows, frontier)
+    if args.sweep:
+        print(f"\n🏁 {len(frontier)} réglages sur la frontière de Pareto (sur {len(rows)})")
+
+
+if __name__ == "__main__":
+    main()
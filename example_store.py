@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Stockage des exemples réels d'adaptation par matière et par niveau
+Base SQLite chargée à la demande, importable et exportable au format JSON historique
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from text_utils import fold_accents
+
+
+def embeddings_sidecar_path(examples_file: str) -> str:
+    """Fichier binaire des embeddings associé au fichier d'exemples JSON"""
+    return str(Path(examples_file).with_suffix(".embeddings.npy"))
+
+
+def example_level(example: Dict[str, Any]) -> str:
+    """Niveau d'un exemple (champ "level", sinon début de la source « 5EME - CHAPITRE 9 »)"""
+    if example.get("level"):
+        return example["level"]
+    return example.get("source", "").split(" - ", 1)[0].strip()
+
+
+class ExampleStore:
+    """
+    Corpus d'exemples d'adaptation stocké dans SQLite, partitionné par
+    (matière, niveau).
+
+    Chaque partition (« shard ») est lue seulement quand une requête en a
+    besoin : demander les exemples d'Histoire ne charge ni les autres
+    matières ni leurs embeddings. Le nombre d'exemples par partition est lu
+    dans l'index (subject, level), sans parcourir les textes.
+
+    Le format JSON historique (real_adaptation_examples.json et son fichier
+    .embeddings.npy) reste le format d'échange : import_json / export_json.
+
+    En lecture seule (read_only=True), la base doit exister : une faute de
+    frappe dans le chemin lève FileNotFoundError au lieu de créer une base vide.
+    """
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self._lock = threading.Lock()
+        if read_only:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Base d'exemples introuvable : {path}")
+            self._conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True,
+                                         check_same_thread=False)
+            return
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS examples (
+                id INTEGER PRIMARY KEY,
+                subject TEXT NOT NULL,
+                level TEXT NOT NULL,
+                source TEXT NOT NULL DEFAULT '',
+                original TEXT NOT NULL,
+                adapted TEXT NOT NULL,
+                embedding BLOB
+            );
+            CREATE INDEX IF NOT EXISTS examples_shard ON examples (subject, level);
+            CREATE TABLE IF NOT EXISTS metadata (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def shards(self) -> List[Tuple[str, str, int]]:
+        """Partitions disponibles : (matière, niveau, nombre d'exemples)"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT subject, level, COUNT(*) FROM examples GROUP BY subject, level ORDER BY subject, level"
+            ).fetchall()
+
+    def sources(self) -> List[str]:
+        """Cours d'origine des exemples, sans doublon"""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT source FROM examples WHERE source != '' ORDER BY source").fetchall()
+        return [source for source, in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM examples").fetchone()[0]
+
+    def metadata(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM metadata").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def matching_shards(self, subject: str = None, level: str = None) -> List[Tuple[str, str]]:
+        """Partitions dont la matière (et le niveau) contiennent ceux demandés, accents ignorés"""
+        subject_key = fold_accents(subject) if subject else ""
+        level_key = fold_accents(level) if level else ""
+        return [
+            (shard_subject, shard_level) for shard_subject, shard_level, _ in self.shards()
+            if subject_key in fold_accents(shard_subject) and level_key in fold_accents(shard_level)
+        ]
+
+    def load_shards(self, shards: List[Tuple[str, str]]) -> Tuple[List[Dict[str, Any]], Optional[np.ndarray]]:
+        """Exemples des partitions demandées, et leur matrice d'embeddings si tous en ont un"""
+        sections, vectors = [], []
+        with self._lock:
+            for subject, level in shards:
+                rows = self._conn.execute(
+                    "SELECT subject, level, source, original, adapted, embedding FROM examples "
+                    "WHERE subject = ? AND level = ? ORDER BY id",
+                    (subject, level)
+                ).fetchall()
+                for row_subject, row_level, source, original, adapted, embedding in rows:
+                    sections.append({"original": original, "adapted": adapted, "subject": row_subject,
+                                     "source": source, "level": row_level})
+                    vectors.append(embedding)
+
+        embeddings = None
+        if sections and all(vector is not None for vector in vectors):
+            embeddings = np.vstack([np.frombuffer(vector, dtype=np.float32) for vector in vectors])
+        return sections, embeddings
+
+    def import_json(self, json_path: str) -> int:
+        """Remplacer le contenu de la base par un fichier d'exemples JSON (et ses embeddings)"""
+        with open(json_path, 'r', encoding='utf-8') as f:
+            examples = json.load(f)
+        sections = examples.get("sections", [])
+        metadata = dict(examples.get("metadata", {}))
+
+        embeddings = None
+        sidecar = embeddings_sidecar_path(json_path)
+        if metadata.get("embeddings") and os.path.exists(sidecar):
+            embeddings = np.load(sidecar).astype(np.float32, copy=False)
+            if len(embeddings) != len(sections):
+                print("⚠️  Embeddings périmés ignorés à l'import")
+                embeddings = None
+        if embeddings is None:
+            metadata.pop("embeddings", None)
+
+        with self._lock:
+            self._conn.execute("DELETE FROM examples")
+            self._conn.execute("DELETE FROM metadata")
+            self._conn.executemany(
+                "INSERT INTO examples (subject, level, source, original, adapted, embedding) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (example.get("subject", ""), example_level(example), example.get("source", ""),
+                     example["original"], example["adapted"],
+                     embeddings[i].tobytes() if embeddings is not None else None)
+                    for i, example in enumerate(sections)
+                ]
+            )
+            self._conn.executemany(
+                "INSERT INTO metadata (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value, ensure_ascii=False)) for key, value in metadata.items()]
+            )
+            self._conn.commit()
+        return len(sections)
+
+    def export_json(self, json_path: str) -> int:
+        """Écrire tout le corpus au format JSON historique (et les embeddings à côté s'il y en a)"""
+        sections, embeddings = self.load_shards([(subject, level) for subject, level, _ in self.shards()])
+        metadata = self.metadata()
+        if embeddings is not None:
+            np.save(embeddings_sidecar_path(json_path), embeddings)
+        else:
+            metadata.pop("embeddings", None)
+
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({"sections": sections, "metadata": metadata}, f, ensure_ascii=False, indent=2)
+        return len(sections)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    """Import / export en ligne de commande"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Base d'exemples réels d'adaptation")
+    parser.add_argument('command', choices=['import', 'export', 'shards'])
+    parser.add_argument('json_file', nargs='?', default="real_adaptation_examples.json",
+                        help="Fichier d'exemples JSON (défaut: real_adaptation_examples.json)")
+    parser.add_argument('--store', default="real_adaptation_examples.sqlite", help='Base SQLite')
+    args = parser.parse_args()
+
+    # Seul l'import crée la base
+    store = ExampleStore(args.store, read_only=args.command != 'import')
+    if args.command == 'import':
+        print(f"✅ {store.import_json(args.json_file)} exemples importés dans {args.store}")
+    elif args.command == 'export':
+        print(f"✅ {store.export_json(args.json_file)} exemples exportés dans {args.json_file}")
+    for subject, level, count in store.shards():
+        print(f"   • {subject} / {level or '-'} : {count} exemples")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
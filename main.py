@@ -5,38 +5,116 @@ Helps teachers adapt courses for dyslexic students using research-based AI assis
 """
 
 import argparse
+import json
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Dict, List, TextIO
 
 from pdf_processor import PDFProcessor
+from deduplication import deduplicate_chunks
 from vector_store import VectorStore
 from rag_system import DyslexiaRAG, format_response
 from config import config
+from profiling import run_profiled
 
-def setup_database():
-    """Process PDFs and upload to Pinecone vector database"""
-    print("🔄 Configuration de la Base de Données de Recherche sur la Dyslexie")
-    print("=" * 60)
+EMBEDDING_JOB_DIR = "batch-jobs/embeddings"
+
+EXAMPLE_QUESTIONS = [
+    "Comment puis-je adapter les exercices de lecture pour les élèves dyslexiques ?",
+    "Quelles sont les techniques d'enseignement multisensorielles efficaces pour la dyslexie ?",
+    "Comment dois-je modifier les consignes écrites pour les apprenants dyslexiques ?",
+    "Quels aménagements fonctionnent le mieux pour les évaluations de maths avec les élèves dyslexiques ?",
+    "Comment puis-je rendre les devoirs d'écriture plus accessibles aux élèves dyslexiques ?",
+    "Quelles sont les meilleures polices et mise en forme pour les lecteurs dyslexiques ?",
+    "Comment adapter l'enseignement de la phonétique pour les enfants dyslexiques ?",
+    "Quelles technologies d'assistance aident les élèves dyslexiques en classe ?"
+]
+
+def load_research_chunks():
+    """Extract the research PDFs into chunks and collapse near-duplicates (steps 1 and 2 of setup)
     
+    Returns:
+        Tuple of the chunks (None if there are none) and the sources of the
+        PDFs that failed to parse, whose vectors the sync must keep
+    """
     # Step 1: Process PDFs
     print("Étape 1 : Traitement des documents PDF...")
     processor = PDFProcessor()
-    chunks = processor.process_all_pdfs()
+    chunks = processor.process_all_pdfs_to_store()
     
     if not chunks:
         print("❌ Aucun document PDF trouvé. Veuillez vous assurer que les PDFs sont dans le dossier 'pdf'.")
-        return False
+        return None, processor.failed_sources
     
     print(f"✅ {len(chunks)} segments de texte extraits avec succès des PDFs")
+    if processor.failed_sources:
+        print(f"⚠️ {len(processor.failed_sources)} PDFs illisibles : leurs vecteurs existants sont conservés")
+    
+    # Step 2: Collapse near-duplicate chunks (DYS versions, yearly editions...)
+    if config.DEDUPLICATE_CHUNKS:
+        print("\nÉtape 2 : Détection des quasi-doublons...")
+        chunks, report = deduplicate_chunks(chunks)
+        report.print_summary()
     
-    # Step 2: Upload to Pinecone
-    print("\nÉtape 2 : Téléchargement vers la base de données vectorielle...")
+    return chunks, processor.failed_sources
+
+def setup_database():
+    """Process PDFs and upload to Pinecone vector database"""
+    print("🔄 Configuration de la Base de Données de Recherche sur la Dyslexie")
+    print("=" * 60)
+    
+    chunks, failed_sources = load_research_chunks()
+    if chunks is None:
+        return False
+    
+    # Step 3: Upload to Pinecone
+    print("\nÉtape 3 : Téléchargement vers la base de données vectorielle...")
     vector_store = VectorStore()
-    vector_store.upload_chunks_to_pinecone(chunks)
+    # Only new or modified chunks are embedded; vanished chunks are deleted
+    sync_stats = vector_store.sync_chunks(chunks, keep_sources=failed_sources)
+    print(f"   {sync_stats['upserted']} vecteurs ajoutés, {sync_stats['deleted']} supprimés, "
+          f"{sync_stats['unchanged']} inchangés, {sync_stats['failed']} en échec")
+    
+    if config.HIERARCHICAL_SEARCH:
+        # Document and section summaries for the two-stage search
+        print("\nÉtape 4 : Résumés des documents et des sections...")
+        summary_stats = vector_store.sync_summaries(chunks, keep_sources=failed_sources)
+        print(f"   {summary_stats['upserted']} résumés ajoutés, {summary_stats['deleted']} supprimés, "
+              f"{summary_stats['unchanged']} inchangés, {summary_stats['failed']} en échec")
     
     print("✅ Configuration de la base de données terminée !")
     return True
 
+def prepare_embedding_job(job_dir: str):
+    """Offline setup: write the embedding requests to a provider batch file"""
+    print("🔄 Préparation d'un job batch d'embeddings")
+    print("=" * 60)
+    
+    chunks, failed_sources = load_research_chunks()
+    if chunks is None:
+        return False
+    
+    print("\nÉtape 3 : Écriture des requêtes d'embeddings...")
+    requests = VectorStore().prepare_embedding_job(chunks, job_dir, keep_sources=failed_sources)
+    if requests:
+        print(f"✅ Soumettez {job_dir}/requests.jsonl à l'API batch, puis :")
+        print(f"   python main.py embed-ingest <résultats.jsonl> {job_dir}")
+    else:
+        print("✅ L'index est déjà à jour, aucun embedding à calculer")
+    return True
+
+def ingest_embedding_job(results_paths, job_dir: str):
+    """Offline setup: upsert the embeddings of a finished batch job"""
+    print(f"📥 Intégration des résultats du job {job_dir}")
+    stats = VectorStore().ingest_embedding_results(job_dir, results_paths)
+    print(f"   {stats['upserted']} vecteurs ajoutés, {stats['deleted']} supprimés, "
+          f"{stats['unchanged']} inchangés, {stats['failed']} en échec")
+    if config.HIERARCHICAL_SEARCH:
+        print(f"   {stats['summaries']} résumés de documents et de sections mis à jour")
+    print("✅ Configuration de la base de données terminée !")
+
 def interactive_query_mode():
     """Interactive mode for asking questions about dyslexia adaptations"""
     print("\n🎓 Assistant Pédagogique Dyslexie - Mode Interactif")
@@ -85,20 +163,9 @@ def interactive_query_mode():
 
 def show_example_questions():
     """Show example questions teachers can ask"""
-    examples = [
-        "Comment puis-je adapter les exercices de lecture pour les élèves dyslexiques ?",
-        "Quelles sont les techniques d'enseignement multisensorielles efficaces pour la dyslexie ?",
-        "Comment dois-je modifier les consignes écrites pour les apprenants dyslexiques ?",
-        "Quels aménagements fonctionnent le mieux pour les évaluations de maths avec les élèves dyslexiques ?",
-        "Comment puis-je rendre les devoirs d'écriture plus accessibles aux élèves dyslexiques ?",
-        "Quelles sont les meilleures polices et mise en forme pour les lecteurs dyslexiques ?",
-        "Comment adapter l'enseignement de la phonétique pour les enfants dyslexiques ?",
-        "Quelles technologies d'assistance aident les élèves dyslexiques en classe ?"
-    ]
-    
     print("\n💡 Exemples de Questions :")
     print("-" * 35)
-    for i, example in enumerate(examples, 1):
+    for i, example in enumerate(EXAMPLE_QUESTIONS, 1):
         print(f"{i}. {example}")
 
 def quick_query(question: str):
@@ -111,6 +178,110 @@ def quick_query(question: str):
     
     print(format_response(response))
 
+def read_questions(source: TextIO) -> List[str]:
+    """One question per line; blank lines and lines starting with # are skipped"""
+    return [line.strip() for line in source if line.strip() and not line.lstrip().startswith('#')]
+
+def run_question_batch(rag: DyslexiaRAG, questions: List[str], output: TextIO, concurrency: int) -> Dict:
+    """
+    Answer many questions concurrently with one shared RAG instance.
+    
+    Each answer is written to output as one JSON line as soon as it completes
+    (so lines are in completion order; "index" is the question's position in
+    the input). The shared rate limiter keeps the concurrent calls within the
+    per-minute budget.
+    
+    Returns:
+        Summary with question, failure and token counts, context tokens saved
+        and mean ratio when context compression is on, wall time, throughput
+        and latency percentiles
+    """
+    def answer(question: str):
+        start = time.perf_counter()
+        try:
+            response = rag.query(question)
+        except Exception as e:
+            response = {'question': question, 'answer': "", 'sources': [], 'error': str(e)}
+        return response, time.perf_counter() - start
+    
+    start = time.perf_counter()
+    latencies, failures, total_tokens = [], 0, 0
+    compressions = []
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {executor.submit(answer, question): index for index, question in enumerate(questions)}
+        for done, future in enumerate(as_completed(futures), 1):
+            response, latency = future.result()
+            usage = response.get('usage') or {}
+            record = {
+                'index': futures[future],
+                'question': response['question'],
+                'answer': response['answer'],
+                'sources': response.get('sources', []),
+                'usage': usage,
+                'compression': response.get('compression'),
+                'finish_reason': response.get('finish_reason'),
+                'latency_seconds': round(latency, 3),
+                'error': response.get('error')
+            }
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+            
+            latencies.append(latency)
+            total_tokens += usage.get('total_tokens', 0)
+            if record['compression']:
+                compressions.append(record['compression'])
+            if record['error']:
+                failures += 1
+                print(f"   ❌ [{done}/{len(questions)}] {response['question'][:60]} : {record['error']}")
+            else:
+                print(f"   ✅ [{done}/{len(questions)}] {response['question'][:60]} ({latency:.1f}s)")
+    
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'questions': len(questions),
+        'failed': failures,
+        'total_tokens': total_tokens,
+        'context_tokens_saved': sum(c['tokens_saved'] for c in compressions),
+        'compression_ratio': round(sum(c['ratio'] for c in compressions) / len(compressions), 3) if compressions else None,
+        'elapsed_seconds': round(elapsed, 2),
+        'questions_per_minute': round(len(questions) / elapsed * 60, 1) if elapsed else 0.0,
+        'latency_p50': round(latencies[len(latencies) // 2], 2) if latencies else 0.0,
+        'latency_p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else 0.0
+    }
+
+def batch_query(questions_path: str, output_path: str = None, concurrency: int = None):
+    """Answer every question of a file (or stdin with '-') and stream the answers to JSONL"""
+    if questions_path == '-':
+        questions = read_questions(sys.stdin)
+        output_path = output_path or "reponses.jsonl"
+    else:
+        with open(questions_path, 'r', encoding='utf-8') as f:
+            questions = read_questions(f)
+        output_path = output_path or str(Path(questions_path).with_suffix('')) + "_reponses.jsonl"
+    
+    if not questions:
+        print("❌ Aucune question à traiter")
+        return
+    
+    concurrency = concurrency or config.QUERY_BATCH_CONCURRENCY
+    print(f"🔍 {len(questions)} questions, {concurrency} en parallèle → {output_path}")
+    print("=" * 50)
+    
+    rag = DyslexiaRAG()
+    with open(output_path, 'w', encoding='utf-8') as output:
+        summary = run_question_batch(rag, questions, output, concurrency)
+    
+    print("\n📊 Résumé du lot :")
+    print(f"   • Questions : {summary['questions']} ({summary['failed']} en échec)")
+    print(f"   • Durée : {summary['elapsed_seconds']}s ({summary['questions_per_minute']} questions/min)")
+    print(f"   • Latence : médiane {summary['latency_p50']}s, p95 {summary['latency_p95']}s")
+    print(f"   • Tokens : {summary['total_tokens']}")
+    if summary['compression_ratio'] is not None:
+        print(f"   • Contexte compressé : {summary['context_tokens_saved']} tokens économisés "
+              f"(ratio moyen {summary['compression_ratio']})")
+    print(f"💾 Réponses enregistrées dans {output_path}")
+
 def get_specific_help(command_type: str, *args):
     """Get specific types of help based on command"""
     rag = DyslexiaRAG()
@@ -156,8 +327,11 @@ def main():
         epilog="""
 Exemples:
   python main.py setup                    # Traiter les PDFs et configurer la base
+  python main.py embed-prepare [dossier]  # Préparer un job batch d'embeddings (hors ligne)
+  python main.py embed-ingest résultats.jsonl [dossier]  # Intégrer les résultats du job
   python main.py interactive              # Démarrer le mode questions interactif
   python main.py query "Comment adapter les exercices de lecture ?"
+  python main.py batch questions.txt [réponses.jsonl]  # Une question par ligne ('-' pour stdin)
   python main.py adapt mathématiques "problèmes de mots"
   python main.py exercises phonétique élémentaire
   python main.py assessment "tests écrits"
@@ -165,8 +339,14 @@ Exemples:
     )
     
     parser.add_argument('command', nargs='?', default='interactive',
-                       help='Commande à exécuter (setup, interactive, query, adapt, exercises, assessment)')
+                       help='Commande à exécuter (setup, embed-prepare, embed-ingest, interactive, query, batch, adapt, exercises, assessment)')
     parser.add_argument('args', nargs='*', help='Arguments supplémentaires pour la commande')
+    parser.add_argument('--concurrency', type=int, default=None,
+                       help=f'Questions traitées en parallèle par batch (défaut: {config.QUERY_BATCH_CONCURRENCY})')
+    parser.add_argument('--profile', action='store_true',
+                       help=f'Mesurer le temps passé par étape (tableau + fichier flame graph dans {config.PROFILE_DIR}/)')
+    parser.add_argument('--profile-cpu', action='store_true', help='Avec --profile : capture cProfile (.prof)')
+    parser.add_argument('--profile-memory', action='store_true', help='Avec --profile : capture tracemalloc')
     
     args = parser.parse_args()
     
@@ -181,27 +361,51 @@ Exemples:
         print("   ou dans la variable d'environnement PINECONE_API_KEY")
         return
     
-    # Route commands
-    if args.command == 'setup':
-        setup_database()
-    
-    elif args.command == 'interactive':
-        interactive_query_mode()
-    
-    elif args.command == 'query':
-        if not args.args:
-            print("Veuillez fournir une question à poser")
-            print("Exemple : python main.py query 'Comment adapter les exercices de lecture ?'")
-            return
-        question = ' '.join(args.args)
-        quick_query(question)
-    
-    elif args.command in ['adapt', 'exercises', 'assessment']:
-        get_specific_help(args.command, *args.args)
+    def run():
+        # Route commands
+        if args.command == 'setup':
+            setup_database()
+        
+        elif args.command == 'embed-prepare':
+            prepare_embedding_job(args.args[0] if args.args else EMBEDDING_JOB_DIR)
+        
+        elif args.command == 'embed-ingest':
+            if not args.args:
+                print("Usage : python main.py embed-ingest <résultats.jsonl> [dossier_du_job]")
+                return
+            results = [path for path in args.args if path.endswith('.jsonl')]
+            job_dirs = [path for path in args.args if not path.endswith('.jsonl')]
+            ingest_embedding_job(results, job_dirs[0] if job_dirs else EMBEDDING_JOB_DIR)
+        
+        elif args.command == 'interactive':
+            interactive_query_mode()
+        
+        elif args.command == 'query':
+            if not args.args:
+                print("Veuillez fournir une question à poser")
+                print("Exemple : python main.py query 'Comment adapter les exercices de lecture ?'")
+                return
+            question = ' '.join(args.args)
+            quick_query(question)
+        
+        elif args.command == 'batch':
+            if not args.args:
+                print("Usage : python main.py batch <questions.txt|-> [réponses.jsonl]")
+                return
+            batch_query(args.args[0], args.args[1] if len(args.args) > 1 else None, args.concurrency)
+        
+        elif args.command in ['adapt', 'exercises', 'assessment']:
+            get_specific_help(args.command, *args.args)
+        
+        else:
+            print(f"Commande inconnue : {args.command}")
+            print("Utilisez 'python main.py --help' pour les informations d'usage")
     
+    if args.profile or args.profile_cpu or args.profile_memory:
+        run_profiled(args.command, run, cpu=args.profile_cpu, memory=args.profile_memory,
+                     output_dir=config.PROFILE_DIR)
     else:
-        print(f"Commande inconnue : {args.command}")
-        print("Utilisez 'python main.py --help' pour les informations d'usage")
+        run()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
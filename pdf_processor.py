@@ -1,10 +1,13 @@
 import fitz  # PyMuPDF
+import hashlib
 import re
 import os
+import unicodedata
 from pathlib import Path
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Sequence, Tuple
+from dataclasses import dataclass, field
 from config import config
+from profiling import span
 
 @dataclass
 class DocumentChunk:
@@ -15,11 +18,84 @@ class DocumentChunk:
     page_number: int
     section: str
     chunk_id: str
+    duplicate_sources: List[str] = field(default_factory=list)  # Other documents containing this text
+
+def source_id_prefix(source: str) -> str:
+    """ASCII-safe prefix identifying a source document in vector IDs"""
+    ascii_source = unicodedata.normalize('NFKD', source).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', ascii_source) + '#'
+
+def make_chunk_id(source: str, text: str) -> str:
+    """Stable chunk ID: source prefix plus a hash of the chunk content
+    
+    The same text in the same document always gets the same ID, so re-processing
+    an edited PDF only produces new IDs for the chunks that actually changed.
+    """
+    content_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+    return f"{source_id_prefix(source)}{content_hash}"
+
+def summary_chunks(chunks: Sequence[DocumentChunk], max_words: int = None) -> List[DocumentChunk]:
+    """Document- and section-level summary records for the coarse search layer
+    
+    One record per document and one per (document, section). Document records
+    have an empty section. A summary is the group's title followed by the
+    opening words of evenly spaced chunks of the group, in order: at most
+    max_words // 8 chunks, at least 8 words each, so a long document is
+    sampled from its first page to its last within max_words. A chunk
+    collapsed by deduplication also counts for the documents in its
+    duplicate_sources.
+    
+    IDs hash the summary text like chunk IDs, so syncing summaries only
+    re-embeds the groups whose chunks changed.
+    """
+    if max_words is None:
+        max_words = config.HIERARCHICAL_SUMMARY_WORDS
+    
+    def groups_of(chunk: DocumentChunk) -> List[Tuple[str, str]]:
+        return [(chunk.source, chunk.section)] + [(source, "") for source in [chunk.source] + chunk.duplicate_sources]
+    
+    # First pass: group sizes, to spread the sampled chunks over the whole group
+    sizes: Dict[Tuple[str, str], int] = {}
+    for position in range(len(chunks)):
+        for group in groups_of(chunks[position]):
+            sizes[group] = sizes.get(group, 0) + 1
+    max_samples = max(1, max_words // 8)
+    
+    words: Dict[Tuple[str, str], List[str]] = {group: [] for group in sizes}
+    seen: Dict[Tuple[str, str], int] = {group: 0 for group in sizes}
+    taken: Dict[Tuple[str, str], int] = {group: 0 for group in sizes}
+    first_chunks: Dict[Tuple[str, str], DocumentChunk] = {}
+    for position in range(len(chunks)):
+        chunk = chunks[position]
+        for group in groups_of(chunk):
+            first_chunks.setdefault(group, chunk)
+            samples = min(sizes[group], max_samples)
+            # Chunks 0, stride, 2 * stride... of the group, with stride = size / samples
+            if seen[group] == taken[group] * sizes[group] // samples:
+                words[group].extend(chunk.text.split()[:max_words // samples])
+                taken[group] += 1
+            seen[group] += 1
+    
+    summaries = []
+    for (source, section), group_words in words.items():
+        title = f"{source} — {section}" if section else source
+        text = f"{title}\n{' '.join(group_words[:max_words])}"
+        summaries.append(DocumentChunk(
+            text=text,
+            source=source,
+            author=first_chunks[(source, section)].author,
+            page_number=first_chunks[(source, section)].page_number,
+            section=section,
+            chunk_id=make_chunk_id(source, text)
+        ))
+    return summaries
 
 class PDFProcessor:
     def __init__(self):
         self.chunk_size = config.CHUNK_SIZE
         self.chunk_overlap = config.CHUNK_OVERLAP
+        # Sources of the PDFs that failed to parse during the last process_all_pdfs* call
+        self.failed_sources: List[str] = []
     
     def extract_metadata(self, pdf_path: str) -> Dict[str, str]:
         """Extract metadata from PDF"""
@@ -125,7 +201,7 @@ class PDFProcessor:
             chunk_text = ' '.join(chunk_words)
             
             if chunk_text.strip():
-                chunk_id = f"{metadata['source']}_page{page_num}_chunk{len(chunks)}"
+                chunk_id = make_chunk_id(metadata['source'], chunk_text)
                 chunks.append(DocumentChunk(
                     text=chunk_text,
                     source=metadata['source'],
@@ -146,11 +222,13 @@ class PDFProcessor:
         all_chunks = []
         
         for page_num in range(len(doc)):
-            page = doc[page_num]
-            text = page.get_text()
+            with span("pdf_parse"):
+                page = doc[page_num]
+                text = page.get_text()
             
             if text.strip():  # Only process pages with text
-                chunks = self._chunk_text_by_structure(text, metadata, page_num + 1)
+                with span("chunk"):
+                    chunks = self._chunk_text_by_structure(text, metadata, page_num + 1)
                 all_chunks.extend(chunks)
         
         doc.close()
@@ -163,6 +241,7 @@ class PDFProcessor:
             pdf_directory = config.PDF_DIRECTORY
         
         all_chunks = []
+        self.failed_sources = []
         pdf_path = Path(pdf_directory)
         
         # Find all PDF files recursively
@@ -180,9 +259,43 @@ class PDFProcessor:
                 all_chunks.extend(chunks)
             except Exception as e:
                 print(f"Erreur lors du traitement de {pdf_file}: {e}")
+                self.failed_sources.append(pdf_file.name)
         
         print(f"Total de segments extraits : {len(all_chunks)}")
         return all_chunks
+    
+    def process_all_pdfs_to_store(self, pdf_directory: str = None) -> "ChunkStore":
+        """Process all PDFs into a compact columnar ChunkStore
+        
+        Chunks of each PDF are appended to the store as soon as the PDF is
+        processed, so only one document's DocumentChunk objects are alive at once.
+        PDFs that fail to parse are listed in failed_sources: their vectors
+        must be kept when the index is synced (see VectorStore.sync_chunks).
+        """
+        from chunk_store import ChunkStore
+        
+        if pdf_directory is None:
+            pdf_directory = config.PDF_DIRECTORY
+        
+        store = ChunkStore()
+        self.failed_sources = []
+        pdf_files = list(Path(pdf_directory).rglob("*.pdf"))
+        
+        if not pdf_files:
+            print(f"Aucun fichier PDF trouvé dans {pdf_directory}")
+            return store
+        
+        print(f"Trouvé {len(pdf_files)} fichiers PDF")
+        
+        for pdf_file in pdf_files:
+            try:
+                store.extend(self.process_pdf(str(pdf_file)))
+            except Exception as e:
+                print(f"Erreur lors du traitement de {pdf_file}: {e}")
+                self.failed_sources.append(pdf_file.name)
+        
+        print(f"Total de segments extraits : {len(store)} ({store.nbytes() / 1024 / 1024:.1f} Mo)")
+        return store
 
 # Example usage
 if __name__ == "__main__":
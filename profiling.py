@@ -0,0 +1,187 @@
+import cProfile
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+_DISABLED = nullcontext()
+
+
+class Profiler:
+    """
+    Opt-in timing spans for the major pipeline stages.
+
+    Code marks a stage with ``with span("embed"):``. When profiling is off
+    (the default) span() returns a shared no-op context manager, so the
+    instrumentation costs one attribute check per call.
+
+    When profiling is on, every span records its wall time per stage name and
+    its self time (wall time minus nested spans) per stack of span names.
+    Stacks are tracked per thread, so spans opened by worker threads are
+    timed correctly; their stacks start at the worker's first span.
+
+    Optional captures:
+    - cProfile of the thread that called start() (run adaptation steps with a
+      concurrency of 1 to see the work of the worker threads in it);
+    - tracemalloc: net memory allocated inside each stage and the top
+      allocation sites at the end of the run. Allocation deltas are process
+      wide, so they are approximate when stages run concurrently.
+
+    Attributes:
+        enabled: Whether spans are being recorded
+        stages: Per stage name: calls, total, self and max seconds, allocated bytes
+        stacks: Self seconds per ";"-joined stack of span names (collapsed stacks)
+    """
+    def __init__(self) -> None:
+        self.enabled = False
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.stacks: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._trace_memory = False
+        self._started_at = 0.0
+        self.wall_seconds = 0.0
+
+    def start(self, cpu: bool = False, memory: bool = False) -> None:
+        """Reset the measurements and start recording spans"""
+        self.stages = {}
+        self.stacks = {}
+        self._trace_memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(25)
+        if cpu:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._started_at = time.perf_counter()
+        self.enabled = True
+
+    def span(self, name: str):
+        """Context manager timing one stage (no-op when profiling is off)"""
+        if not self.enabled:
+            return _DISABLED
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        # Each frame: [name, start, seconds spent in nested spans]
+        frame = [name, time.perf_counter(), 0.0]
+        stack.append(frame)
+        allocated_before = tracemalloc.get_traced_memory()[0] if self._trace_memory else 0
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[1]
+            allocated = tracemalloc.get_traced_memory()[0] - allocated_before if self._trace_memory else 0
+            path = ";".join(entry[0] for entry in stack)
+            stack.pop()
+            if stack:
+                stack[-1][2] += elapsed
+            self_seconds = max(0.0, elapsed - frame[2])
+
+            with self._lock:
+                stage = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "self_seconds": 0.0,
+                                                      "max_seconds": 0.0, "allocated_bytes": 0})
+                stage["calls"] += 1
+                stage["seconds"] += elapsed
+                stage["self_seconds"] += self_seconds
+                stage["max_seconds"] = max(stage["max_seconds"], elapsed)
+                stage["allocated_bytes"] += allocated
+                self.stacks[path] = self.stacks.get(path, 0.0) + self_seconds
+
+    def stop(self, output_dir: str, run_name: str) -> Dict[str, str]:
+        """
+        Stop recording and write the captures.
+
+        Files written to output_dir, prefixed with run_name and a timestamp:
+        - .collapsed: one "stage;nested_stage microseconds" line per stack,
+          readable by flamegraph.pl, speedscope or inferno;
+        - .summary.txt: the per-stage table from summary_lines;
+        - .prof: cProfile statistics (pstats / snakeviz), if captured;
+        - .memory.txt: top allocation sites, if tracemalloc was enabled.
+
+        Returns:
+            Dict mapping capture kind to file path
+        """
+        wall_seconds = time.perf_counter() - self._started_at
+        self.enabled = False
+        os.makedirs(output_dir, exist_ok=True)
+        prefix = os.path.join(output_dir, f"{run_name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        files = {}
+
+        files["collapsed"] = f"{prefix}.collapsed"
+        with open(files["collapsed"], 'w', encoding='utf-8') as f:
+            for path, seconds in sorted(self.stacks.items()):
+                if seconds > 0:
+                    f.write(f"{path} {int(seconds * 1_000_000)}\n")
+
+        files["summary"] = f"{prefix}.summary.txt"
+        with open(files["summary"], 'w', encoding='utf-8') as f:
+            f.write("\n".join(self.summary_lines(wall_seconds)) + "\n")
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            files["cprofile"] = f"{prefix}.prof"
+            self._cprofile.dump_stats(files["cprofile"])
+            self._cprofile = None
+
+        if self._trace_memory:
+            files["memory"] = f"{prefix}.memory.txt"
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            with open(files["memory"], 'w', encoding='utf-8') as f:
+                f.write(f"current: {current / 1024 / 1024:.1f} MB, peak: {peak / 1024 / 1024:.1f} MB\n\n")
+                for stat in snapshot.statistics("lineno")[:30]:
+                    f.write(f"{stat}\n")
+            tracemalloc.stop()
+            self._trace_memory = False
+
+        self.wall_seconds = wall_seconds
+        return files
+
+    def summary_lines(self, wall_seconds: float) -> List[str]:
+        """Per-stage table, slowest stage first"""
+        lines = [
+            f"{'Étape':<20}{'Appels':>8}{'Total (s)':>12}{'Propre (s)':>12}{'Moyenne (ms)':>14}"
+            f"{'Max (ms)':>11}{'% total':>9}{'Mémoire (Mo)':>14}"
+        ]
+        for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"]):
+            share = stage["seconds"] / wall_seconds * 100 if wall_seconds else 0.0
+            lines.append(
+                f"{name:<20}{stage['calls']:>8}{stage['seconds']:>12.3f}{stage['self_seconds']:>12.3f}"
+                f"{stage['seconds'] / stage['calls'] * 1000:>14.1f}{stage['max_seconds'] * 1000:>11.1f}"
+                f"{share:>8.1f}%{stage['allocated_bytes'] / 1024 / 1024:>14.1f}"
+            )
+        lines.append(f"Durée totale : {wall_seconds:.3f}s (les étapes concurrentes peuvent dépasser 100%)")
+        return lines
+
+
+# Process-wide profiler used by every instrumented module
+profiler = Profiler()
+
+
+def span(name: str):
+    """Time a pipeline stage: ``with span("embed"): ...``"""
+    return profiler.span(name)
+
+
+def run_profiled(run_name: str, function, *args: Any, cpu: bool = False, memory: bool = False,
+                 output_dir: str = "profiles", **kwargs: Any) -> Any:
+    """Run function under the profiler, then print the stage table and the capture files"""
+    profiler.start(cpu=cpu, memory=memory)
+    try:
+        with span(run_name):
+            return function(*args, **kwargs)
+    finally:
+        files = profiler.stop(output_dir, run_name)
+        print("\n⏱️  Profil par étape :")
+        for line in profiler.summary_lines(profiler.wall_seconds):
+            print(f"   {line}")
+        for kind, path in files.items():
+            print(f"   📄 {kind} : {path}")
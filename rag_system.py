@@ -1,9 +1,12 @@
 import openai
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import tiktoken
 
 from config import config
+from context_compression import compress_results
 from vector_store import VectorStore
+from rate_limiter import get_rate_limiter
+from profiling import span
 
 
 class DyslexiaRAG:
@@ -25,6 +28,7 @@ class DyslexiaRAG:
         openai_client: OpenAI API client for embeddings and completions
         vector_store: Vector database interface for semantic search
         encoding: Tokenizer for managing context length limits
+        rate_limiter: Process-wide requests/tokens per minute budget for the chat model
         system_prompt: Specialized prompt for educational adaptation tasks
     """
     def __init__(self) -> None:
@@ -41,6 +45,8 @@ class DyslexiaRAG:
         self.openai_client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
         self.vector_store = VectorStore()
         self.encoding = tiktoken.encoding_for_model(config.CHAT_MODEL)
+        # Shared with every other DyslexiaRAG in the process (concurrent adaptation workers)
+        self.rate_limiter = get_rate_limiter(config.CHAT_MODEL)
         
         # Specialized system prompt for dyslexia-focused educational adaptations
         # This prompt ensures the AI creates direct adaptations rather than just advice
@@ -67,6 +73,11 @@ Quand vous adaptez, basez-vous sur le contexte de recherche fourni pour garantir
 
 IMPORTANT: Répondez TOUJOURS en français, même si la question est posée en anglais. CRÉEZ le contenu adapté, ne donnez pas de conseils."""
     
+    @staticmethod
+    def _source_header(result: Dict[str, Any]) -> str:
+        """Citation line written before the text of a search result"""
+        return f"[Source: {result['source']} by {result['author']}, {result['section']}, p.{result['page_number']}]"
+    
     def _construct_context(self, search_results: List[Dict[str, Any]]) -> str:
         """
         Construct context from search results while respecting token limits.
@@ -92,7 +103,7 @@ IMPORTANT: Répondez TOUJOURS en français, même si la question est posée en a
         
         for result in search_results:
             # Format the result nicely
-            source_info = f"[Source: {result['source']} by {result['author']}, {result['section']}, p.{result['page_number']}]"
+            source_info = self._source_header(result)
             text_with_source = f"{source_info}\n{result['text']}\n"
             
             # Check token count
@@ -106,45 +117,88 @@ IMPORTANT: Répondez TOUJOURS en français, même si la question est posée en a
         
         return "\n---\n".join(context_parts)
     
-    def query(self, question: str, include_context: bool = True) -> Dict[str, Any]:
+    def _compress_context(self, query: str, search_results: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
         """
-        Query the RAG system with a teacher's question about dyslexia adaptations.
+        Construct a context holding only the sentences most relevant to the query.
         
-        This is the main interface for the RAG system. It performs semantic search
-        through the research database, constructs an appropriate context, and generates
-        evidence-based educational recommendations using GPT-4o.
+        Sentences of all search results are ranked against the query (see
+        context_compression.compress_results) and kept within
+        COMPRESSED_CONTEXT_LENGTH tokens. The uncompressed context is used when
+        no sentence shares a term with the query or when compression would not
+        make the context shorter (short results, many source headers).
         
         Args:
-            question: Teacher's question about dyslexia adaptations (in French or English)
-            include_context: Whether to include research context in the response
-                           Set to False for quick responses without citations
+            query: Text the sentences are scored against (the search query)
+            search_results: List of search results from vector database
         
         Returns:
-            Dict containing:
-                - answer: Generated educational recommendation (always in French)
-                - sources: List of research sources used (with relevance scores)
-                - context_used: Raw context text that was provided to the AI
-                - question: Original question for reference
-        
-        Raises:
-            openai.APIError: If OpenAI API request fails
-            Exception: For other API or processing errors (captured and returned in response)
+            Tuple of the context string and its compression metrics:
+            original_tokens (context built by _construct_context),
+            compressed_tokens, tokens_saved and ratio (compressed / original)
+        """
+        original = self._construct_context(search_results)
+        compressed, _ = compress_results(
+            query, search_results, config.COMPRESSED_CONTEXT_LENGTH,
+            lambda text: len(self.encoding.encode(text)), self._source_header
+        )
+        context = "\n---\n".join(f"{self._source_header(result)}\n{text}\n" for result, text in compressed)
+        
+        original_tokens = len(self.encoding.encode(original))
+        compressed_tokens = len(self.encoding.encode(context))
+        if not compressed or compressed_tokens >= original_tokens:
+            context, compressed_tokens = original, original_tokens
+        return context, {
+            'original_tokens': original_tokens,
+            'compressed_tokens': compressed_tokens,
+            'tokens_saved': original_tokens - compressed_tokens,
+            'ratio': round(compressed_tokens / original_tokens, 3) if original_tokens else 1.0
+        }
+    
+    def prepare_query(self, question: str, include_context: bool = True, search_query: Optional[str] = None,
+                      max_tokens: int = 1000, response_format: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """
+        Retrieve research context and build the chat request for a question.
+        
+        Performs everything query() does before calling the chat model, so the
+        same request can be sent immediately (query) or written to an offline
+        batch file (see batch_jobs.py).
         
+        Args:
+            Same as query()
+        
+        Returns:
+            Dict containing:
+                - question: Original question
+                - search_results: Results of the semantic search
+                - context: Research context inserted in the prompt
+                - compression: Metrics of _compress_context when
+                  CONTEXT_COMPRESSION is on, else None
+                - request: Keyword arguments of the chat completion call
+                  (model, messages, temperature, max_tokens, response_format)
+                - error: "no_search_results" when nothing relevant was found
+                  and context was required (no request is built then)
+        """
         # Search for relevant documents
-        search_results = self.vector_store.search(question, top_k=config.TOP_K_RESULTS)
+        with span("retrieve"):
+            search_results = self.vector_store.search(search_query or question, top_k=config.TOP_K_RESULTS)
         
         if not search_results and include_context:
             return {
-                'answer': "I couldn't find relevant research in the knowledge base to answer your question. Please make sure the documents have been processed and uploaded to the vector database.",
-                'sources': [],
-                'context_used': ""
+                'question': question,
+                'search_results': [],
+                'context': "",
+                'error': "no_search_results"
             }
         
         # Construct context from search results
         context = ""
+        compression = None
         if include_context and search_results:
-            context = self._construct_context(search_results)
+            with span("pack_context"):
+                if config.CONTEXT_COMPRESSION:
+                    context, compression = self._compress_context(search_query or question, search_results)
+                else:
+                    context = self._construct_context(search_results)
         
         # Prepare the prompt
         if context:
@@ -163,38 +217,114 @@ QUESTION : {question}
 
 Veuillez fournir des conseils pratiques et fondés sur des preuves pour adapter les méthodes d'enseignement, les exercices ou le matériel de cours pour les élèves dyslexiques."""
         
+        request = {
+            'model': config.CHAT_MODEL,
+            'messages': [
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            'temperature': 0.7,
+            'max_tokens': max_tokens
+        }
+        if response_format:
+            request['response_format'] = response_format
+        
+        return {
+            'question': question,
+            'search_results': search_results,
+            'context': context,
+            'compression': compression,
+            'request': request
+        }
+    
+    def format_sources(self, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert search results into the 'sources' list returned with each answer"""
+        sources = []
+        for result in search_results:
+            sources.append({
+                'source': result['source'],
+                'author': result['author'],
+                'section': result['section'],
+                'page': result['page_number'],
+                'relevance_score': result['score'],
+                'also_in': [src for src in result.get('sources', []) if src != result['source']]
+            })
+        return sources
+    
+    def query(self, question: str, include_context: bool = True, search_query: Optional[str] = None,
+              max_tokens: int = 1000, response_format: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Query the RAG system with a teacher's question about dyslexia adaptations.
+        
+        This is the main interface for the RAG system. It performs semantic search
+        through the research database, constructs an appropriate context, and generates
+        evidence-based educational recommendations using GPT-4o.
+        
+        Args:
+            question: Teacher's question about dyslexia adaptations (in French or English)
+            include_context: Whether to include research context in the response
+                           Set to False for quick responses without citations
+            search_query: Text used for the semantic search instead of the question
+                          (useful when the question is a long multi-item prompt)
+            max_tokens: Maximum number of tokens in the generated answer
+            response_format: Optional OpenAI response format, e.g. {"type": "json_object"}
+        
+        Returns:
+            Dict containing:
+                - answer: Generated educational recommendation (always in French)
+                - sources: List of research sources used (with relevance scores)
+                - context_used: Raw context text that was provided to the AI
+                - question: Original question for reference
+                - usage: Prompt, completion and total tokens of the chat call
+                - compression: Context compression metrics (None when disabled)
+                - finish_reason: Why generation stopped ("stop", "length"...)
+                - error: Present only when no answer could be generated
+        
+        Raises:
+            openai.APIError: If OpenAI API request fails
+            Exception: For other API or processing errors (captured and returned in response)
+        """
+        prepared = self.prepare_query(question, include_context, search_query, max_tokens, response_format)
+        
+        if prepared.get('error'):
+            return {
+                'answer': "I couldn't find relevant research in the knowledge base to answer your question. Please make sure the documents have been processed and uploaded to the vector database.",
+                'sources': [],
+                'context_used': "",
+                'question': question,
+                'error': prepared['error']
+            }
+        
+        context = prepared['context']
+        request = prepared['request']
+        
         try:
+            # Wait for room in the shared per-minute budget (prompt + max completion)
+            prompt_text = "".join(message['content'] for message in request['messages'])
+            with span("tokenize"):
+                estimated_tokens = len(self.encoding.encode(prompt_text)) + max_tokens
+            self.rate_limiter.acquire(estimated_tokens)
+            
             # Generate response with GPT-4o
-            response = self.openai_client.chat.completions.create(
-                model=config.CHAT_MODEL,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1000
-            )
+            with span("complete"):
+                response = self.openai_client.chat.completions.create(**request)
             
             answer = response.choices[0].message.content
-            
-            # Extract source information
-            sources = []
-            if search_results:
-                for result in search_results:
-                    source_info = {
-                        'source': result['source'],
-                        'author': result['author'],
-                        'section': result['section'],
-                        'page': result['page_number'],
-                        'relevance_score': result['score']
-                    }
-                    sources.append(source_info)
+            usage = {
+                'prompt_tokens': response.usage.prompt_tokens,
+                'completion_tokens': response.usage.completion_tokens,
+                'total_tokens': response.usage.total_tokens
+            }
+            self.rate_limiter.adjust(usage['total_tokens'] - estimated_tokens)
             
             return {
                 'answer': answer,
-                'sources': sources,
+                'sources': self.format_sources(prepared['search_results']),
                 'context_used': context,
-                'question': question
+                'question': question,
+                'usage': usage,
+                'compression': prepared['compression'],
+                'finish_reason': response.choices[0].finish_reason
             }
             
         except Exception as e:
@@ -202,7 +332,8 @@ Veuillez fournir des conseils pratiques et fondés sur des preuves pour adapter
                 'answer': f"Error generating response: {e}",
                 'sources': [],
                 'context_used': context,
-                'question': question
+                'question': question,
+                'error': str(e)
             }
     
     def suggest_adaptations(self, subject: str, activity_type: str) -> Dict[str, Any]:
@@ -302,6 +433,13 @@ def format_response(response: Dict[str, Any]) -> str:
             output.append(f"{i}. {source['source']} par {source['author']}")
             output.append(f"   Section : {source['section']}, Page : {source['page']}")
             output.append(f"   Score de pertinence : {source['relevance_score']:.3f}")
+            if source.get('also_in'):
+                output.append(f"   Aussi présent dans : {', '.join(source['also_in'])}")
+    
+    compression = response.get('compression')
+    if compression:
+        output.append(f"\nCONTEXTE COMPRESSÉ : {compression['compressed_tokens']}/{compression['original_tokens']} tokens "
+                      f"(ratio {compression['ratio']}, {compression['tokens_saved']} économisés)")
     
     return "\n".join(output)
 
@@ -0,0 +1,129 @@
+import threading
+import time
+from typing import Dict, Optional
+
+from config import config
+
+
+class RateLimiter:
+    """
+    Thread-safe requests-per-minute and tokens-per-minute limiter.
+
+    Two token buckets are refilled continuously: one counts requests, the other
+    counts model tokens. ``acquire`` blocks until both buckets can pay for the
+    call, so any number of worker threads sharing one limiter stay within a
+    single per-minute budget.
+
+    Token counts are only estimates before a call; ``adjust`` charges or refunds
+    the difference once the real usage is known.
+
+    Attributes:
+        requests_per_minute: Request budget per minute (0 disables the limit)
+        tokens_per_minute: Token budget per minute (0 disables the limit)
+    """
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_allowance = float(requests_per_minute)
+        self._token_allowance = float(tokens_per_minute)
+        self._last_refill = time.monotonic()
+        self._condition = threading.Condition()
+        self.total_requests = 0
+        self.total_tokens = 0
+        self.total_wait_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed_minutes = (now - self._last_refill) / 60
+        self._last_refill = now
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                float(self.requests_per_minute),
+                self._request_allowance + elapsed_minutes * self.requests_per_minute
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed_minutes * self.tokens_per_minute
+            )
+
+    def _wait_time(self, tokens: int) -> float:
+        """Seconds until both buckets can pay for the call (0 if possible now)"""
+        wait = 0.0
+        if self.requests_per_minute and self._request_allowance < 1:
+            wait = max(wait, (1 - self._request_allowance) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute and self._token_allowance < tokens:
+            wait = max(wait, (tokens - self._token_allowance) * 60 / self.tokens_per_minute)
+        return wait
+
+    def acquire(self, tokens: int = 0) -> float:
+        """
+        Block until one request costing ``tokens`` fits in the budget.
+
+        Args:
+            tokens: Estimated tokens for the call (prompt plus max completion)
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if self.tokens_per_minute:
+            # A single call larger than the whole budget would never fit
+            tokens = min(tokens, self.tokens_per_minute)
+
+        waited = 0.0
+        with self._condition:
+            while True:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    break
+                start = time.monotonic()
+                self._condition.wait(timeout=wait)
+                waited += time.monotonic() - start
+
+            self._request_allowance -= 1
+            self._token_allowance -= tokens
+            self.total_requests += 1
+            self.total_tokens += tokens
+            self.total_wait_seconds += waited
+            self._condition.notify_all()
+
+        return waited
+
+    def adjust(self, token_delta: int) -> None:
+        """Charge (positive) or refund (negative) tokens once real usage is known"""
+        with self._condition:
+            self._refill()
+            self._token_allowance -= token_delta
+            if self.tokens_per_minute:
+                self._token_allowance = min(float(self.tokens_per_minute), self._token_allowance)
+            self.total_tokens += token_delta
+            self._condition.notify_all()
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.total_requests,
+            "tokens": self.total_tokens,
+            "wait_seconds": round(self.total_wait_seconds, 2)
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(model: Optional[str] = None) -> RateLimiter:
+    """
+    Return the process-wide limiter for a model.
+
+    Provider limits are set per model, so the chat model and the embedding
+    model each get their own shared budget from the configuration.
+    """
+    model = model or config.CHAT_MODEL
+    with _limiters_lock:
+        if model not in _limiters:
+            if model == config.EMBEDDING_MODEL:
+                _limiters[model] = RateLimiter(config.EMBEDDING_REQUESTS_PER_MINUTE, config.EMBEDDING_TOKENS_PER_MINUTE)
+            else:
+                _limiters[model] = RateLimiter(config.CHAT_REQUESTS_PER_MINUTE, config.CHAT_TOKENS_PER_MINUTE)
+        return _limiters[model]
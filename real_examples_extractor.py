@@ -6,13 +6,45 @@ Analyse les cours avant/après dans pdf-cours-exemple pour créer des exemples d
 
 import os
 import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import re
-from typing import List, Dict, Tuple, Any
+from typing import Callable, List, Dict, Optional, Tuple, Any
 import json
 
+import numpy as np
+
+from adaptation_checkpoint import file_hash
+from config import config
+from deduplication import ChunkDeduplicator
+from example_store import embeddings_sidecar_path
+from section_alignment import align_sections
+from text_utils import fold_accents
+
+# Appariement des fichiers : similarité de Jaccard des mots du nom, ou de la première page (option)
+NAME_SIMILARITY_THRESHOLD = 0.7
+CONTENT_SIMILARITY_THRESHOLD = 0.5
+# Mots distincts minimum de la première page pour l'apparier par contenu (page vide, scannée ou de garde sinon)
+MIN_CONTENT_TOKENS = 20
+DOCUMENT_SUFFIXES = ('.pdf', '.docx')
+
+_NAME_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_CONTENT_TOKEN_RE = re.compile(r"\w+")
+_ADAPTED_MARKERS = frozenset({"dys", "dyslexie", "dyslexique", "adapte", "adaptee"})
+
+# Version de l'extraction : la changer invalide les paires déjà traitées en mode incrémental
+EXTRACTION_VERSION = "2"
+
+def _extract_pair_examples(pair: Dict[str, Any]) -> List[Dict[str, str]]:
+    """Point d'entrée des processus de travail : exemples d'une paire de cours"""
+    return RealExamplesExtractor().extract_pair(pair)
+
+def pair_hash(pair: Dict[str, Any]) -> str:
+    """Empreinte d'une paire : change si le cours normal ou sa version adaptée change"""
+    return f"{file_hash(pair['normal_file'])}:{file_hash(pair['adapted_file'])}"
+
 class RealExamplesExtractor:
-    def __init__(self):
+    def __init__(self, embedder: Optional[Callable[[List[str]], List[List[float]]]] = None):
         self.examples_dir = "pdf-cours-exemple"
         self.examples_data = {
             "sections": [],
@@ -20,38 +52,120 @@ class RealExamplesExtractor:
             "instructions": [],
             "introductions": []
         }
+        # Fonction d'embedding par lots (par défaut : VectorStore.batch_generate_embeddings)
+        self.embedder = embedder
+        self.embeddings: Optional[np.ndarray] = None
     
-    def find_course_pairs(self) -> List[Dict[str, Any]]:
-        """Trouve toutes les paires de cours normal/adapté"""
-        pairs = []
+    def embed_examples(self, examples: Dict) -> Optional[np.ndarray]:
+        """Calcule l'embedding normalisé (float32) du texte original de chaque exemple"""
+        texts = [example['original'] for example in examples['sections']]
+        if not texts:
+            return None
+        if self.embedder is None:
+            from vector_store import VectorStore
+            self.embedder = VectorStore().batch_generate_embeddings
+        
+        print(f"\n🧮 Calcul des embeddings de {len(texts)} exemples...")
+        try:
+            vectors = np.asarray(self.embedder(texts), dtype=np.float32)
+        except Exception as e:
+            print(f"⚠️  Embeddings non calculés ({e}) : la sélection se fera par mots-clés")
+            return None
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+    
+    def find_course_pairs(self, use_content: bool = False) -> List[Dict[str, Any]]:
+        """Trouve toutes les paires de cours normal/adapté dans toute l'arborescence
+        
+        Un seul parcours de pdf-cours-exemple indexe les fichiers adaptés par
+        signature MinHash des mots de leur nom (marqueurs « dys », « adapté »…
+        retirés), découpée en bandes LSH : chaque cours normal n'est comparé
+        qu'aux fichiers adaptés qui partagent une bande avec lui, où qu'ils
+        soient rangés. Avec use_content, la première page de chaque fichier est
+        aussi indexée, ce qui retrouve les fichiers renommés. Une première page
+        de moins de MIN_CONTENT_TOKENS mots distincts (vide ou scannée) n'est
+        pas indexée : deux pages vides auraient des signatures identiques.
+        
+        Les paires candidates sont ensuite retenues de la plus similaire à la
+        moins similaire, chaque fichier n'étant utilisé qu'une fois ; à score
+        égal, un fichier du même dossier est préféré.
+        """
+        normal_files, adapted_files = [], []
+        for root, dirs, files in os.walk(self.examples_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in sorted(files):
+                if name.lower().endswith(DOCUMENT_SUFFIXES):
+                    path = Path(root) / name
+                    (adapted_files if self._is_adapted_file(name) else normal_files).append(path)
+        
+        name_hasher = ChunkDeduplicator(num_perm=32, bands=16, shingle_size=1)
+        content_hasher = ChunkDeduplicator(num_perm=64, bands=16, shingle_size=1)
+        
+        def fingerprints(path: Path) -> Dict[str, Any]:
+            tokens = self._name_tokens(path)
+            entry = {"tokens": tokens, "name_sig": name_hasher.signature(" ".join(sorted(tokens)))}
+            if use_content:
+                text = self._first_page_text(str(path))
+                enough = len(set(_CONTENT_TOKEN_RE.findall(text.lower()))) >= MIN_CONTENT_TOKENS
+                entry["content_sig"] = content_hasher.signature(text) if enough else None
+            return entry
         
-        for level_dir in Path(self.examples_dir).iterdir():
-            if level_dir.is_dir() and level_dir.name != ".DS_Store":
-                print(f"🔍 Analyse niveau : {level_dir.name}")
-                
-                for chapter_dir in level_dir.iterdir():
-                    if chapter_dir.is_dir():
-                        files = list(chapter_dir.glob("*"))
-                        
-                        # Chercher les paires normal/DYS
-                        normal_files = [f for f in files if not self._is_adapted_file(f.name)]
-                        adapted_files = [f for f in files if self._is_adapted_file(f.name)]
-                        
-                        for normal_file in normal_files:
-                            # Chercher le fichier adapté correspondant
-                            adapted_file = self._find_matching_adapted(normal_file, adapted_files)
-                            
-                            if adapted_file:
-                                pair = {
-                                    "level": level_dir.name,
-                                    "chapter": chapter_dir.name,
-                                    "normal_file": str(normal_file),
-                                    "adapted_file": str(adapted_file),
-                                    "subject": self._guess_subject(normal_file.name)
-                                }
-                                pairs.append(pair)
-                                print(f"   ✅ Paire trouvée : {normal_file.name} → {adapted_file.name}")
+        def lsh_keys(entry: Dict[str, Any]) -> List[Tuple[str, int, Tuple[int, ...]]]:
+            keys = [("name", band, key) for band, key in name_hasher.band_keys(entry["name_sig"])]
+            if entry.get("content_sig") is not None:
+                keys += [("content", band, key) for band, key in content_hasher.band_keys(entry["content_sig"])]
+            return keys
         
+        # Index LSH des fichiers adaptés
+        adapted = [fingerprints(path) for path in adapted_files]
+        buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = {}
+        for index, entry in enumerate(adapted):
+            for key in lsh_keys(entry):
+                buckets.setdefault(key, []).append(index)
+        
+        candidates = []
+        for normal_index, normal_file in enumerate(normal_files):
+            entry = fingerprints(normal_file)
+            matches = set()
+            for key in lsh_keys(entry):
+                matches.update(buckets.get(key, ()))
+            
+            for adapted_index in matches:
+                other = adapted[adapted_index]
+                union = entry["tokens"] | other["tokens"]
+                name_score = len(entry["tokens"] & other["tokens"]) / len(union) if union else 0.0
+                content_score = 0.0
+                if entry.get("content_sig") is not None and other.get("content_sig") is not None:
+                    content_score = content_hasher.similarity(entry["content_sig"], other["content_sig"])
+                if name_score >= NAME_SIMILARITY_THRESHOLD or content_score >= CONTENT_SIMILARITY_THRESHOLD:
+                    same_folder = normal_file.parent == adapted_files[adapted_index].parent
+                    candidates.append((name_score + content_score + (0.01 if same_folder else 0.0),
+                                       normal_index, adapted_index))
+        
+        # Appariement global : meilleures paires d'abord, chaque fichier une seule fois
+        used_normal, used_adapted = set(), set()
+        pairs = []
+        for _, normal_index, adapted_index in sorted(candidates, key=lambda c: (-c[0], c[1], c[2])):
+            if normal_index in used_normal or adapted_index in used_adapted:
+                continue
+            used_normal.add(normal_index)
+            used_adapted.add(adapted_index)
+            normal_file, adapted_file = normal_files[normal_index], adapted_files[adapted_index]
+            
+            parts = normal_file.relative_to(self.examples_dir).parts
+            pairs.append({
+                "level": parts[0] if len(parts) > 1 else "",
+                "chapter": normal_file.parent.name if len(parts) > 2 else "",
+                "normal_file": str(normal_file),
+                "adapted_file": str(adapted_file),
+                "subject": self._guess_subject(normal_file.name)
+            })
+            moved = "" if normal_file.parent == adapted_file.parent else f" (dossier {adapted_file.parent})"
+            print(f"   ✅ Paire trouvée : {normal_file.name} → {adapted_file.name}{moved}")
+        
+        pairs.sort(key=lambda pair: pair["normal_file"])
+        print(f"🔍 {len(normal_files)} cours normaux, {len(adapted_files)} adaptés, {len(pairs)} paires")
         return pairs
     
     def _is_adapted_file(self, filename: str) -> bool:
@@ -59,37 +173,22 @@ class RealExamplesExtractor:
         indicators = ['dys', 'DYS', 'dyslexie', 'adapté', 'adapte']
         return any(indicator in filename.lower() for indicator in indicators)
     
-    def _find_matching_adapted(self, normal_file: Path, adapted_files: List[Path]) -> Path:
-        """Trouve le fichier adapté correspondant au fichier normal"""
-        normal_name = normal_file.stem.lower()
-        
-        for adapted_file in adapted_files:
-            adapted_name = adapted_file.stem.lower()
-            
-            # Nettoyer les noms pour la comparaison
-            normal_clean = re.sub(r'[^\w\s]', '', normal_name)
-            adapted_clean = re.sub(r'[^\w\s]', '', adapted_name)
-            adapted_clean = re.sub(r'\b(dys|dyslexie|adapté|adapte)\b', '', adapted_clean)
-            
-            # Calculer la similarité
-            if self._are_similar(normal_clean, adapted_clean.strip()):
-                return adapted_file
-        
-        return None
+    def _name_tokens(self, path: Path) -> set:
+        """Mots du nom de fichier, sans accents ni marqueurs de version adaptée"""
+        return set(_NAME_TOKEN_RE.findall(fold_accents(path.stem))) - _ADAPTED_MARKERS
     
-    def _are_similar(self, name1: str, name2: str, threshold: float = 0.7) -> bool:
-        """Calcule si deux noms de fichiers sont similaires"""
-        words1 = set(name1.split())
-        words2 = set(name2.split())
-        
-        if not words1 or not words2:
-            return False
-        
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        similarity = len(intersection) / len(union)
-        return similarity >= threshold
+    def _first_page_text(self, file_path: str) -> str:
+        """Texte de la première page (ou des premiers paragraphes d'un DOCX)"""
+        try:
+            if file_path.endswith('.pdf'):
+                doc = fitz.open(file_path)
+                text = doc[0].get_text() if len(doc) else ""
+                doc.close()
+                return text
+            return self._extract_from_docx(file_path)[:3000]
+        except Exception as e:
+            print(f"⚠️  Première page illisible {file_path}: {e}")
+            return ""
     
     def _guess_subject(self, filename: str) -> str:
         """Devine la matière à partir du nom de fichier"""
@@ -108,11 +207,15 @@ class RealExamplesExtractor:
         else:
             return "Histoire"  # Par défaut
     
-    def extract_text_from_file(self, file_path: str) -> str:
-        """Extrait le texte d'un fichier PDF ou DOCX"""
+    def extract_text_from_file(self, file_path: str, max_sections: int = None) -> str:
+        """Extrait le texte d'un fichier PDF ou DOCX
+        
+        Avec max_sections, la lecture d'un PDF s'arrête à la page où commence la
+        section suivante : les max_sections premières sections sont alors complètes.
+        """
         try:
             if file_path.endswith('.pdf'):
-                return self._extract_from_pdf(file_path)
+                return self._extract_from_pdf(file_path, max_sections)
             elif file_path.endswith('.docx'):
                 return self._extract_from_docx(file_path)
             else:
@@ -122,14 +225,29 @@ class RealExamplesExtractor:
             print(f"❌ Erreur extraction {file_path}: {e}")
             return ""
     
-    def _extract_from_pdf(self, pdf_path: str) -> str:
-        """Extrait le texte d'un PDF"""
+    def _extract_from_pdf(self, pdf_path: str, max_sections: int = None) -> str:
+        """Extrait le texte d'un PDF, page par page
+        
+        Les sections sont comptées au fil des pages, sans redécouper le texte
+        déjà lu : comme _split_into_sections, une section par titre, plus une
+        section initiale si le texte ne commence pas par un titre.
+        """
         doc = fitz.open(pdf_path)
-        text = ""
+        pages = []
+        titles = 0
+        leading_section = None
         for page in doc:
-            text += page.get_text() + "\n"
+            page_text = page.get_text()
+            pages.append(page_text + "\n")
+            if max_sections:
+                lines = [line.strip() for line in page_text.split('\n')]
+                if leading_section is None:
+                    leading_section = 0 if self._is_section_title(lines[0]) else 1
+                titles += sum(1 for line in lines if self._is_section_title(line))
+                if titles + leading_section > max_sections:
+                    break
         doc.close()
-        return text
+        return "".join(pages)
     
     def _extract_from_docx(self, docx_path: str) -> str:
         """Extrait le texte d'un fichier DOCX"""
@@ -155,17 +273,17 @@ class RealExamplesExtractor:
         normal_sections = self._split_into_sections(normal_text)
         adapted_sections = self._split_into_sections(adapted_text)
         
-        # Essayer de faire correspondre les sections
-        for i, normal_section in enumerate(normal_sections[:3]):  # Limiter à 3 exemples
-            if i < len(adapted_sections):
-                adapted_section = adapted_sections[i]
-                
-                if len(normal_section) > 100 and len(adapted_section) > 50:
-                    example = {
-                        "original": normal_section[:500] + "..." if len(normal_section) > 500 else normal_section,
-                        "adapted": adapted_section[:500] + "..." if len(adapted_section) > 500 else adapted_section
-                    }
-                    examples.append(example)
+        # Aligner les sections des deux versions (ordre conservé, sections ajoutées ou supprimées ignorées)
+        for i, j, _ in align_sections(normal_sections, adapted_sections):
+            normal_section = normal_sections[i]
+            adapted_section = adapted_sections[j]
+            
+            if len(normal_section) > 100 and len(adapted_section) > 50:
+                example = {
+                    "original": normal_section[:500] + "..." if len(normal_section) > 500 else normal_section,
+                    "adapted": adapted_section[:500] + "..." if len(adapted_section) > 500 else adapted_section
+                }
+                examples.append(example)
         
         return examples
     
@@ -209,50 +327,159 @@ class RealExamplesExtractor:
         
         return any(patterns)
     
-    def extract_all_examples(self) -> Dict[str, List[Dict]]:
-        """Extrait tous les exemples des cours avant/après"""
-        pairs = self.find_course_pairs()
+    def extract_pair(self, pair: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Exemples de sections d'une paire de cours normal/adapté"""
+        normal_text = self.extract_text_from_file(pair['normal_file'], config.EXAMPLE_MAX_SECTIONS)
+        adapted_text = self.extract_text_from_file(pair['adapted_file'], config.EXAMPLE_MAX_SECTIONS)
+        if not normal_text or not adapted_text:
+            return []
+        
+        section_examples = self.extract_sections_comparison(normal_text, adapted_text)
+        for example in section_examples:
+            example['subject'] = pair['subject']
+            example['source'] = f"{pair['level']} - {pair['chapter']}"
+            example['level'] = pair['level']
+            example['pair'] = pair['normal_file']
+        return section_examples
+    
+    def _load_previous(self, filename: str) -> Tuple[Dict, Optional[np.ndarray]]:
+        """Exemples déjà extraits (et leurs embeddings s'ils sont encore valables)"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                examples = json.load(f)
+        except (OSError, ValueError):
+            return {"sections": [], "metadata": {}}, None
+        
+        embeddings = None
+        info = examples.get('metadata', {}).get('embeddings')
+        if (info and info.get('model') == config.EMBEDDING_MODEL
+                and info.get('dimension') == config.EMBEDDING_DIMENSION):
+            try:
+                embeddings = np.load(embeddings_sidecar_path(filename))
+            except (OSError, ValueError):
+                embeddings = None
+            if embeddings is not None and len(embeddings) != len(examples.get('sections', [])):
+                embeddings = None
+        return examples, embeddings
+    
+    def extract_all_examples(self, compute_embeddings: bool = True, incremental: bool = False,
+                             workers: int = None, filename: str = "real_adaptation_examples.json",
+                             use_content: bool = False,
+                             pairs: List[Dict[str, Any]] = None) -> Dict[str, List[Dict]]:
+        """Extrait tous les exemples des cours avant/après
+        
+        Les paires sont traitées en parallèle dans un pool de processus
+        (config.EXAMPLE_EXTRACTION_WORKERS par défaut ; 1 = dans ce processus).
+        
+        En mode incrémental, les paires déjà traitées dans filename et dont les
+        deux fichiers n'ont pas changé (même empreinte) ne sont pas relues :
+        leurs exemples et leurs embeddings sont repris tels quels, et seuls les
+        exemples des paires nouvelles ou modifiées sont extraits et ajoutés.
+        
+        Avec compute_embeddings, l'embedding du texte original de chaque exemple
+        est calculé une fois ici ; save_examples l'enregistre dans un fichier
+        binaire à côté du JSON, pour que le fournisseur d'exemples n'ait plus
+        qu'à embarquer le contenu à adapter.
+        
+        pairs évite de refaire la recherche (et de relire les premières pages)
+        quand l'appelant a déjà appelé find_course_pairs.
+        """
+        if pairs is None:
+            pairs = self.find_course_pairs(use_content)
+        hashes = {pair['normal_file']: pair_hash(pair) for pair in pairs}
         all_examples = {
             "sections": [],
             "metadata": {
                 "total_pairs": len(pairs),
                 "processed": 0,
-                "subjects": []
+                "subjects": [],
+                "extraction_version": EXTRACTION_VERSION,
+                "pairs": {}
             }
         }
         
+        # Paires inchangées depuis la dernière extraction : exemples repris
+        kept_rows: List[int] = []
+        previous_embeddings = None
+        if incremental:
+            previous, previous_embeddings = self._load_previous(filename)
+            previous_pairs = {}
+            if previous.get('metadata', {}).get('extraction_version') == EXTRACTION_VERSION:
+                previous_pairs = previous['metadata'].get('pairs', {})
+            unchanged = {key for key, digest in previous_pairs.items() if hashes.get(key) == digest}
+            for row, example in enumerate(previous.get('sections', [])):
+                if example.get('pair') in unchanged:
+                    kept_rows.append(row)
+                    all_examples['sections'].append(example)
+            for key in unchanged:
+                all_examples['metadata']['pairs'][key] = hashes[key]
+            pairs = [pair for pair in pairs if pair['normal_file'] not in unchanged]
+            print(f"\n♻️  {len(unchanged)} paires inchangées, {len(kept_rows)} exemples repris")
+        
         print(f"\n📚 Extraction d'exemples à partir de {len(pairs)} paires de cours...")
         
-        for i, pair in enumerate(pairs, 1):
-            print(f"\n🔄 Traitement {i}/{len(pairs)}: {pair['chapter']}")
-            
-            try:
-                # Extraire les textes
-                normal_text = self.extract_text_from_file(pair['normal_file'])
-                adapted_text = self.extract_text_from_file(pair['adapted_file'])
-                
-                if normal_text and adapted_text:
-                    # Extraire les exemples de sections
-                    section_examples = self.extract_sections_comparison(normal_text, adapted_text)
-                    
-                    for example in section_examples:
-                        example['subject'] = pair['subject']
-                        example['source'] = f"{pair['level']} - {pair['chapter']}"
-                        all_examples['sections'].append(example)
-                    
-                    print(f"   ✅ {len(section_examples)} exemples extraits")
-                    all_examples['metadata']['processed'] += 1
-                    
-                    if pair['subject'] not in all_examples['metadata']['subjects']:
-                        all_examples['metadata']['subjects'].append(pair['subject'])
-                
-            except Exception as e:
-                print(f"   ❌ Erreur : {e}")
+        workers = workers or config.EXAMPLE_EXTRACTION_WORKERS
+        new_examples: List[Dict] = []
+        if workers > 1 and len(pairs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pairs))) as executor:
+                futures = [executor.submit(_extract_pair_examples, pair) for pair in pairs]
+                for i, (pair, future) in enumerate(zip(pairs, futures), 1):
+                    self._collect_pair(i, len(pairs), pair, future.result, hashes, all_examples, new_examples)
+        else:
+            for i, pair in enumerate(pairs, 1):
+                self._collect_pair(i, len(pairs), pair, lambda: self.extract_pair(pair), hashes,
+                                   all_examples, new_examples)
+        all_examples['sections'].extend(new_examples)
+        
+        for example in all_examples['sections']:
+            if example['subject'] not in all_examples['metadata']['subjects']:
+                all_examples['metadata']['subjects'].append(example['subject'])
+        all_examples['metadata']['processed'] = len(all_examples['metadata']['pairs'])
         
+        self.embeddings = None
+        if compute_embeddings:
+            if previous_embeddings is not None:
+                # Seuls les nouveaux exemples sont envoyés au modèle d'embedding
+                new_embeddings = self.embed_examples({"sections": new_examples}) if new_examples else None
+                if new_examples and new_embeddings is None:
+                    self.embeddings = None
+                else:
+                    parts = [previous_embeddings[kept_rows].astype(np.float32, copy=False)]
+                    if new_embeddings is not None:
+                        parts.append(new_embeddings)
+                    self.embeddings = np.vstack(parts)
+            else:
+                self.embeddings = self.embed_examples(all_examples)
         return all_examples
     
+    def _collect_pair(self, i: int, total: int, pair: Dict[str, Any], extract: Callable[[], List[Dict]],
+                      hashes: Dict[str, str], all_examples: Dict, new_examples: List[Dict]) -> None:
+        """Récupère le résultat d'une paire (dans l'ordre des paires) et l'enregistre"""
+        print(f"\n🔄 Traitement {i}/{total}: {pair['chapter']}")
+        try:
+            section_examples = extract()
+        except Exception as e:
+            print(f"   ❌ Erreur : {e}")
+            return
+        new_examples.extend(section_examples)
+        all_examples['metadata']['pairs'][pair['normal_file']] = hashes[pair['normal_file']]
+        print(f"   ✅ {len(section_examples)} exemples extraits")
+    
     def save_examples(self, examples: Dict, filename: str = "real_adaptation_examples.json"):
-        """Sauvegarde les exemples extraits"""
+        """Sauvegarde les exemples extraits (et leurs embeddings s'ils ont été calculés)"""
+        sidecar = embeddings_sidecar_path(filename)
+        if self.embeddings is not None and len(self.embeddings) == len(examples['sections']):
+            # Écrit avant le JSON : le fournisseur recharge les deux quand le JSON change
+            np.save(sidecar, self.embeddings)
+            examples['metadata']['embeddings'] = {
+                "file": os.path.basename(sidecar),
+                "model": config.EMBEDDING_MODEL,
+                "count": int(self.embeddings.shape[0]),
+                "dimension": int(self.embeddings.shape[1])
+            }
+        else:
+            examples['metadata'].pop('embeddings', None)
+        
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(examples, f, ensure_ascii=False, indent=2)
         
@@ -260,13 +487,27 @@ class RealExamplesExtractor:
         print(f"   📊 Total sections : {len(examples['sections'])}")
         print(f"   📝 Paires traitées : {examples['metadata']['processed']}")
         print(f"   📚 Matières : {', '.join(examples['metadata']['subjects'])}")
+        if 'embeddings' in examples['metadata']:
+            print(f"   🧮 Embeddings : {sidecar}")
 
 def main():
     """Point d'entrée principal"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Extraction des exemples réels d'adaptation")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Ne traiter que les paires nouvelles ou modifiées depuis la dernière extraction")
+    parser.add_argument('--workers', type=int, default=None,
+                        help=f"Processus d'extraction en parallèle (défaut: {config.EXAMPLE_EXTRACTION_WORKERS})")
+    parser.add_argument('--content', action='store_true',
+                        help="Apparier aussi les fichiers par le contenu de leur première page (fichiers renommés)")
+    parser.add_argument('--output', default="real_adaptation_examples.json", help="Fichier d'exemples JSON")
+    args = parser.parse_args()
+    
     extractor = RealExamplesExtractor()
     
     print("🔍 Recherche des cours avant/après...")
-    pairs = extractor.find_course_pairs()
+    pairs = extractor.find_course_pairs(args.content)
     
     if not pairs:
         print("❌ Aucune paire de cours trouvée")
@@ -275,10 +516,11 @@ def main():
     print(f"\n✅ {len(pairs)} paires de cours trouvées")
     
     # Extraire tous les exemples
-    examples = extractor.extract_all_examples()
+    examples = extractor.extract_all_examples(incremental=args.incremental, workers=args.workers,
+                                              filename=args.output, pairs=pairs)
     
     # Sauvegarder
-    extractor.save_examples(examples)
+    extractor.save_examples(examples, args.output)
     
     # Afficher un aperçu
     if examples['sections']:
@@ -4,14 +4,261 @@ Fournisseur d'Exemples Réels d'Adaptation
 Utilise les exemples extraits des cours réels pour améliorer les adaptations
 """
 
+import hashlib
 import json
+import math
+import os
 import random
-from typing import List, Dict, Optional
+import threading
+import time
+from collections import Counter
+from typing import Callable, List, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import config
+from example_store import ExampleStore, embeddings_sidecar_path
+from text_utils import fold_accents, tokenize
+
+class ExampleIndex:
+    """
+    Index TF-IDF inversé des textes originaux des exemples.
+    
+    Construit une fois au chargement : pour chaque terme (accents pliés, mots
+    vides retirés), la liste des exemples qui le contiennent et leur poids
+    TF-IDF normalisé. Une recherche ne parcourt que les listes des termes de la
+    requête et accumule les scores dans un vecteur numpy : son coût dépend de
+    la requête, pas du nombre d'exemples.
+    
+    Si les embeddings des exemples sont fournis (une ligne normalisée par
+    exemple), top_k_by_embedding les compare au contenu en un seul produit
+    matrice-vecteur.
+    """
+    def __init__(self, sections: List[Dict], embeddings: Optional[np.ndarray] = None):
+        self.sections = sections
+        self.embeddings = embeddings
+        self._subject_masks: Dict[str, np.ndarray] = {}
+        
+        counts: Dict[str, Dict[int, int]] = {}
+        for doc, example in enumerate(sections):
+            for term, count in Counter(tokenize(example.get('original', ''))).items():
+                counts.setdefault(term, {})[doc] = count
+        
+        size = len(sections)
+        self.idf = {term: math.log((1 + size) / (1 + len(docs))) + 1 for term, docs in counts.items()}
+        
+        # Poids TF-IDF (tf sous-linéaire), puis normalisation de chaque exemple
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        norms = np.zeros(size, dtype=np.float64)
+        for term, docs in counts.items():
+            doc_ids = np.fromiter(docs.keys(), dtype=np.int32, count=len(docs))
+            weights = (1 + np.log(np.fromiter(docs.values(), dtype=np.float64, count=len(docs)))) * self.idf[term]
+            self.postings[term] = (doc_ids, weights)
+            norms[doc_ids] += weights ** 2
+        norms = np.sqrt(norms)
+        norms[norms == 0] = 1.0
+        for term, (doc_ids, weights) in self.postings.items():
+            self.postings[term] = (doc_ids, (weights / norms[doc_ids]).astype(np.float32))
+    
+    def __len__(self) -> int:
+        return len(self.sections)
+    
+    def subject_mask(self, subject: str) -> Optional[np.ndarray]:
+        """Exemples de la matière (None si aucun : toutes les matières sont alors candidates)"""
+        key = fold_accents(subject)
+        if key not in self._subject_masks:
+            mask = np.fromiter((key in fold_accents(example.get('subject', '')) for example in self.sections),
+                               dtype=bool, count=len(self.sections))
+            self._subject_masks[key] = mask
+        mask = self._subject_masks[key]
+        return mask if mask.any() else None
+    
+    def scores(self, text: str) -> np.ndarray:
+        """Similarité cosinus TF-IDF entre le texte et chaque exemple"""
+        scores = np.zeros(len(self.sections), dtype=np.float32)
+        query_norm = 0.0
+        for term, count in Counter(tokenize(text)).items():
+            posting = self.postings.get(term)
+            if posting is not None:
+                doc_ids, weights = posting
+                query_weight = (1 + math.log(count)) * self.idf[term]
+                scores[doc_ids] += weights * query_weight
+                query_norm += query_weight ** 2
+        if query_norm:
+            scores /= math.sqrt(query_norm)
+        return scores
+    
+    def top_k(self, text: str, k: int = 1, subject: str = None) -> List[Tuple[int, float]]:
+        """Les k exemples les plus proches du texte (indice, score), score décroissant
+        
+        Seuls les exemples partageant au moins un terme avec le texte sont retournés.
+        """
+        if not self.sections or k <= 0:
+            return []
+        return self._best(self.scores(text), k, subject)
+    
+    def top_k_by_embedding(self, vector: List[float], k: int = 1, subject: str = None) -> List[Tuple[int, float]]:
+        """Les k exemples dont l'embedding est le plus proche (similarité cosinus)"""
+        if self.embeddings is None or not self.sections or k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        return self._best(self.embeddings @ query, k, subject, minimum=-np.inf)
+    
+    def _best(self, scores: np.ndarray, k: int, subject: str = None,
+              minimum: float = 0.0) -> List[Tuple[int, float]]:
+        """Les k meilleurs scores au-dessus de minimum, restreints à la matière si possible"""
+        if subject:
+            mask = self.subject_mask(subject)
+            if mask is not None:
+                scores = np.where(mask, scores, -np.inf)
+        
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(i), float(scores[i])) for i in best if scores[i] > minimum]
+
+def is_example_store(examples_file: str) -> bool:
+    """Le fichier d'exemples est-il une base SQLite (voir example_store.py) plutôt qu'un JSON ?"""
+    return examples_file.endswith((".sqlite", ".db"))
 
 class RealExamplesProvider:
-    def __init__(self, examples_file: str = "real_adaptation_examples.json"):
-        self.examples_file = examples_file
-        self.examples = self._load_examples()
+    """
+    Exemples réels d'adaptation pour les prompts.
+    
+    Deux sources possibles :
+    - un fichier JSON (real_adaptation_examples.json), lu en entier ;
+    - une base SQLite partitionnée par matière et niveau (.sqlite), dont seules
+      les partitions de la matière demandée sont lues, à la première demande.
+    """
+    def __init__(self, examples_file: str = None,
+                 embedder: Optional[Callable[[str], List[float]]] = None):
+        self.examples_file = examples_file or config.REAL_EXAMPLES_PATH
+        # Embedding du contenu à adapter (par défaut : VectorStore.generate_embedding, créé au besoin)
+        self.embedder = embedder
+        self.examples: Dict = {"sections": [], "metadata": {}}
+        self.index = ExampleIndex([])
+        # Base SQLite ouverte en lecture seule (None en mode JSON, ou tant que la base n'existe pas)
+        self.store: Optional[ExampleStore] = None
+        # Index des partitions déjà lues, par matière (mode base SQLite)
+        self._subject_indexes: Dict[str, ExampleIndex] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+        # Statistiques du cache (voir get_cache_stats)
+        self.loads = 0
+        self.load_seconds = 0.0
+        self.hits = 0
+        self.refresh()
+    
+    def _open_store(self) -> Optional[ExampleStore]:
+        """Base d'exemples en lecture seule : seule la commande import d'example_store.py la crée"""
+        try:
+            return ExampleStore(self.examples_file, read_only=True)
+        except FileNotFoundError:
+            print(f"⚠️  Base d'exemples {self.examples_file} non trouvée : les prompts n'auront pas d'exemple réel "
+                  f"(python example_store.py import)")
+            return None
+    
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """Date de modification et taille du fichier d'exemples (None s'il n'existe pas)"""
+        try:
+            stat = os.stat(self.examples_file)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def refresh(self) -> bool:
+        """Recharger les exemples seulement si le fichier a changé depuis le dernier chargement
+        
+        Retourne True si le fichier a été relu. Le nouveau contenu remplace
+        l'ancien d'un seul coup : un thread qui lit les exemples pendant un
+        rechargement voit l'ancienne ou la nouvelle version, jamais un mélange.
+        """
+        signature = self._file_signature()
+        with self._lock:
+            if self.loads and signature == self._signature:
+                self.hits += 1
+                return False
+            start = time.perf_counter()
+            if is_example_store(self.examples_file):
+                if self.store is None:
+                    self.store = self._open_store()
+                    if self.store is None:
+                        self.examples = {"sections": [], "metadata": {}}
+                        self._signature = signature
+                        self.loads += 1
+                        return True
+                # Rien n'est lu ici : les partitions le seront à la demande
+                self.examples = {"sections": [], "metadata": self.store.metadata()}
+                self._subject_indexes = {}
+                self._signature = signature
+                self.loads += 1
+                self.load_seconds += time.perf_counter() - start
+                return True
+            examples = self._load_examples()
+            # L'index garde sa propre référence aux exemples : il reste cohérent même pendant un rechargement
+            self.index = ExampleIndex(examples.get("sections", []), self._load_embeddings(examples))
+            self.examples = examples
+            self._signature = signature
+            self.loads += 1
+            self.load_seconds += time.perf_counter() - start
+            return True
+    
+    def _candidates(self, subject: str = None) -> ExampleIndex:
+        """Index des exemples candidats pour une matière
+        
+        Avec un fichier JSON, c'est l'index de tous les exemples. Avec une base
+        SQLite, seules les partitions de la matière sont lues (toutes si la
+        matière n'en a aucune), puis gardées en mémoire jusqu'au prochain
+        changement de la base.
+        """
+        if self.store is None:
+            return self.index
+        key = fold_accents(subject) if subject else ""
+        index = self._subject_indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._subject_indexes.get(key)
+                if index is None:
+                    start = time.perf_counter()
+                    shards = self.store.matching_shards(subject) or self.store.matching_shards()
+                    sections, embeddings = self.store.load_shards(shards)
+                    if not self._embeddings_match(self.examples):
+                        embeddings = None
+                    index = ExampleIndex(sections, embeddings)
+                    self._subject_indexes[key] = index
+                    self.load_seconds += time.perf_counter() - start
+        return index
+    
+    @staticmethod
+    def _embeddings_match(examples: Dict) -> bool:
+        """Les embeddings enregistrés ont-ils été calculés avec le modèle et la dimension actuels ?"""
+        info = examples.get("metadata", {}).get("embeddings")
+        return (bool(info) and info.get("model") == config.EMBEDDING_MODEL
+                and info.get("dimension") == config.EMBEDDING_DIMENSION)
+    
+    def _load_embeddings(self, examples: Dict) -> Optional[np.ndarray]:
+        """Charge les embeddings des exemples s'ils correspondent au fichier et au modèle actuels"""
+        if not self._embeddings_match(examples):
+            return None
+        try:
+            embeddings = np.load(embeddings_sidecar_path(self.examples_file))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Embeddings des exemples illisibles ({e}) : sélection par mots-clés")
+            return None
+        if embeddings.ndim != 2 or len(embeddings) != len(examples.get("sections", [])):
+            print("⚠️  Embeddings des exemples périmés : relancer real_examples_extractor.py")
+            return None
+        return embeddings.astype(np.float32, copy=False)
+    
+    def get_cache_stats(self) -> Dict:
+        """Nombre de chargements du fichier, temps passé à le lire et appels servis sans relecture"""
+        with self._lock:
+            return {
+                "loads": self.loads,
+                "load_seconds": round(self.load_seconds, 4),
+                "hits": self.hits
+            }
     
     def _load_examples(self) -> Dict:
         """Charge les exemples depuis le fichier JSON"""
@@ -25,25 +272,36 @@ class RealExamplesProvider:
             print(f"❌ Erreur chargement exemples : {e}")
             return {"sections": [], "metadata": {}}
     
-    def get_section_example(self, subject: str = None) -> str:
-        """Récupère un exemple de section adapté"""
-        if not self.examples.get("sections"):
+    def get_section_example(self, subject: str = None, key: str = None) -> str:
+        """Récupère un exemple de section adapté
+        
+        Sans clé, l'exemple est tiré au hasard. Avec une clé (le contenu à
+        adapter), c'est toujours le même exemple pour la même clé : le prompt,
+        et donc sa clé dans le cache d'adaptations, reste stable d'une exécution
+        à l'autre.
+        """
+        sections = self._candidates(subject).sections
+        if not sections:
             return ""
         
         # Filtrer par matière si spécifiée
-        available_examples = self.examples["sections"]
+        available_examples = sections
         if subject:
             available_examples = [
-                ex for ex in self.examples["sections"]
+                ex for ex in sections
                 if subject.lower() in ex.get("subject", "").lower()
             ]
             
             # Si pas d'exemple pour cette matière, prendre tous
             if not available_examples:
-                available_examples = self.examples["sections"]
+                available_examples = sections
         
-        # Prendre un exemple aléatoire
-        example = random.choice(available_examples)
+        if key:
+            digest = int(hashlib.sha1(key.encode('utf-8')).hexdigest(), 16)
+            example = available_examples[digest % len(available_examples)]
+        else:
+            # Prendre un exemple aléatoire
+            example = random.choice(available_examples)
         
         return self._format_section_example(example)
     
@@ -63,14 +321,15 @@ MAINTENANT, ADAPTE TON TEXTE DE LA MÊME FAÇON :
     
     def get_multiple_examples(self, count: int = 2, subject: str = None) -> str:
         """Récupère plusieurs exemples pour enrichir le prompt"""
-        if not self.examples.get("sections") or len(self.examples["sections"]) == 0:
+        sections = self._candidates(subject).sections
+        if not sections:
             return ""
         
         # Filtrer par matière
-        available_examples = self.examples["sections"]
+        available_examples = sections
         if subject:
             subject_examples = [
-                ex for ex in self.examples["sections"]
+                ex for ex in sections
                 if subject.lower() in ex.get("subject", "").lower()
             ]
             if subject_examples:
@@ -98,45 +357,52 @@ APRÈS (texte adapté) :
         formatted_examples += "MAINTENANT, ADAPTE TON CONTENU EN SUIVANT CES EXEMPLES :\n"
         return formatted_examples
     
+    def get_best_examples(self, content: str, k: int = 3, subject: str = None) -> List[Dict]:
+        """Les k exemples les plus proches du contenu (similarité TF-IDF), du plus proche au moins proche
+        
+        Les exemples de la matière sont préférés ; s'il n'y en a aucun, toutes
+        les matières sont candidates.
+        """
+        index = self._candidates(subject)
+        if index.embeddings is not None and config.REAL_EXAMPLES_USE_EMBEDDINGS and content.strip():
+            try:
+                if self.embedder is None:
+                    from vector_store import VectorStore
+                    self.embedder = VectorStore().generate_embedding
+                best = index.top_k_by_embedding(self.embedder(content), k, subject)
+                return [index.sections[i] for i, _ in best]
+            except Exception as e:
+                print(f"⚠️  Sélection par embedding impossible ({e}) : sélection par mots-clés")
+        return [index.sections[i] for i, _ in index.top_k(content, k, subject)]
+    
     def get_best_example_for_content(self, content: str, subject: str = None) -> str:
         """Trouve le meilleur exemple basé sur la similarité du contenu"""
-        if not self.examples.get("sections"):
-            return self.get_section_example(subject)
-        
-        # Filtrer par matière
-        candidates = self.examples["sections"]
-        if subject:
-            subject_candidates = [
-                ex for ex in candidates
-                if subject.lower() in ex.get("subject", "").lower()
-            ]
-            if subject_candidates:
-                candidates = subject_candidates
-        
-        # Calculer la similarité (simple basé sur les mots communs)
-        content_words = set(content.lower().split())
-        best_example = None
-        best_score = 0
-        
-        for example in candidates:
-            original_words = set(example['original'].lower().split())
-            score = len(content_words.intersection(original_words))
-            
-            if score > best_score:
-                best_score = score
-                best_example = example
+        best_examples = self.get_best_examples(content, 1, subject)
         
-        if best_example:
-            return self._format_section_example(best_example)
+        if best_examples:
+            return self._format_section_example(best_examples[0])
         else:
-            return self.get_section_example(subject)
+            # Aucun exemple proche : choix stable pour ce contenu (voir get_section_example)
+            return self.get_section_example(subject, key=content)
     
     def has_examples(self) -> bool:
         """Vérifie si des exemples sont disponibles"""
+        if self.store is not None:
+            return self.store.count() > 0
         return len(self.examples.get("sections", [])) > 0
     
     def get_stats(self) -> Dict:
         """Retourne les statistiques des exemples"""
+        if self.store is not None:
+            shards = self.store.shards()
+            return {
+                "total_examples": sum(count for _, _, count in shards),
+                "subjects": sorted({subject for subject, _, _ in shards}),
+                "shards": [{"subject": subject, "level": level, "count": count} for subject, level, count in shards],
+                "sources": self.store.sources(),
+                "metadata": self.examples.get("metadata", {})
+            }
+        
         if not self.examples.get("metadata"):
             return {
                 "total_examples": len(self.examples.get("sections", [])),
@@ -178,10 +444,68 @@ APRÈS (texte adapté) :
                 print(f"   Original : {example['original'][:80]}...")
                 print(f"   Adapté   : {example['adapted'][:80]}...")
 
+_providers: Dict[str, RealExamplesProvider] = {}
+_providers_lock = threading.Lock()
+
+def get_examples_provider(examples_file: str = None) -> RealExamplesProvider:
+    """Fournisseur partagé par tout le processus, rechargé si le fichier d'exemples a changé
+    
+    Le fichier n'est relu que si sa date de modification ou sa taille change :
+    les appels suivants ne coûtent qu'un os.stat. Par défaut, le fichier est
+    config.REAL_EXAMPLES_PATH.
+    """
+    examples_file = examples_file or config.REAL_EXAMPLES_PATH
+    with _providers_lock:
+        provider = _providers.get(examples_file)
+        if provider is None:
+            provider = _providers[examples_file] = RealExamplesProvider(examples_file)
+            return provider
+    provider.refresh()
+    return provider
+
+_example_versions: Dict[str, Tuple[List[Optional[Tuple[int, int]]], str]] = {}
+
+def get_examples_version(examples_file: str = None) -> str:
+    """Empreinte des exemples réels (fichier et embeddings), "" s'il n'y en a pas
+    
+    Les exemples injectés dans les prompts ne dépendent que de ces fichiers et
+    du modèle d'embedding : l'empreinte entre dans les clés du cache des
+    adaptations. Les fichiers ne sont hachés à nouveau que si leur date de
+    modification ou leur taille change.
+    """
+    examples_file = examples_file or config.REAL_EXAMPLES_PATH
+    paths = [examples_file, embeddings_sidecar_path(examples_file)]
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    
+    with _providers_lock:
+        cached = _example_versions.get(examples_file)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    if signature[0] is None:
+        version = ""
+    else:
+        digest = hashlib.sha256(f"{config.EMBEDDING_MODEL}:{config.EMBEDDING_DIMENSION}".encode('utf-8'))
+        for path, path_signature in zip(paths, signature):
+            if path_signature is not None:
+                with open(path, 'rb') as f:
+                    for block in iter(lambda: f.read(1024 * 1024), b''):
+                        digest.update(block)
+        version = digest.hexdigest()
+    with _providers_lock:
+        _example_versions[examples_file] = (signature, version)
+    return version
+
 # Fonction utilitaire pour l'intégration facile
 def get_real_example_for_prompt(content_type: str, content: str = "", subject: str = None) -> str:
     """Fonction simple pour obtenir un exemple réel pour n'importe quel prompt"""
-    provider = RealExamplesProvider()
+    provider = get_examples_provider()
     
     if not provider.has_examples():
         return ""
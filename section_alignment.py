@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Alignement des sections d'un cours et de sa version adaptée
+Matrice de similarité entre toutes les sections, puis alignement monotone par programmation dynamique
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from config import config
+from text_utils import tokenize
+
+
+def section_shingles(text: str) -> np.ndarray:
+    """Empreintes (triées, sans doublon) des mots et des paires de mots consécutifs d'une section
+
+    Les mots seuls résistent aux reformulations de la version adaptée ; les
+    paires de mots départagent les sections qui parlent du même sujet.
+    """
+    words = tokenize(text)
+    shingles = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return np.unique(np.fromiter((hash(shingle) for shingle in shingles), dtype=np.int64, count=len(shingles)))
+
+
+def similarity_matrix(originals: Sequence[str], adapted: Sequence[str]) -> np.ndarray:
+    """Coefficient de Dice entre les empreintes de chaque section originale et de chaque section adaptée
+
+    Seules les empreintes présentes des deux côtés forment le vocabulaire :
+    les intersections de toutes les paires de sections sont alors un seul
+    produit matriciel.
+    """
+    shingles_a = [section_shingles(text) for text in originals]
+    shingles_b = [section_shingles(text) for text in adapted]
+    matrix = np.zeros((len(originals), len(adapted)), dtype=np.float32)
+    if not originals or not adapted:
+        return matrix
+
+    all_a = np.concatenate(shingles_a)
+    all_b = np.concatenate(shingles_b)
+    vocabulary = np.intersect1d(all_a, all_b)
+    if vocabulary.size == 0:
+        return matrix
+
+    def incidence(shingles: List[np.ndarray], flat: np.ndarray) -> np.ndarray:
+        rows = np.repeat(np.arange(len(shingles)), [len(s) for s in shingles])
+        columns = np.searchsorted(vocabulary, flat)
+        shared = columns < len(vocabulary)
+        shared[shared] = vocabulary[columns[shared]] == flat[shared]
+        result = np.zeros((len(shingles), len(vocabulary)), dtype=np.float32)
+        result[rows[shared], columns[shared]] = 1.0
+        return result
+
+    intersections = incidence(shingles_a, all_a) @ incidence(shingles_b, all_b).T
+    sizes_a = np.array([len(s) for s in shingles_a], dtype=np.float32)
+    sizes_b = np.array([len(s) for s in shingles_b], dtype=np.float32)
+    totals = sizes_a[:, None] + sizes_b[None, :]
+    np.divide(2 * intersections, totals, out=matrix, where=totals > 0)
+    return matrix
+
+
+def align_matrix(similarity: np.ndarray, threshold: float) -> List[Tuple[int, int, float]]:
+    """Alignement monotone de similarité totale maximale (paires au-dessus du seuil)
+
+    Les sections gardent leur ordre des deux côtés ; une section peut rester
+    sans correspondance (ajoutée ou supprimée dans la version adaptée). Chaque
+    ligne de la table est calculée d'un bloc : le meilleur score en sautant
+    une section adaptée est un maximum cumulé le long de la ligne.
+    """
+    n, m = similarity.shape
+    gains = np.where(similarity >= threshold, similarity, -np.inf)
+    scores = np.zeros((n + 1, m + 1), dtype=np.float64)
+    for i in range(1, n + 1):
+        candidates = scores[i - 1].copy()
+        candidates[1:] = np.maximum(candidates[1:], scores[i - 1, :-1] + gains[i - 1])
+        scores[i] = np.maximum.accumulate(candidates)
+
+    pairs = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        if scores[i, j] == scores[i - 1, j]:
+            i -= 1
+        elif scores[i, j] == scores[i, j - 1]:
+            j -= 1
+        else:
+            pairs.append((i - 1, j - 1, float(similarity[i - 1, j - 1])))
+            i -= 1
+            j -= 1
+    pairs.reverse()
+    return pairs
+
+
+def align_sections(originals: Sequence[str], adapted: Sequence[str],
+                   threshold: float = None) -> List[Tuple[int, int, float]]:
+    """Paires (section originale, section adaptée, similarité) dans l'ordre du cours"""
+    threshold = config.SECTION_ALIGNMENT_THRESHOLD if threshold is None else threshold
+    return align_matrix(similarity_matrix(originals, adapted), threshold)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test du cache des adaptations
+Vérifie l'enregistrement des réponses, le calcul des économies et les clés de cache des étapes
+"""
+
+import os
+import tempfile
+
+import course_adapter
+from adaptation_cache import AdaptationCache, completion_cost
+from config import config
+from course_adapter import AdaptationStep, CourseAdapter
+
+
+class _CountingRAG:
+    """Remplace DyslexiaRAG : compte les questions posées au modèle"""
+    def __init__(self):
+        self.questions = []
+
+    def query(self, question, **kwargs):
+        self.questions.append(question)
+        return {"answer": f"Réponse {len(self.questions)}", "sources": [],
+                "usage": {"prompt_tokens": 1000, "completion_tokens": 500}}
+
+
+def _adapter(cache):
+    adapter = CourseAdapter.__new__(CourseAdapter)
+    adapter.rag_system = _CountingRAG()
+    adapter.cache = cache
+    return adapter
+
+
+def test_cache_round_trip():
+    """Une réponse réussie est relue avec son usage ; une erreur n'est jamais enregistrée"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AdaptationCache(os.path.join(tmp, "adaptations.sqlite"))
+        try:
+            cache.put("a", {"answer": "Texte adapté", "sources": [{"source": "guide.pdf"}],
+                            "usage": {"prompt_tokens": 1_000_000, "completion_tokens": 1_000_000}})
+            cache.put("b", {"answer": "", "error": "rate_limit"})
+
+            cached = cache.get("a")
+            assert cached == {"answer": "Texte adapté", "sources": [{"source": "guide.pdf"}],
+                              "usage": {"prompt_tokens": 1_000_000, "completion_tokens": 1_000_000}, "cached": True}
+            assert cache.get("b") is None
+            stats = cache.get_stats()
+        finally:
+            cache.close()
+
+    print(f"   ✅ {stats['hits']} succès, {stats['misses']} échec, {stats['dollars_saved']} $ économisés")
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+    assert stats["dollars_saved"] == config.CHAT_INPUT_COST_PER_1M + config.CHAT_OUTPUT_COST_PER_1M
+
+
+def test_completion_cost():
+    """Le coût suit les prix par million de tokens ; un usage absent ne coûte rien"""
+    usage = {"prompt_tokens": 2000, "completion_tokens": 500}
+    expected = (2000 * config.CHAT_INPUT_COST_PER_1M + 500 * config.CHAT_OUTPUT_COST_PER_1M) / 1_000_000
+
+    print(f"   ✅ {completion_cost(usage):.4f} $ pour 2000 + 500 tokens")
+    assert abs(completion_cost(usage) - expected) < 1e-12
+    assert completion_cost(None) == 0.0
+    assert completion_cost({}) == 0.0
+
+
+def test_cached_step_builds_no_query():
+    """Une étape trouvée dans le cache ne construit pas sa question (ni l'embedding de son exemple)"""
+    section = {"title": "Rome", "content": "La république romaine."}
+    built = []
+
+    def build_query():
+        built.append(section["title"])
+        return "Adapte la section Rome"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AdaptationCache(os.path.join(tmp, "adaptations.sqlite"))
+        try:
+            first = _adapter(cache)._run_step(AdaptationStep("section_0", "section", build_query, section))
+            second = _adapter(cache)._run_step(AdaptationStep("section_0", "section", build_query, section))
+        finally:
+            cache.close()
+
+    print(f"   ✅ Question construite {len(built)} fois pour 2 exécutions")
+    assert built == ["Rome"]
+    assert second["section_0"]["answer"] == first["section_0"]["answer"]
+    assert second["section_0"]["cached"]
+
+
+def test_batch_keys_include_example():
+    """La clé d'un élément de lot dépend de l'exemple réel du lot, choisi d'après tous ses éléments"""
+    items = [("section_0", {"title": "Rome", "content": "La république romaine."}),
+             ("section_1", {"title": "Gaule", "content": "La conquête de la Gaule."})]
+    samples = []
+    original = course_adapter.get_real_example_for_prompt
+    try:
+        def keys(example):
+            def fake_example(content_type, content="", subject=None):
+                samples.append(content)
+                return example
+            course_adapter.get_real_example_for_prompt = fake_example
+            step = AdaptationStep("section_batch_0", "section", None, batch=items)
+            return _adapter(None)._lookup_step(step)[2]
+
+        first, same, other = keys("Exemple A"), keys("Exemple A"), keys("Exemple B")
+    finally:
+        course_adapter.get_real_example_for_prompt = original
+
+    print(f"   ✅ {len(first)} clés, différentes quand l'exemple change")
+    assert first == same
+    assert set(first) == {"section_0", "section_1"}
+    assert all(first[key] != other[key] for key in first)
+    assert "Gaule" in samples[0]
+
+
+if __name__ == "__main__":
+    print("🧪 Test du Cache des Adaptations")
+    print("=" * 50)
+    test_cache_round_trip()
+    test_completion_cost()
+    test_cached_step_builds_no_query()
+    test_batch_keys_include_example()
+    print("\n🎉 Tous les tests sont passés !")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test des points de reprise
+Vérifie l'écriture atomique, la reprise d'un cours et l'invalidation par la version des prompts ou le PDF
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from adaptation_checkpoint import AdaptationCheckpoint
+
+
+def _course(tmp, content=b"%PDF-1.4 cours sur Rome"):
+    pdf_path = Path(tmp, "Rome.pdf")
+    pdf_path.write_bytes(content)
+    return str(pdf_path)
+
+
+def test_resume_after_interruption():
+    """Les étapes enregistrées sont reprises par une nouvelle exécution"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = _course(tmp)
+        checkpoint_dir = os.path.join(tmp, ".checkpoints")
+        checkpoint = AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "1")
+        checkpoint.record("introduction", {"answer": "Introduction adaptée", "sources": [{"source": "guide.pdf"}],
+                                           "usage": {"prompt_tokens": 10}})
+
+        resumed = AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "1")
+        print(f"   ✅ {len(resumed)} étape reprise")
+        assert "introduction" in resumed and len(resumed) == 1
+        assert resumed.get("introduction") == {"answer": "Introduction adaptée", "sources": [{"source": "guide.pdf"}]}
+        assert not resumed.completed
+
+        resumed.mark_completed()
+        assert AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "1").completed
+        # Sans reprise, le point existant est ignoré
+        assert len(AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "1", resume=False)) == 0
+
+
+def test_invalidated_by_prompt_version_or_pdf():
+    """Un point de reprise d'une autre version des prompts ou d'un autre PDF est recommencé"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = _course(tmp)
+        checkpoint_dir = os.path.join(tmp, ".checkpoints")
+        AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "1").record("introduction", {"answer": "Texte"})
+
+        other_version = AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "2")
+        assert len(other_version) == 0 and other_version.prompt_version == "2"
+
+        _course(tmp, b"%PDF-1.4 nouvelle edition du cours")
+        print("   ✅ Version des prompts ou PDF modifiés : reprise ignorée")
+        assert len(AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "1")) == 0
+
+
+def test_atomic_write():
+    """Une écriture interrompue laisse le fichier précédent intact ; un fichier illisible est recommencé"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = _course(tmp)
+        checkpoint_dir = os.path.join(tmp, ".checkpoints")
+        checkpoint = AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "1")
+        checkpoint.record("introduction", {"answer": "Texte"})
+
+        try:
+            # Sources non sérialisables : l'écriture échoue au milieu du fichier temporaire
+            checkpoint.record("section_0", {"answer": "Section", "sources": [object()]})
+            assert False, "l'écriture doit échouer"
+        except TypeError:
+            pass
+
+        with open(checkpoint.path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        print(f"   ✅ Fichier intact après une écriture interrompue : {list(saved['steps'])}")
+        assert list(saved["steps"]) == ["introduction"]
+
+        with open(checkpoint.path, 'w', encoding='utf-8') as f:
+            f.write('{"course_hash": ')
+        assert len(AdaptationCheckpoint.for_course(pdf_path, checkpoint_dir, "1")) == 0
+
+
+if __name__ == "__main__":
+    print("🧪 Test des Points de Reprise")
+    print("=" * 50)
+    test_resume_after_interruption()
+    test_invalidated_by_prompt_version_or_pdf()
+    test_atomic_write()
+    print("\n🎉 Tous les tests sont passés !")
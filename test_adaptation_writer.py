@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Test de l'écriture progressive des adaptations
+Vérifie que le fichier JSON Lines est valide après une exécution partielle, puis complétée
+"""
+
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from adaptation_writer import ProgressiveWriter
+
+
+def _read_records(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_jsonl_valid_after_partial_run():
+    """Chaque élément écrit est une ligne JSON complète, même si l'adaptation s'arrête en cours"""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ProgressiveWriter(tmp, "Rome_adapte_dyslexie", "Rome", "json")
+        writer.start()
+
+        entries = [(f"section_{i}", {"adapted_title": f"Partie {i}",
+                                     "adapted_content": f"Ligne 1\nLigne 2 « {i} »"}) for i in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda entry: writer.add(entry[0], "section", entry[1]), entries))
+
+        # Exécution interrompue : pas de bilan, mais le fichier se lit entièrement
+        records = _read_records(writer.path)
+        print(f"   ✅ {len(records) - 1} éléments lisibles avant la fin de l'adaptation")
+        assert writer.path.endswith(".jsonl")
+        assert records[0] == {"type": "header", "course_title": "Rome", "started_at": records[0]["started_at"]}
+        items = sorted(records[1:], key=lambda record: record["key"])
+        assert [record["type"] for record in items] == ["item"] * 8
+        assert items[3] == {"type": "item", "key": "section_3", "kind": "section",
+                            "adapted_title": "Partie 3", "adapted_content": "Ligne 1\nLigne 2 « 3 »"}
+
+        writer.finalize({"course_title": "Rome", "failed_steps": ["assessment"], "generation_seconds": 1.5})
+        summary = _read_records(writer.path)[-1]
+        assert summary["type"] == "summary"
+        assert summary["items"] == 8 and summary["failed_steps"] == ["assessment"]
+
+
+def test_markdown_partial_output():
+    """En markdown, les éléments s'ajoutent sous le bandeau d'adaptation en cours"""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = ProgressiveWriter(tmp, "Rome_adapte_dyslexie", "Rome", "markdown")
+        writer.start()
+        writer.add("exercise_0", "exercise", {"adapted_exercise": "Lis. Puis réponds."})
+        writer.finalize({"course_title": "Rome"})
+
+        with open(os.path.join(tmp, "Rome_adapte_dyslexie.md"), 'r', encoding='utf-8') as f:
+            text = f.read()
+    print("   ✅ Markdown partiel écrit")
+    assert text.startswith("# Rome - Version Adaptée aux Dyslexiques\n\n> ⏳ Adaptation en cours")
+    assert text.endswith("## 🎯 Exercice\n\nLis. Puis réponds.\n\n---\n\n")
+
+
+if __name__ == "__main__":
+    print("🧪 Test de l'Écriture Progressive")
+    print("=" * 50)
+    test_jsonl_valid_after_partial_run()
+    test_markdown_partial_output()
+    print("\n🎉 Tous les tests sont passés !")
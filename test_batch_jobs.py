@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Test du mode batch hors ligne
+Prépare les jobs, simule le fichier de résultats du fournisseur en local, puis l'intègre
+"""
+
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from batch_jobs import BatchJob, CHAT_COMPLETIONS_URL, chat_completion_result, read_batch_results
+from config import config
+from course_adapter import CourseAdapter
+from pdf_processor import DocumentChunk, make_chunk_id
+from vector_store import VectorStore
+
+
+class _WordEncoding:
+    """Tokeniseur minimal : un mot = un token"""
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def _write_local_results(requests_path: str, results_path: str, respond, failing=()):
+    """Remplace le fournisseur : écrit un fichier de résultats au format batch pour chaque requête"""
+    with open(requests_path, encoding='utf-8') as requests, open(results_path, 'w', encoding='utf-8') as results:
+        for line in requests:
+            request = json.loads(line)
+            if request["custom_id"] in failing:
+                record = {"custom_id": request["custom_id"], "response": None,
+                          "error": {"code": "server_error", "message": "échec simulé"}}
+            else:
+                record = {"custom_id": request["custom_id"], "error": None,
+                          "response": {"status_code": 200, "body": respond(request)}}
+            results.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _chat_body(content: str):
+    return {"choices": [{"message": {"content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}}
+
+
+def test_results_file_round_trip():
+    """Les résultats sont relus par custom_id, y compris les requêtes en échec"""
+    with tempfile.TemporaryDirectory() as tmp:
+        with BatchJob.create(tmp, "test") as job:
+            job.add_request("a", CHAT_COMPLETIONS_URL, {"messages": []}, note="premier")
+            job.add_request("b", CHAT_COMPLETIONS_URL, {"messages": []})
+
+        results_path = os.path.join(tmp, "results.jsonl")
+        _write_local_results(job.requests_path, results_path, lambda request: _chat_body("réponse"), failing={"b"})
+        results = read_batch_results(results_path)
+
+        print(f"   ✅ {len(results)} résultats relus")
+        assert BatchJob.open(tmp, "test").manifest["requests"]["a"] == {"note": "premier"}
+        assert chat_completion_result(results["a"])["answer"] == "réponse"
+        assert chat_completion_result(results["b"])["error"] == "échec simulé"
+        assert chat_completion_result(results.get("c"))["error"] == "missing_result"
+
+
+class _FakeIndex:
+    def __init__(self, ids):
+        self.vectors = {vector_id: None for vector_id in ids}
+
+    def list(self, prefix=None, namespace=""):
+        yield [vector_id for vector_id in self.vectors if vector_id.startswith(prefix or "")]
+
+    def upsert(self, vectors, namespace=""):
+        for vector in vectors:
+            self.vectors[vector["id"]] = vector
+
+    def delete(self, ids, namespace=""):
+        for vector_id in ids:
+            del self.vectors[vector_id]
+
+
+def _embedding(value):
+    """Vecteur factice de la dimension de l'index"""
+    return [float(value)] + [0.0] * (config.EMBEDDING_DIMENSION - 1)
+
+
+def test_embedding_job_end_to_end():
+    """Seuls les segments nouveaux sont demandés ; les résultats sont indexés et les anciens supprimés"""
+    texts = ["La dyslexie touche la lecture.", "Les polices adaptées aident.", "Un texte aéré se lit mieux."]
+    chunks = [DocumentChunk(text=text, source="guide.pdf", author="Auteur", page_number=1,
+                            section="Content", chunk_id=make_chunk_id("guide.pdf", text)) for text in texts]
+
+    store = VectorStore.__new__(VectorStore)
+    store.encoding = _WordEncoding()
+    store.index = _FakeIndex([chunks[0].chunk_id, make_chunk_id("guide.pdf", "ancien segment")])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assert store.prepare_embedding_job(chunks, tmp, batch_size=1) == 2
+
+        def respond(request):
+            return {"data": [{"index": i, "embedding": _embedding(len(text))} for i, text in enumerate(request["body"]["input"])]}
+
+        results_path = os.path.join(tmp, "results.jsonl")
+        _write_local_results(os.path.join(tmp, "requests.jsonl"), results_path, respond)
+        stats = store.ingest_embedding_results(tmp, [results_path])
+
+    print(f"   ✅ {stats['upserted']} vecteurs ajoutés, {stats['deleted']} supprimé")
+    assert stats == {"unchanged": 1, "upserted": 2, "deleted": 1, "failed": 0, "summaries": 0}
+    assert sorted(store.index.vectors) == sorted(chunk.chunk_id for chunk in chunks)
+    assert store.index.vectors[chunks[2].chunk_id]["values"] == _embedding(len(texts[2]))
+
+
+def test_failed_embedding_results_keep_old_vectors():
+    """Un segment sans résultat n'entraîne pas la suppression des anciens vecteurs de son document"""
+    old = DocumentChunk(text="Ancien segment.", source="guide.pdf", author="Auteur", page_number=1,
+                        section="Content", chunk_id=make_chunk_id("guide.pdf", "Ancien segment."))
+    new = DocumentChunk(text="Nouveau segment.", source="guide.pdf", author="Auteur", page_number=1,
+                        section="Content", chunk_id=make_chunk_id("guide.pdf", "Nouveau segment."))
+
+    store = VectorStore.__new__(VectorStore)
+    store.encoding = _WordEncoding()
+    store.index = _FakeIndex([old.chunk_id])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store.prepare_embedding_job([new], tmp)
+        results_path = os.path.join(tmp, "results.jsonl")
+        _write_local_results(os.path.join(tmp, "requests.jsonl"), results_path, None, failing={"embeddings-0"})
+        stats = store.ingest_embedding_results(tmp, [results_path])
+
+    print(f"   ✅ {stats['failed']} segment en échec, ancien vecteur conservé")
+    assert stats == {"unchanged": 0, "upserted": 0, "deleted": 0, "failed": 1, "summaries": 0}
+    assert list(store.index.vectors) == [old.chunk_id]
+
+
+class _OfflineRAG:
+    """Remplace DyslexiaRAG : recherche factice, et aucun appel direct au modèle"""
+    encoding = _WordEncoding()
+
+    class rate_limiter:
+        @staticmethod
+        def get_stats():
+            return {"wait_seconds": 0.0}
+
+    def prepare_query(self, question, include_context=True, search_query=None, max_tokens=1000,
+                      response_format=None):
+        request = {"model": "gpt-4o", "messages": [{"role": "user", "content": question}], "max_tokens": max_tokens}
+        if response_format:
+            request["response_format"] = response_format
+        return {"question": question, "search_results": [], "context": "", "request": request}
+
+    def format_sources(self, search_results):
+        return [{"source": "recherche.pdf"}]
+
+    def query(self, *args, **kwargs):
+        raise AssertionError("le mode batch ne doit pas appeler le modèle en direct")
+
+
+def test_course_adaptation_job_end_to_end():
+    """Un cours entier est adapté à partir du seul fichier de résultats"""
+    with tempfile.TemporaryDirectory() as tmp:
+        courses_dir = os.path.join(tmp, "pdf-cours")
+        os.makedirs(courses_dir)
+        Path(courses_dir, "Rome.pdf").write_bytes(b"%PDF-1.4 cours factice")
+
+        adapter = CourseAdapter.__new__(CourseAdapter)
+        adapter.rag_system = _OfflineRAG()
+        adapter.cache = None
+        adapter.courses_dir = courses_dir
+        adapter.output_dir = os.path.join(tmp, "cours-adaptes")
+        adapter.checkpoint_dir = os.path.join(adapter.output_dir, ".checkpoints")
+        os.makedirs(adapter.output_dir)
+        adapter.extract_course_content = lambda path: {
+            "title": Path(path).stem, "total_pages": 2, "full_text": "", "key_concepts": [],
+            "sections": [{"title": f"Partie {i}", "content": f"La république romaine, partie {i}.", "page": i}
+                         for i in range(1, 4)],
+            "exercises": ["Réponds aux questions."], "instructions": ["Lis le document."]
+        }
+
+        job_dir = os.path.join(tmp, "job")
+        requests = adapter.prepare_batch_job(job_dir, batched=True)
+
+        def respond(request):
+            question = request["body"]["messages"][-1]["content"]
+            if "response_format" in request["body"]:
+                ids = re.findall(r"### ID: (\S+)", question)
+                return _chat_body(json.dumps({"adaptations": {key: f"Texte adapté {key}" for key in ids}}))
+            return _chat_body("Texte adapté")
+
+        results_path = os.path.join(tmp, "results.jsonl")
+        _write_local_results(os.path.join(job_dir, "requests.jsonl"), results_path, respond)
+        summaries = adapter.ingest_batch_results(job_dir, [results_path], "json")
+
+        with open(os.path.join(adapter.output_dir, "Rome_adapte_dyslexie.json"), encoding='utf-8') as f:
+            adaptations = json.load(f)
+
+    print(f"   ✅ {requests} requêtes, cours {summaries[0]['status']}")
+    assert summaries[0]["status"] == "ok"
+    assert [section["adapted_content"] for section in adaptations["adapted_sections"]] == [
+        "Texte adapté section_0", "Texte adapté section_1", "Texte adapté section_2"
+    ]
+    assert adaptations["exercise_adaptations"][0]["adapted_exercise"] == "Texte adapté"
+    assert adaptations["failed_steps"] == []
+
+
+if __name__ == "__main__":
+    print("🧪 Test du Mode Batch Hors Ligne")
+    print("=" * 50)
+    test_results_file_round_trip()
+    test_embedding_job_end_to_end()
+    test_failed_embedding_results_keep_old_vectors()
+    test_course_adaptation_job_end_to_end()
+    print("\n🎉 Tous les tests sont passés !")
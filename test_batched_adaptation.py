@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test de l'adaptation en lots
+Vérifie le regroupement des éléments, la lecture des réponses JSON et le découpage des lots mal formés
+"""
+
+import json
+import re
+
+from config import config
+from course_adapter import CourseAdapter
+
+
+class _WordEncoding:
+    """Tokeniseur minimal : un mot = un token"""
+    def encode(self, text):
+        return text.split()
+
+
+class _BatchRAG:
+    """Remplace DyslexiaRAG : un lot de plus de max_items éléments reçoit une réponse mal formée"""
+    encoding = _WordEncoding()
+
+    def __init__(self, max_items, dropped=()):
+        self.max_items = max_items
+        self.dropped = set(dropped)
+        self.questions = []
+
+    def query(self, question, response_format=None, **kwargs):
+        self.questions.append(question)
+        usage = {"prompt_tokens": 100, "completion_tokens": 50}
+        if response_format is None:
+            return {"answer": "Élément adapté seul", "sources": [], "usage": usage, "finish_reason": "stop"}
+        ids = re.findall(r"### ID: (\S+)", question)
+        if len(ids) > self.max_items:
+            return {"answer": '{"adaptations": {', "sources": [], "usage": usage, "finish_reason": "stop"}
+        answer = json.dumps({"adaptations": {key: f"Adapté {key}" for key in ids if key not in self.dropped}})
+        return {"answer": answer, "sources": [], "usage": usage, "finish_reason": "stop"}
+
+
+def _adapter(rag):
+    adapter = CourseAdapter.__new__(CourseAdapter)
+    adapter.rag_system = rag
+    adapter.cache = None
+    return adapter
+
+
+def _items(count):
+    return [(f"exercise_{i}", f"Réponds à la question {i}.") for i in range(count)]
+
+
+def test_pack_batches():
+    """Un lot est fermé avant de dépasser le budget ; un élément trop long reste seul"""
+    saved = (config.ADAPTATION_BATCH_INPUT_TOKENS, config.ADAPTATION_BATCH_OUTPUT_TOKENS,
+             config.ADAPTATION_BATCH_OUTPUT_RATIO)
+    try:
+        # Budget : min(20 tokens d'original, 45 / 1,5 = 30 tokens de réponse) = 20 tokens
+        config.ADAPTATION_BATCH_INPUT_TOKENS, config.ADAPTATION_BATCH_OUTPUT_TOKENS = 20, 45
+        config.ADAPTATION_BATCH_OUTPUT_RATIO = 1.5
+        items = _items(4) + [("exercise_long", "mot " * 30)]  # 6 tokens chacun, puis 31
+        batches = _adapter(_BatchRAG(10))._pack_batches("exercise", items)
+    finally:
+        (config.ADAPTATION_BATCH_INPUT_TOKENS, config.ADAPTATION_BATCH_OUTPUT_TOKENS,
+         config.ADAPTATION_BATCH_OUTPUT_RATIO) = saved
+
+    print(f"   ✅ {len(batches)} lots : {[len(batch) for batch in batches]}")
+    assert [[key for key, _ in batch] for batch in batches] == [
+        ["exercise_0", "exercise_1", "exercise_2"], ["exercise_3"], ["exercise_long"]
+    ]
+
+
+def test_parse_batch_answer():
+    """Seuls les textes non vides des IDs demandés sont gardés ; une réponse tronquée ou invalide est vide"""
+    adapter = _adapter(_BatchRAG(10))
+    keys = ["a", "b", "c", "d"]
+    answer = json.dumps({"adaptations": {"a": "Texte A", "b": "  ", "c": ["liste"], "z": "Texte Z"}})
+
+    print("   ✅ Réponses valides extraites")
+    assert adapter._parse_batch_answer({"answer": answer, "finish_reason": "stop"}, keys) == {"a": "Texte A"}
+    assert adapter._parse_batch_answer({"answer": answer, "finish_reason": "length"}, keys) == {}
+    assert adapter._parse_batch_answer({"answer": "Voici les adaptations :", "finish_reason": "stop"}, keys) == {}
+    assert adapter._parse_batch_answer({"answer": None, "error": "rate_limit"}, keys) == {}
+
+
+def test_split_batch_response_keeps_usage():
+    """L'usage du lot est réparti sans perte entre les éléments valides"""
+    adapter = _adapter(_BatchRAG(10))
+    response = {"answer": json.dumps({"adaptations": {"a": "A", "b": "B", "c": "C"}}), "finish_reason": "stop",
+                "sources": [{"source": "guide.pdf"}], "usage": {"prompt_tokens": 1001, "completion_tokens": 302}}
+    results = adapter._split_batch_response(response, ["a", "b", "c"])
+
+    print(f"   ✅ Parts d'usage : {[result['usage']['prompt_tokens'] for result in results.values()]}")
+    assert [result["answer"] for result in results.values()] == ["A", "B", "C"]
+    assert sum(result["usage"]["prompt_tokens"] for result in results.values()) == 1001
+    assert sum(result["usage"]["completion_tokens"] for result in results.values()) == 302
+    assert results["b"]["sources"] == [{"source": "guide.pdf"}]
+
+
+def test_run_batch_splits_malformed_batches():
+    """Un lot mal formé est coupé en deux jusqu'à obtenir des réponses valides, avec le même exemple"""
+    rag = _BatchRAG(max_items=2)
+    results = _adapter(rag)._run_batch("exercise", _items(5), "EXEMPLE RÉEL")
+
+    print(f"   ✅ 5 exercices adaptés en {len(rag.questions)} appels")
+    assert sorted(results) == [f"exercise_{i}" for i in range(5)]
+    # 5 (mal formé) -> 2 + 3 (mal formé) -> 1 (seul) + 2
+    assert [len(re.findall(r"### ID:", question)) for question in rag.questions] == [5, 2, 3, 0, 2]
+    assert results["exercise_0"]["answer"] == "Adapté exercise_0"
+    assert results["exercise_2"]["answer"] == "Élément adapté seul"
+    assert all(question.startswith("EXEMPLE RÉEL") for question in rag.questions)
+
+
+def test_run_batch_retries_only_missing_items():
+    """Si une partie seulement des éléments manque, seuls ceux-là sont redemandés"""
+    rag = _BatchRAG(max_items=10, dropped={"exercise_1"})
+    results = _adapter(rag)._run_batch("exercise", _items(3), "")
+
+    print(f"   ✅ {len(rag.questions)} appels, élément manquant refait seul")
+    assert len(rag.questions) == 2
+    assert results["exercise_1"]["answer"] == "Élément adapté seul"
+    assert results["exercise_2"]["answer"] == "Adapté exercise_2"
+
+
+if __name__ == "__main__":
+    print("🧪 Test de l'Adaptation en Lots")
+    print("=" * 50)
+    test_pack_batches()
+    test_parse_batch_answer()
+    test_split_batch_response_keeps_usage()
+    test_run_batch_splits_malformed_batches()
+    test_run_batch_retries_only_missing_items()
+    print("\n🎉 Tous les tests sont passés !")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test du stockage compact des segments
+Vérifie que le ChunkStore restitue les segments à l'identique, en mémoire comme après sauvegarde et mmap
+"""
+
+import os
+import tempfile
+
+from chunk_store import ChunkStore
+from pdf_processor import DocumentChunk, make_chunk_id
+
+
+def _chunks():
+    texts = [
+        ("La dyslexie touche l'apprentissage de la lecture.", "guide.pdf", "Introduction", []),
+        ("Une police sans empattement, en taille 14, facilite la lecture.", "guide.pdf", "Mise en page", ["guide-2025.pdf"]),
+        ("L’interligne recommandé est de 1,5 — « aérer » le texte aide l'élève.", "mémoire.pdf", "Content", []),
+    ]
+    return [DocumentChunk(text=text, source=source, author="Auteur", page_number=page, section=section,
+                          chunk_id=make_chunk_id(source, text), duplicate_sources=duplicates)
+            for page, (text, source, section, duplicates) in enumerate(texts, 1)]
+
+
+def test_round_trip_in_memory():
+    """Chaque segment est restitué avec toutes ses métadonnées ; les chaînes répétées sont stockées une fois"""
+    chunks = _chunks()
+    store = ChunkStore.from_chunks(chunks)
+
+    print(f"   ✅ {len(store)} segments, {store.nbytes()} octets")
+    assert len(store) == 3
+    assert list(store) == chunks
+    assert store[-1] == chunks[-1]
+    assert store.texts(1) == [chunk.text for chunk in chunks[1:]]
+    assert store.duplicate_sources(1) == ["guide-2025.pdf"]
+    assert store.strings.count("guide.pdf") == 1
+
+
+def test_save_and_load_with_mmap():
+    """Un store sauvegardé puis rechargé par mmap est identique et en lecture seule"""
+    chunks = _chunks()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "chunks.store")
+        ChunkStore.from_chunks(chunks).save(path)
+
+        store = ChunkStore.load(path)
+        try:
+            print(f"   ✅ {len(store)} segments rechargés depuis {os.path.getsize(path)} octets")
+            assert list(store) == chunks
+            assert store.chunk_id(2) == chunks[2].chunk_id
+            assert store.source(2) == "mémoire.pdf"
+            try:
+                store.append(chunks[0])
+                assert False, "un store chargé doit être en lecture seule"
+            except TypeError:
+                pass
+        finally:
+            store.close()
+
+
+def test_subset_and_empty_store():
+    """Sous-ensemble de segments, et store vide sauvegardé puis rechargé"""
+    chunks = _chunks()
+    subset = ChunkStore.from_chunks(chunks).subset([2, 0])
+    assert list(subset) == [chunks[2], chunks[0]]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "empty.store")
+        ChunkStore().save(path)
+        store = ChunkStore.load(path)
+        try:
+            print("   ✅ Sous-ensemble et store vide")
+            assert len(store) == 0
+            assert list(store) == []
+            assert store.texts() == []
+        finally:
+            store.close()
+
+    try:
+        ChunkStore()[0]
+        assert False, "un index hors limites doit lever IndexError"
+    except IndexError:
+        pass
+
+
+if __name__ == "__main__":
+    print("🧪 Test du Stockage Compact des Segments")
+    print("=" * 50)
+    test_round_trip_in_memory()
+    test_save_and_load_with_mmap()
+    test_subset_and_empty_store()
+    print("\n🎉 Tous les tests sont passés !")
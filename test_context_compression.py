@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test de la compression du contexte
+Vérifie que seules les phrases utiles à la question restent dans le contexte, sous le budget de tokens
+"""
+
+from context_compression import compress_results, split_sentences
+
+
+def _header(result):
+    return f"[Source: {result['source']}, p.{result['page_number']}]"
+
+
+def _count_words(text):
+    return len(text.split())
+
+
+RESULTS = [
+    {"source": "guide.pdf", "page_number": 29, "score": 0.8,
+     "text": "Le mémoire comporte quatre parties. Un troisième facteur à prendre en compte est l’interligne. "
+             "L’interligne recommandé est de 1,5 pour les élèves dyslexiques. Les entretiens ont eu lieu en mai."},
+    {"source": "annexe.pdf", "page_number": 3, "score": 0.5,
+     "text": "Remerciements à toute l'équipe pédagogique. La bibliographie suit la norme APA."},
+]
+
+
+def test_split_sentences():
+    """Découpage aux fins de phrase, et des longues suites sans ponctuation"""
+    sentences = split_sentences("Première phrase. Deuxième phrase ! « Citation » finale. Liste " + "mot " * 129)
+
+    print(f"   ✅ {len(sentences)} phrases")
+    assert sentences[:3] == ["Première phrase.", "Deuxième phrase !", "« Citation » finale."]
+    assert [len(sentence.split()) for sentence in sentences[3:]] == [60, 60, 10]
+
+
+def test_only_relevant_sentences_are_kept():
+    """Les phrases sans terme de la question sont retirées, l'ordre d'origine est conservé"""
+    compressed, used = compress_results("Quel interligne pour un élève dyslexique ?", RESULTS, 100,
+                                        _count_words, _header)
+
+    print(f"   ✅ {used} mots gardés")
+    assert [result["source"] for result, _ in compressed] == ["guide.pdf"]
+    text = compressed[0][1]
+    assert text.startswith("Un troisième facteur")
+    assert "recommandé est de 1,5" in text
+    assert "quatre parties" not in text and "entretiens" not in text
+
+
+def test_budget_is_respected():
+    """Le budget compte les phrases et l'en-tête de source ; les coupures sont marquées […]"""
+    compressed, used = compress_results("interligne recommandé élèves dyslexiques", RESULTS, 20,
+                                        _count_words, _header)
+
+    print(f"   ✅ {used} mots pour un budget de 20")
+    assert used <= 20
+    assert compressed[0][1] == "L’interligne recommandé est de 1,5 pour les élèves dyslexiques."
+    assert compress_results("photosynthèse", RESULTS, 100, _count_words, _header) == ([], 0)
+
+
+if __name__ == "__main__":
+    print("🧪 Test de la Compression du Contexte")
+    print("=" * 50)
+    test_split_sentences()
+    test_only_relevant_sentences_are_kept()
+    test_budget_is_respected()
+    print("\n🎉 Tous les tests sont passés !")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test de l'appariement des cours
+Vérifie l'appariement par nom et par première page, sans paire entre pages vides
+"""
+
+import tempfile
+from pathlib import Path
+
+from real_examples_extractor import RealExamplesExtractor
+
+ROME = ("Rome est fondée selon la légende par Romulus et Remus. La ville devient une république, "
+        "puis un empire qui domine toute la mer Méditerranée pendant plusieurs siècles grâce à ses légions.")
+
+
+def _extractor(tmp, first_pages):
+    """Extracteur sur une arborescence de fichiers vides, premières pages fournies par le test"""
+    for relative in first_pages:
+        path = Path(tmp, relative)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"")
+    extractor = RealExamplesExtractor()
+    extractor.examples_dir = tmp
+    extractor.read_pages = []
+    def first_page_text(file_path):
+        extractor.read_pages.append(Path(file_path).name)
+        return first_pages[str(Path(file_path).relative_to(tmp))]
+    extractor._first_page_text = first_page_text
+    return extractor
+
+
+def test_pairs_by_name_and_content():
+    """Un fichier renommé est apparié par sa première page ; les pages vides ne s'apparient pas"""
+    with tempfile.TemporaryDirectory() as tmp:
+        extractor = _extractor(tmp, {
+            "5EME/La Revolution francaise.pdf": "",
+            "5EME/La Revolution francaise DYS.pdf": "",
+            "6EME/Rome antique.pdf": ROME,
+            "6EME/adapte/Fiche eleve 12 DYS.pdf": ROME.replace("légende", "tradition"),
+            "6EME/Scan classe.pdf": "",
+            "6EME/Scan corrige DYS.pdf": "  \n",
+        })
+        pairs = extractor.find_course_pairs(use_content=True)
+
+        print(f"   ✅ {len(pairs)} paires")
+        assert [(Path(pair["normal_file"]).name, Path(pair["adapted_file"]).name) for pair in pairs] == [
+            ("La Revolution francaise.pdf", "La Revolution francaise DYS.pdf"),
+            ("Rome antique.pdf", "Fiche eleve 12 DYS.pdf"),
+        ]
+        assert pairs[1]["level"] == "6EME"
+
+
+def test_extraction_reuses_pairs():
+    """extract_all_examples reprend les paires déjà trouvées sans relire les premières pages"""
+    with tempfile.TemporaryDirectory() as tmp:
+        extractor = _extractor(tmp, {"Rome antique.pdf": ROME, "Rome antique DYS.pdf": ROME})
+        pairs = extractor.find_course_pairs(use_content=True)
+        reads = len(extractor.read_pages)
+        extractor.extract_pair = lambda pair: []
+
+        examples = extractor.extract_all_examples(compute_embeddings=False, workers=1,
+                                                  filename=str(Path(tmp, "examples.json")), pairs=pairs)
+        print(f"   ✅ {examples['metadata']['total_pairs']} paire, {reads} premières pages lues une fois")
+        assert examples["metadata"]["total_pairs"] == 1
+        assert len(extractor.read_pages) == reads == 2
+
+
+if __name__ == "__main__":
+    print("🧪 Test de l'Appariement des Cours")
+    print("=" * 50)
+    test_pairs_by_name_and_content()
+    test_extraction_reuses_pairs()
+    print("\n🎉 Tous les tests sont passés !")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test du mode surveillance
+Vérifie le délai de stabilisation, la file persistante et la reprise des cours en échec
+"""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from course_watcher import CourseWatcher
+
+
+class _FakeAdapter:
+    """Remplace CourseAdapter : renvoie les statuts prévus, dans l'ordre, sans appel à l'API"""
+    def __init__(self, courses_dir, statuses=()):
+        self.courses_dir = courses_dir
+        self.statuses = list(statuses)
+        self.calls = []
+
+    def process_course(self, pdf_file, output_format, previous_edition, resume):
+        self.calls.append((Path(pdf_file).name, resume))
+        status = self.statuses.pop(0) if self.statuses else "ok"
+        error = None if status == "ok" else "1 étapes en échec (relancer avec --resume)"
+        return {"course": Path(pdf_file).name, "status": status, "seconds": 0.1, "error": error}
+
+
+def _watcher(tmp, adapter, **kwargs):
+    return CourseWatcher(adapter, settle_seconds=10, state_path=os.path.join(tmp, "queue.json"), **kwargs)
+
+
+def _finish(watcher, executor, now):
+    """Attendre les adaptations lancées, puis faire le bilan au cycle suivant"""
+    wait(list(watcher._in_flight.values()))
+    watcher.run_once(executor, now=now)
+
+
+def test_settle_delay_and_persisted_queue():
+    """Un fichier encore modifié n'est pas mis en file ; la file survit à un redémarrage"""
+    with tempfile.TemporaryDirectory() as tmp:
+        course = Path(tmp, "Rome.pdf")
+        course.write_bytes(b"%PDF-1.4 debut")
+        adapter = _FakeAdapter(tmp)
+        watcher = _watcher(tmp, adapter, workers=1)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            watcher._submit_queued = lambda executor, fingerprints: None  # rien n'est lancé dans ce test
+            watcher.run_once(executor, now=0)
+            course.write_bytes(b"%PDF-1.4 debut et suite de la copie")
+            watcher.run_once(executor, now=8)
+            watcher.run_once(executor, now=12)
+            assert watcher.queue == [], "le fichier a changé à t=8 : il doit rester stable 10s depuis"
+            watcher.run_once(executor, now=18)
+
+        print(f"   ✅ {len(watcher.queue)} cours en file après stabilisation")
+        assert [entry["name"] for entry in watcher.queue] == ["Rome.pdf"]
+
+        restarted = _watcher(tmp, adapter)
+        assert restarted.queue == watcher.queue
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            restarted.run_once(executor, now=100)
+            _finish(restarted, executor, now=101)
+
+        assert adapter.calls == [("Rome.pdf", True)]
+        assert restarted.queue == [] and restarted.done["Rome.pdf"]["status"] == "ok"
+
+
+def _run_until_idle(watcher, executor):
+    watcher.run_once(executor, now=0)
+    watcher.run_once(executor, now=10)
+    for now in range(11, 20):
+        _finish(watcher, executor, now=now)
+
+
+def test_partial_course_is_retried():
+    """Un cours partiel est repris (resume=True) au plus WATCH_MAX_RETRIES fois, puis mémorisé"""
+    for statuses, expected_calls, expected_status in ((["partiel", "ok"], 2, "ok"),
+                                                      (["partiel", "erreur", "ok"], 2, "erreur")):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "Rome.pdf").write_bytes(b"%PDF-1.4 cours")
+            adapter = _FakeAdapter(tmp, statuses=statuses)
+            watcher = _watcher(tmp, adapter, max_retries=1, retry_seconds=0)
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                _run_until_idle(watcher, executor)
+
+            print(f"   ✅ {statuses[:expected_calls]} → {watcher.done['Rome.pdf']['status']}")
+            assert adapter.calls == [("Rome.pdf", True)] * expected_calls
+            assert watcher.queue == []
+            assert watcher.done["Rome.pdf"]["status"] == expected_status
+
+
+def test_retry_waits_for_its_delay():
+    """Une nouvelle tentative attend WATCH_RETRY_SECONDS, et reste en file après un redémarrage"""
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, "Rome.pdf").write_bytes(b"%PDF-1.4 cours")
+        adapter = _FakeAdapter(tmp, statuses=["erreur"])
+        watcher = _watcher(tmp, adapter, retry_seconds=3600)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            _run_until_idle(watcher, executor)
+
+        print(f"   ✅ Tentative {watcher.queue[0]['attempts']} en attente")
+        assert len(adapter.calls) == 1
+        assert "Rome.pdf" not in watcher.done
+        assert [entry["attempts"] for entry in _watcher(tmp, adapter).queue] == [1]
+
+
+if __name__ == "__main__":
+    print("🧪 Test du Mode Surveillance")
+    print("=" * 50)
+    test_settle_delay_and_persisted_queue()
+    test_partial_course_is_retried()
+    test_retry_waits_for_its_delay()
+    print("\n🎉 Tous les tests sont passés !")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test de la détection des quasi-doublons
+Vérifie que les versions quasi identiques d'un cours ne sont indexées qu'une fois
+"""
+
+from deduplication import ChunkDeduplicator
+from pdf_processor import DocumentChunk
+
+BASE_TEXT = (
+    "Rome est fondée selon la légende en 753 avant Jésus-Christ par Romulus. "
+    "La ville est d'abord gouvernée par des rois puis devient une république. "
+    "Les citoyens romains votent les lois et élisent les magistrats chaque année. "
+    "Le Sénat rassemble les anciens magistrats et conseille la république."
+)
+
+
+def _chunk(text: str, source: str, index: int = 0) -> DocumentChunk:
+    return DocumentChunk(
+        text=text,
+        source=source,
+        author="Unknown Author",
+        page_number=1,
+        section="Content",
+        chunk_id=f"{source}_page1_chunk{index}"
+    )
+
+
+def test_near_duplicates_are_collapsed():
+    """Une édition quasi identique doit être fusionnée avec l'originale"""
+    chunks = [
+        _chunk(BASE_TEXT, "AuxoriginesdeRome2024.pdf"),
+        _chunk(BASE_TEXT.replace("753", "753 (date traditionnelle)"), "AuxoriginesdeRome2025.pdf"),
+        _chunk("Les Hébreux sont un peuple du Proche-Orient ancien qui croit en un dieu unique.", "Hébreux.pdf"),
+    ]
+
+    kept, report = ChunkDeduplicator().deduplicate(chunks)
+
+    print(f"   ✅ {report.total_chunks} segments → {report.unique_chunks} uniques")
+    assert len(kept) == 2
+    assert report.embeddings_saved == 1
+    assert report.index_entries_saved == 1
+    assert kept[0].duplicate_sources == ["AuxoriginesdeRome2025.pdf"]
+    assert report.multi_source_vectors == 1
+
+
+def test_distinct_chunks_are_kept():
+    """Des segments différents ne doivent jamais être fusionnés"""
+    chunks = [
+        _chunk(BASE_TEXT, "rome.pdf", 0),
+        _chunk("La décolonisation transforme le monde après 1945 avec l'indépendance de l'Inde.", "decolonisation.pdf", 0),
+        _chunk("Une aire urbaine regroupe une ville centre, sa banlieue et sa couronne périurbaine.", "aire urbaine.pdf", 0),
+    ]
+
+    kept, report = ChunkDeduplicator().deduplicate(chunks)
+
+    print(f"   ✅ {report.unique_chunks} segments distincts conservés")
+    assert len(kept) == 3
+    assert report.duplicates_removed == 0
+
+
+def test_signature_similarity_estimate():
+    """L'estimation de Jaccard doit être proche de 1 pour des textes identiques"""
+    deduplicator = ChunkDeduplicator()
+    sig_a = deduplicator.signature(BASE_TEXT)
+    sig_b = deduplicator.signature(BASE_TEXT.upper())
+
+    print(f"   ✅ Similarité estimée : {deduplicator.similarity(sig_a, sig_b):.2f}")
+    assert deduplicator.similarity(sig_a, sig_b) == 1.0
+
+
+if __name__ == "__main__":
+    print("🧪 Test de la Détection des Quasi-Doublons")
+    print("=" * 50)
+    test_near_duplicates_are_collapsed()
+    test_distinct_chunks_are_kept()
+    test_signature_similarity_estimate()
+    print("\n🎉 Tous les tests sont passés !")
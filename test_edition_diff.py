@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test de la réadaptation des nouvelles éditions
+Vérifie la réutilisation par empreinte exacte et par similarité au-dessus du seuil
+"""
+
+import json
+import os
+import tempfile
+
+from edition_diff import PreviousEdition, content_hash
+
+ROME = ("Rome est fondée selon la légende par Romulus et Remus en 753 avant J.-C. "
+        "La ville devient une république, puis un empire qui domine la Méditerranée.")
+GAULE = "Jules César conquiert la Gaule entre 58 et 51 avant J.-C. après de longues campagnes."
+
+
+def _previous_edition(tmp, sections, previous_content=None, threshold=0.9):
+    path = os.path.join(tmp, "Rome_adapte_dyslexie.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "adapted_sections": sections,
+            "exercise_adaptations": [{"original_exercise": "Réponds aux questions.",
+                                      "adapted_exercise": "Lis. Puis réponds.", "sources": []}],
+            "instruction_adaptations": []
+        }, f, ensure_ascii=False)
+    return PreviousEdition(path, previous_content, similarity_threshold=threshold)
+
+
+def _section_entry(title, content, with_hash):
+    entry = {"original_title": title, "original_content_preview": content[:200] + "...",
+             "adapted_content": f"{title} adapté", "sources": [{"source": "guide.pdf"}]}
+    if with_hash:
+        entry["original_content_hash"] = content_hash(content)
+    return entry
+
+
+def test_exact_hash_reuse():
+    """Une section ou un exercice identique (aux espaces près) réutilise l'ancienne adaptation"""
+    with tempfile.TemporaryDirectory() as tmp:
+        edition = _previous_edition(tmp, [_section_entry("Rome", ROME, with_hash=True)])
+
+        reused = edition.find("section", {"title": "Rome", "content": ROME.replace(" ", "\n  ", 3)})
+        exercise = edition.find("exercise", "  Réponds   aux questions. ")
+        print(f"   ✅ {edition.reused} éléments réutilisés par empreinte")
+        assert reused == {"answer": "Rome adapté", "sources": [{"source": "guide.pdf"}], "reused": True}
+        assert exercise["answer"] == "Lis. Puis réponds."
+        assert edition.find("section", {"title": "Gaule", "content": GAULE}) is None
+        assert edition.find("instruction", "Souligne les dates.") is None
+        assert edition.reused == 2
+
+
+def test_similarity_threshold_reuse():
+    """Une correction mineure est réutilisée grâce à l'ancien PDF ; une réécriture ne l'est pas"""
+    previous_content = {"sections": [{"title": "Rome", "content": ROME}, {"title": "Gaule", "content": GAULE}]}
+    with tempfile.TemporaryDirectory() as tmp:
+        edition = _previous_edition(tmp, [_section_entry("Rome", ROME, with_hash=False),
+                                          _section_entry("Gaule", GAULE, with_hash=False)], previous_content)
+
+        corrected = edition.find("section", {"title": "Rome", "content": ROME.replace("753", "754")})
+        rewritten = edition.find("section", {"title": "Rome", "content": "Les Étrusques dominent l'Italie centrale."})
+        exact = edition.find("section", {"title": "Gaule", "content": GAULE})
+
+        print(f"   ✅ Correction mineure réutilisée : {corrected['answer']}")
+        assert corrected["answer"] == "Rome adapté" and corrected["reused"]
+        assert rewritten is None
+        assert exact["answer"] == "Gaule adapté"
+
+        # Sans l'ancien PDF, seules les empreintes enregistrées sont utilisables
+        without_pdf = _previous_edition(tmp, [_section_entry("Rome", ROME, with_hash=False)])
+        assert without_pdf.find("section", {"title": "Rome", "content": ROME}) is None
+
+
+if __name__ == "__main__":
+    print("🧪 Test de la Réadaptation des Nouvelles Éditions")
+    print("=" * 50)
+    test_exact_hash_reuse()
+    test_similarity_threshold_reuse()
+    print("\n🎉 Tous les tests sont passés !")
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Test de la réduction de dimension des embeddings
+Vérifie la troncature re-normalisée et le rejet des embeddings d'exemples d'une autre dimension
+"""
+
+import json
+import math
+import os
+import tempfile
+
+import numpy as np
+
+from config import config
+from eval_embedding_dimensions import reduce_matrix
+from example_store import embeddings_sidecar_path
+from real_examples_extractor import RealExamplesExtractor
+from real_examples_provider import RealExamplesProvider
+from vector_store import reduce_embedding
+
+
+def test_reduce_embedding():
+    """Les premières dimensions sont gardées puis remises à la norme 1"""
+    embedding = [3.0, 4.0, 12.0, 84.0]
+    reduced = reduce_embedding(embedding, 2)
+
+    print(f"   ✅ {embedding} -> {reduced}")
+    assert reduced == [0.6, 0.8]
+    assert math.isclose(math.sqrt(sum(value * value for value in reduce_embedding(embedding, 3))), 1.0)
+    assert reduce_embedding(embedding, 4) == embedding
+    assert np.allclose(reduce_matrix(np.array([embedding]), 2), [reduced])
+
+
+def test_dimension_larger_than_model_raises():
+    """Une dimension plus grande que celle du modèle est une erreur de configuration"""
+    try:
+        reduce_embedding([0.6, 0.8], 3)
+        assert False, "une dimension plus grande que l'embedding doit lever ValueError"
+    except ValueError as e:
+        print(f"   ✅ {e}")
+
+
+def _examples_with_embeddings(tmp, info):
+    path = os.path.join(tmp, "examples.json")
+    sections = [{"original": "Les Romains construisent des routes.", "adapted": "Les Romains font des routes.",
+                 "subject": "Histoire"}]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"sections": sections, "metadata": {"embeddings": info}}, f, ensure_ascii=False)
+    np.save(embeddings_sidecar_path(path), np.ones((1, 4), dtype=np.float32))
+    return path
+
+
+def test_example_embeddings_of_another_dimension_are_rejected():
+    """Des embeddings d'exemples d'une autre dimension, ou de dimension inconnue, ne sont pas réutilisés"""
+    current = {"model": config.EMBEDDING_MODEL, "dimension": config.EMBEDDING_DIMENSION}
+    for info, usable in ((current, True),
+                         ({**current, "dimension": config.EMBEDDING_DIMENSION // 2}, False),
+                         ({"model": config.EMBEDDING_MODEL}, False)):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = _examples_with_embeddings(tmp, info)
+            provider = RealExamplesProvider(path, embedder=lambda text: [1.0] * 4)
+            _, previous_embeddings = RealExamplesExtractor()._load_previous(path)
+        assert (provider.index.embeddings is not None) == usable
+        assert (previous_embeddings is not None) == usable
+    print("   ✅ Embeddings de dimension différente ou inconnue écartés")
+
+
+if __name__ == "__main__":
+    print("🧪 Test de la Réduction de Dimension des Embeddings")
+    print("=" * 50)
+    test_reduce_embedding()
+    test_dimension_larger_than_model_raises()
+    test_example_embeddings_of_another_dimension_are_rejected()
+    print("\n🎉 Tous les tests sont passés !")
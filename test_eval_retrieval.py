@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test de l'évaluation de la recherche documentaire
+Vérifie le rappel@k, le MRR et la frontière de Pareto avec les embeddings hachés hors ligne
+"""
+
+from eval_retrieval import evaluate_chunking, hashed_embeddings, pareto_frontier
+from pdf_processor import DocumentChunk, make_chunk_id
+
+TEXTS = [
+    ("romains.pdf", 1, "Les Romains construisent des routes pavées et des aqueducs."),
+    ("fleuves.pdf", 2, "Le fleuve traverse la plaine avant de rejoindre la mer."),
+    ("carolingiens.pdf", 3, "Charlemagne est couronné empereur à Rome en l'an 800."),
+]
+
+GOLDEN = [
+    {"question": "Pourquoi les Romains construisent-ils des routes pavées ?",
+     "expected": [{"source": "romains.pdf", "page": 1}]},
+    {"question": "Quand Charlemagne est-il couronné empereur ?", "expected": [{"source": "carolingiens.pdf"}]},
+    # Mauvaise page : jamais retrouvée
+    {"question": "Où le fleuve rejoint-il la mer ?", "expected": [{"source": "fleuves.pdf", "page": 9}]},
+    # Plus proche de Charlemagne que des Romains : retrouvée au 2e rang
+    {"question": "Charlemagne couronné empereur fait-il construire des routes ?",
+     "expected": [{"source": "romains.pdf"}]},
+]
+
+
+def _chunks():
+    return [DocumentChunk(text=text, source=source, author="Auteur", page_number=page, section="Content",
+                          chunk_id=make_chunk_id(source, text))
+            for source, page, text in TEXTS]
+
+
+def test_recall_and_mrr():
+    """Rappel@k et MRR comptent la source et, si elle est donnée, la page attendues"""
+    rows = evaluate_chunking(_chunks(), GOLDEN, hashed_embeddings, dimensions=[1536, 256], top_ks=[1, 3],
+                             count_tokens=lambda text: len(text.split()))
+    by_setting = {(row["dimension"], row["top_k"]): row for row in rows}
+
+    top_1, top_3 = by_setting[(1536, 1)], by_setting[(1536, 3)]
+    print(f"   ✅ Rappel@1 {top_1['recall_at_k']:.2f}, rappel@3 {top_3['recall_at_k']:.2f}, "
+          f"MRR@3 {top_3['mrr']:.3f}")
+    assert [(row["dimension"], row["top_k"]) for row in rows] == [(1536, 1), (1536, 3), (256, 1), (256, 3)]
+    assert top_1["recall_at_k"] == 0.5 and top_1["mrr"] == 0.5
+    assert top_3["recall_at_k"] == 0.75 and top_3["mrr"] == (1 + 1 + 0 + 0.5) / 4
+    assert top_1["sources"] == 1.0 and top_3["sources"] == 3.0
+    assert top_3["chunks"] == 3 and top_3["embedding_tokens"] == sum(len(text.split()) for _, _, text in TEXTS)
+    assert by_setting[(256, 3)]["index_mb"] < top_3["index_mb"]
+
+
+def test_pareto_frontier():
+    """Un réglage reste sur la frontière s'il n'est battu sur tous les critères par aucun autre"""
+    def row(recall, mrr, top_k, index_mb):
+        return {"recall_at_k": recall, "mrr": mrr, "top_k": top_k, "index_mb": index_mb,
+                "embedding_tokens": 100, "search_ms": 1.0}
+
+    rows = [
+        row(0.8, 0.6, 5, 10.0),
+        row(0.8, 0.6, 5, 12.0),  # même score, index plus gros : dominé
+        row(0.9, 0.6, 10, 10.0),  # meilleur rappel, mais top_k plus grand
+        row(0.7, 0.5, 3, 10.0),
+        row(0.7, 0.5, 3, 10.0),  # égalité : aucun des deux ne domine l'autre
+        row(0.6, 0.4, 5, 10.0),  # dominé par le premier
+    ]
+    frontier = pareto_frontier(rows)
+    print(f"   ✅ {len(frontier)} réglages sur la frontière (sur {len(rows)})")
+    assert [id(best) for best in frontier] == [id(rows[i]) for i in (0, 2, 3, 4)]
+
+    evaluated = evaluate_chunking(_chunks(), GOLDEN, hashed_embeddings, dimensions=[1536], top_ks=[1, 3],
+                                  count_tokens=lambda text: len(text.split()))
+    # Rappel plus faible à k=1, mais moins de contexte : les deux réglages restent
+    assert len(pareto_frontier(evaluated)) == 2
+
+
+if __name__ == "__main__":
+    print("🧪 Test de l'Évaluation de la Recherche")
+    print("=" * 50)
+    test_recall_and_mrr()
+    test_pareto_frontier()
+    print("\n🎉 Tous les tests sont passés !")
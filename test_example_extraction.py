@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test de l'extraction des exemples réels
+Vérifie l'arrêt de la lecture après les premières sections et la reprise des paires inchangées
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import real_examples_extractor
+from config import config
+from real_examples_extractor import RealExamplesExtractor
+
+PAGES = [
+    "le cours commence ici.\nI. Les origines\nRome est fondée.",
+    "la suite des origines.",
+    "II. La république\nLes consuls gouvernent.\nIII. L'empire",
+    "Auguste devient empereur.",
+    "IV. La chute\nLes invasions.",
+]
+
+
+class _FakePDF:
+    """Remplace fitz : un document dont les pages lues sont comptées"""
+    def __init__(self, pages):
+        self.pages = pages
+        self.read = 0
+
+    def open(self, path):
+        return self
+
+    def __iter__(self):
+        for text in self.pages:
+            self.read += 1
+            yield type("Page", (), {"get_text": staticmethod(lambda text=text: text)})()
+
+    def close(self):
+        pass
+
+
+def _read_pdf(pages, max_sections):
+    fake = _FakePDF(pages)
+    saved = real_examples_extractor.fitz
+    real_examples_extractor.fitz = fake
+    try:
+        text = RealExamplesExtractor()._extract_from_pdf("cours.pdf", max_sections)
+    finally:
+        real_examples_extractor.fitz = saved
+    return text, fake.read
+
+
+def test_pdf_reading_stops_after_max_sections():
+    """La lecture s'arrête à la page qui commence la section suivante, comme en redécoupant tout le texte"""
+    extractor = RealExamplesExtractor()
+    for max_sections in range(1, 6):
+        text, read = _read_pdf(PAGES, max_sections)
+        # Référence : redécouper le texte lu après chaque page
+        expected = ""
+        for page in PAGES:
+            expected += page + "\n"
+            if len(extractor._split_into_sections(expected)) > max_sections:
+                break
+        assert text == expected, max_sections
+
+    text, read = _read_pdf(PAGES, 2)
+    print(f"   ✅ 2 sections : {read} pages lues sur {len(PAGES)}")
+    assert read == 3
+    assert len(extractor._split_into_sections(text)) > 2
+    assert _read_pdf(PAGES, None)[1] == len(PAGES)
+    # Un texte qui commence par un titre n'a pas de section initiale
+    assert _read_pdf(["I. Début\ntexte", "II. Suite\ntexte", "III. Fin"], 2)[1] == 3
+
+
+def test_incremental_extraction_skips_unchanged_pairs():
+    """Seules les paires dont un fichier a changé sont relues et leurs exemples embarqués"""
+    with tempfile.TemporaryDirectory() as tmp:
+        pairs = []
+        for name in ("Rome", "Gaule"):
+            normal, adapted = Path(tmp, f"{name}.pdf"), Path(tmp, f"{name} DYS.pdf")
+            normal.write_bytes(f"cours {name}".encode())
+            adapted.write_bytes(f"cours {name} adapté".encode())
+            pairs.append({"normal_file": str(normal), "adapted_file": str(adapted), "subject": "Histoire",
+                          "level": "6EME", "chapter": name})
+
+        embedded, extracted = [], []
+
+        def embedder(texts):
+            embedded.extend(texts)
+            return [[1.0] + [0.0] * (config.EMBEDDING_DIMENSION - 1) for _ in texts]
+
+        def run():
+            extractor = RealExamplesExtractor(embedder=embedder)
+
+            def extract_pair(pair):
+                extracted.append(pair["chapter"])
+                return [{"original": f"Texte original {pair['chapter']} {Path(pair['normal_file']).read_text()}",
+                         "adapted": "Texte adapté", "subject": pair["subject"], "pair": pair["normal_file"]}]
+
+            extractor.extract_pair = extract_pair
+            filename = os.path.join(tmp, "examples.json")
+            examples = extractor.extract_all_examples(incremental=True, workers=1, filename=filename, pairs=pairs)
+            extractor.save_examples(examples, filename)
+            return examples, extractor.embeddings
+
+        run()
+        assert extracted == ["Rome", "Gaule"] and len(embedded) == 2
+
+        Path(pairs[1]["normal_file"]).write_bytes(b"cours Gaule, nouvelle edition")
+        extracted.clear()
+        embedded.clear()
+        examples, embeddings = run()
+
+    print(f"   ✅ Paires relues : {extracted}, {len(examples['sections'])} exemples")
+    assert extracted == ["Gaule"]
+    assert embedded == ["Texte original Gaule cours Gaule, nouvelle edition"]
+    assert [example["original"] for example in examples["sections"]] == [
+        "Texte original Rome cours Rome", "Texte original Gaule cours Gaule, nouvelle edition"
+    ]
+    assert embeddings.shape == (2, config.EMBEDDING_DIMENSION)
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+
+
+if __name__ == "__main__":
+    print("🧪 Test de l'Extraction des Exemples Réels")
+    print("=" * 50)
+    test_pdf_reading_stops_after_max_sections()
+    test_incremental_extraction_skips_unchanged_pairs()
+    print("\n🎉 Tous les tests sont passés !")
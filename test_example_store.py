@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Test de la base d'exemples réels
+Vérifie l'import/export JSON, le choix des partitions, l'ouverture en lecture seule et l'aperçu
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from example_store import ExampleStore, embeddings_sidecar_path
+from real_examples_provider import RealExamplesProvider
+
+SECTIONS = [
+    {"original": "Les Romains construisent des routes.", "adapted": "Les Romains font des routes.",
+     "subject": "Histoire", "source": "6EME - CHAPITRE 2"},
+    {"original": "La Terre tourne autour du Soleil.", "adapted": "La Terre tourne autour du Soleil.",
+     "subject": "Géographie", "source": "5EME - CHAPITRE 1"},
+    {"original": "Charlemagne est couronné en 800.", "adapted": "Charlemagne devient empereur en 800.",
+     "subject": "Histoire", "source": "5EME - CHAPITRE 9", "level": "5EME"},
+]
+
+
+def _write_json(tmp, embeddings=True):
+    json_path = os.path.join(tmp, "examples.json")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({"sections": SECTIONS, "metadata": {"version": 2, "embeddings": embeddings}}, f, ensure_ascii=False)
+    if embeddings:
+        np.save(embeddings_sidecar_path(json_path), np.arange(len(SECTIONS) * 4, dtype=np.float32).reshape(-1, 4))
+    return json_path
+
+
+def test_import_export_round_trip():
+    """Un JSON importé puis exporté garde ses exemples, ses métadonnées et ses embeddings"""
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = _write_json(tmp)
+        store = ExampleStore(os.path.join(tmp, "examples.sqlite"))
+        try:
+            assert store.import_json(json_path) == 3
+            exported_path = os.path.join(tmp, "export.json")
+            assert store.export_json(exported_path) == 3
+        finally:
+            store.close()
+
+        with open(exported_path, 'r', encoding='utf-8') as f:
+            exported = json.load(f)
+        print(f"   ✅ {len(exported['sections'])} exemples exportés")
+        assert exported["metadata"] == {"version": 2, "embeddings": True}
+        # L'export suit l'ordre des partitions (matière, niveau)
+        by_original = {example["original"]: example for example in exported["sections"]}
+        assert by_original[SECTIONS[0]["original"]]["level"] == "6EME"
+        assert by_original[SECTIONS[2]["original"]]["adapted"] == SECTIONS[2]["adapted"]
+        original_vectors = np.load(embeddings_sidecar_path(json_path))
+        exported_vectors = np.load(embeddings_sidecar_path(exported_path))
+        positions = [[section["original"] for section in SECTIONS].index(example["original"])
+                     for example in exported["sections"]]
+        assert np.array_equal(exported_vectors, original_vectors[positions])
+
+
+def test_matching_shards():
+    """Les partitions sont choisies par matière et niveau, sans tenir compte des accents"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ExampleStore(os.path.join(tmp, "examples.sqlite"))
+        try:
+            store.import_json(_write_json(tmp, embeddings=False))
+            print(f"   ✅ Partitions : {store.shards()}")
+            assert store.matching_shards("Histoire") == [("Histoire", "5EME"), ("Histoire", "6EME")]
+            assert store.matching_shards("geographie") == [("Géographie", "5EME")]
+            assert store.matching_shards("Histoire", "6eme") == [("Histoire", "6EME")]
+            assert len(store.matching_shards()) == 3
+            assert store.matching_shards("Physique") == []
+
+            sections, embeddings = store.load_shards([("Histoire", "6EME")])
+            assert [example["original"] for example in sections] == [SECTIONS[0]["original"]]
+            assert embeddings is None
+        finally:
+            store.close()
+
+
+def test_missing_store_is_not_created():
+    """Une base absente n'est pas créée vide : lecture seule et avertissement"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "exemples.sqlite")
+        try:
+            ExampleStore(path, read_only=True)
+            assert False, "une base absente ouverte en lecture seule doit lever FileNotFoundError"
+        except FileNotFoundError:
+            pass
+
+        provider = RealExamplesProvider(path, embedder=lambda text: [0.0])
+        print("   ✅ Base absente : aucun exemple, fichier non créé")
+        assert not os.path.exists(path)
+        assert not provider.has_examples()
+        assert provider.get_best_example_for_content("Les Romains") == ""
+
+        # La base apparaît ensuite (import) : elle est lue au rechargement suivant
+        store = ExampleStore(path)
+        store.import_json(_write_json(tmp, embeddings=False))
+        store.close()
+        assert provider.refresh()
+        assert provider.has_examples()
+
+        read_only = ExampleStore(path, read_only=True)
+        try:
+            assert read_only.count() == 3
+        finally:
+            read_only.close()
+
+
+def test_preview_store_examples():
+    """Les statistiques et l'aperçu d'un fournisseur adossé à la base listent ses sources"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "exemples.sqlite")
+        store = ExampleStore(path)
+        store.import_json(_write_json(tmp, embeddings=False))
+        store.close()
+
+        provider = RealExamplesProvider(path, embedder=lambda text: [0.0])
+        stats = provider.get_stats()
+        provider.preview_examples()
+
+        print(f"   ✅ {len(stats['sources'])} sources dans la base")
+        assert stats["total_examples"] == 3
+        assert stats["sources"] == sorted(section["source"] for section in SECTIONS)
+
+
+if __name__ == "__main__":
+    print("🧪 Test de la Base d'Exemples Réels")
+    print("=" * 50)
+    test_import_export_round_trip()
+    test_matching_shards()
+    test_missing_store_is_not_created()
+    test_preview_store_examples()
+    print("\n🎉 Tous les tests sont passés !")
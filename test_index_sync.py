@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Test de la synchronisation de l'index
+Vérifie que seuls les segments nouveaux sont embarqués, que tout vecteur qui n'est plus voulu est supprimé,
+et qu'un échec (PDF illisible, embedding ou envoi raté) ne supprime jamais les vecteurs d'un document
+"""
+
+import tempfile
+from pathlib import Path
+
+from pdf_processor import DocumentChunk, PDFProcessor, make_chunk_id
+from vector_store import SUMMARY_NAMESPACE, VectorStore
+
+
+class _FakeIndex:
+    """Index Pinecone en mémoire, un dictionnaire de vecteurs par namespace"""
+    def __init__(self, namespaces, failing_ids=()):
+        self.namespaces = {namespace: dict.fromkeys(ids) for namespace, ids in namespaces.items()}
+        self.failing_ids = set(failing_ids)
+
+    def list(self, prefix=None, namespace=""):
+        yield [vector_id for vector_id in self.namespaces.get(namespace, {}) if vector_id.startswith(prefix or "")]
+
+    def upsert(self, vectors, namespace=""):
+        if any(vector["id"] in self.failing_ids for vector in vectors):
+            raise RuntimeError("envoi refusé")
+        for vector in vectors:
+            self.namespaces.setdefault(namespace, {})[vector["id"]] = vector
+
+    def delete(self, ids, namespace=""):
+        for vector_id in ids:
+            del self.namespaces[namespace][vector_id]
+
+
+def _chunk(text, source, section="Content"):
+    return DocumentChunk(text=text, source=source, author="Auteur", page_number=1, section=section,
+                         chunk_id=make_chunk_id(source, text))
+
+
+def _vector_store(index, failing_texts=()):
+    store = VectorStore.__new__(VectorStore)
+    store.index = index
+    store.embedded = []
+
+    def embed(texts, **kwargs):
+        if any(text in failing_texts for text in texts):
+            raise RuntimeError("embedding impossible")
+        store.embedded.extend(texts)
+        return [[1.0] for _ in texts]
+
+    store.batch_generate_embeddings = embed
+    return store
+
+
+def test_removed_documents_are_deleted():
+    """Un document retiré, un document fusionné par la déduplication et les anciens IDs sont supprimés"""
+    kept = _chunk("La dyslexie touche la lecture.", "guide.pdf")
+    new = _chunk("Un texte aéré se lit mieux.", "guide.pdf")
+    removed = _chunk("Ce mémoire a été retiré du dossier.", "retiré.pdf")
+    collapsed = _chunk("La dyslexie touche la lecture.", "guide-2025.pdf")
+    legacy = "guide.pdf_page1_chunk0"
+    store = _vector_store(_FakeIndex({"": [kept.chunk_id, removed.chunk_id, collapsed.chunk_id, legacy]}))
+
+    stats = store.sync_chunks([kept, new])
+
+    print(f"   ✅ {stats['upserted']} ajouté, {stats['deleted']} supprimés, {stats['unchanged']} inchangé")
+    assert stats == {"unchanged": 1, "upserted": 1, "deleted": 3, "failed": 0}
+    assert store.embedded == [new.text]
+    assert sorted(store.index.namespaces[""]) == sorted([kept.chunk_id, new.chunk_id])
+
+
+def test_summaries_of_removed_documents_are_deleted():
+    """Les résumés d'un document retiré disparaissent aussi, sans toucher aux segments"""
+    chunks = [_chunk("La dyslexie touche la lecture.", "guide.pdf")]
+    store = _vector_store(_FakeIndex({"": [chunks[0].chunk_id]}))
+
+    store.sync_summaries(chunks + [_chunk("Ce mémoire sera retiré.", "retiré.pdf")])
+    assert len(store.index.namespaces[SUMMARY_NAMESPACE]) == 4  # document + section, pour chaque source
+
+    stats = store.sync_summaries(chunks)
+
+    print(f"   ✅ {stats['deleted']} résumés supprimés")
+    assert stats == {"unchanged": 2, "upserted": 0, "deleted": 2, "failed": 0}
+    assert all(vector_id.startswith("guide.pdf#") for vector_id in store.index.namespaces[SUMMARY_NAMESPACE])
+    assert list(store.index.namespaces[""]) == [chunks[0].chunk_id]
+
+
+def test_failed_upsert_keeps_old_vectors():
+    """Un lot refusé garde les anciens vecteurs de son document ; les autres documents sont synchronisés"""
+    old = _chunk("Ancienne version du guide.", "guide.pdf")
+    rejected = _chunk("Nouvelle version du guide.", "guide.pdf")
+    other_old = _chunk("Ancienne fiche.", "fiche.pdf")
+    other_new = _chunk("Nouvelle fiche.", "fiche.pdf")
+    index = _FakeIndex({"": [old.chunk_id, other_old.chunk_id]}, failing_ids=[rejected.chunk_id])
+    store = _vector_store(index)
+
+    stats = store.sync_chunks([rejected, other_new], batch_size=1)
+
+    print(f"   ✅ {stats['failed']} segment en échec, ancien vecteur conservé")
+    assert stats == {"unchanged": 0, "upserted": 1, "deleted": 1, "failed": 1}
+    assert sorted(index.namespaces[""]) == sorted([old.chunk_id, other_new.chunk_id])
+
+    # La synchronisation suivante réessaie le segment, puis supprime l'ancien vecteur
+    index.failing_ids = set()
+    assert store.sync_chunks([rejected, other_new]) == {"unchanged": 1, "upserted": 1, "deleted": 1, "failed": 0}
+    assert sorted(index.namespaces[""]) == sorted([rejected.chunk_id, other_new.chunk_id])
+
+
+def test_failed_embedding_is_retried():
+    """Un texte sans embedding n'est pas indexé avec un vecteur factice : il est réessayé ensuite"""
+    old = _chunk("Ancienne version du guide.", "guide.pdf")
+    new = _chunk("Nouvelle version du guide.", "guide.pdf")
+    index = _FakeIndex({"": [old.chunk_id]})
+
+    stats = _vector_store(index, failing_texts=[new.text]).sync_chunks([new])
+    assert stats == {"unchanged": 0, "upserted": 0, "deleted": 0, "failed": 1}
+    assert list(index.namespaces[""]) == [old.chunk_id]
+
+    stats = _vector_store(index).sync_chunks([new])
+    print(f"   ✅ Segment réessayé : {stats['upserted']} ajouté")
+    assert stats == {"unchanged": 0, "upserted": 1, "deleted": 1, "failed": 0}
+
+
+def test_embedding_errors_raise():
+    """batch_generate_embeddings lève une erreur au lieu de renvoyer un vecteur nul"""
+    class Failing:
+        def create(self, **kwargs):
+            raise RuntimeError("API indisponible")
+
+    store = VectorStore.__new__(VectorStore)
+    store.encoding = type("Encoding", (), {"encode": staticmethod(str.split), "decode": staticmethod(" ".join)})()
+    store.rate_limiter = type("Limiter", (), {"acquire": staticmethod(lambda tokens: 0.0)})()
+    store.openai_client = type("Client", (), {"embeddings": Failing()})()
+    try:
+        store.batch_generate_embeddings(["un texte"], show_progress=False)
+        assert False, "un embedding impossible doit lever une erreur"
+    except RuntimeError:
+        print("   ✅ Erreur levée, aucun vecteur nul")
+
+
+def test_unparsed_documents_are_kept():
+    """Les vecteurs d'un PDF illisible ne sont pas supprimés, ni ses résumés"""
+    guide = _chunk("La dyslexie touche la lecture.", "guide.pdf")
+    broken = _chunk("Un mémoire déjà indexé.", "mémoire.pdf")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, "guide.pdf").write_bytes(b"")
+        Path(tmp, "mémoire.pdf").write_bytes(b"")
+        processor = PDFProcessor()
+
+        def process_pdf(pdf_path):
+            if Path(pdf_path).name == "mémoire.pdf":
+                raise RuntimeError("PDF corrompu")
+            return [guide]
+
+        processor.process_pdf = process_pdf
+        chunks = processor.process_all_pdfs_to_store(tmp)
+        assert processor.failed_sources == ["mémoire.pdf"]
+
+        store = _vector_store(_FakeIndex({"": [guide.chunk_id, broken.chunk_id]}))
+        store.sync_summaries([guide, broken])
+        stats = store.sync_chunks(chunks, keep_sources=processor.failed_sources)
+        summary_stats = store.sync_summaries(chunks, keep_sources=processor.failed_sources)
+        chunks.close()
+
+    print(f"   ✅ PDF illisible : {stats['deleted']} vecteur supprimé")
+    assert stats == {"unchanged": 1, "upserted": 0, "deleted": 0, "failed": 0}
+    assert summary_stats["deleted"] == 0
+    assert len(store.index.namespaces[SUMMARY_NAMESPACE]) == 4
+
+
+if __name__ == "__main__":
+    print("🧪 Test de la Synchronisation de l'Index")
+    print("=" * 50)
+    test_removed_documents_are_deleted()
+    test_summaries_of_removed_documents_are_deleted()
+    test_failed_upsert_keeps_old_vectors()
+    test_failed_embedding_is_retried()
+    test_embedding_errors_raise()
+    test_unparsed_documents_are_kept()
+    print("\n🎉 Tous les tests sont passés !")
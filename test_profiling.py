@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test du profilage par étape
+Vérifie le temps propre des étapes imbriquées et les piles de chaque thread dans le fichier flame graph
+"""
+
+import os
+import tempfile
+import threading
+
+import profiling
+from profiling import Profiler
+
+
+class _Clock:
+    """Horloge simulée, partagée par tous les threads : le test avance le temps à la main"""
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+def _profile(run):
+    clock = _Clock()
+    saved = profiling.time
+    profiling.time = clock
+    try:
+        profiler = Profiler()
+        profiler.start()
+        run(profiler, clock)
+        with tempfile.TemporaryDirectory() as tmp:
+            files = profiler.stop(tmp, "test")
+            with open(files["collapsed"], 'r', encoding='utf-8') as f:
+                collapsed = f.read().splitlines()
+            assert os.path.exists(files["summary"])
+    finally:
+        profiling.time = saved
+    return profiler, collapsed
+
+
+def test_nested_spans_self_time():
+    """Le temps propre d'une étape exclut celui des étapes imbriquées"""
+    def run(profiler, clock):
+        with profiler.span("run"):
+            clock.now += 1
+            for seconds in (2, 3):
+                with profiler.span("embed"):
+                    clock.now += seconds
+                    with profiler.span("upsert"):
+                        clock.now += 1
+
+    profiler, collapsed = _profile(run)
+    print(f"   ✅ Piles : {collapsed}")
+    assert profiler.stacks == {"run": 1.0, "run;embed": 5.0, "run;embed;upsert": 2.0}
+    assert profiler.stages["run"] == {"calls": 1, "seconds": 8.0, "self_seconds": 1.0,
+                                      "max_seconds": 8.0, "allocated_bytes": 0}
+    assert profiler.stages["embed"]["calls"] == 2
+    assert profiler.stages["embed"]["seconds"] == 7.0 and profiler.stages["embed"]["self_seconds"] == 5.0
+    assert profiler.stages["embed"]["max_seconds"] == 4.0
+    assert profiler.wall_seconds == 8.0
+    assert collapsed == ["run 1000000", "run;embed 5000000", "run;embed;upsert 2000000"]
+
+
+def test_worker_thread_stacks():
+    """Les étapes d'un thread de travail forment leurs propres piles, sans celles du thread principal"""
+    def run(profiler, clock):
+        def worker():
+            with profiler.span("adapt"):
+                clock.now += 4
+                with profiler.span("embed"):
+                    clock.now += 5
+
+        with profiler.span("run"):
+            with profiler.span("embed"):
+                clock.now += 2
+                thread = threading.Thread(target=worker)
+                thread.start()
+                thread.join()
+                clock.now += 1
+
+    profiler, collapsed = _profile(run)
+    print(f"   ✅ Piles : {collapsed}")
+    assert collapsed == ["adapt 4000000", "adapt;embed 5000000", "run;embed 12000000"]
+    assert profiler.stages["embed"]["calls"] == 2 and profiler.stages["embed"]["seconds"] == 17.0
+    assert profiler.stages["adapt"]["self_seconds"] == 4.0
+
+
+def test_disabled_spans_record_nothing():
+    """Sans profilage, span() renvoie le même contexte vide et rien n'est mesuré"""
+    profiler = Profiler()
+    with profiler.span("run"):
+        pass
+    print("   ✅ Aucune mesure hors profilage")
+    assert profiler.span("run") is profiler.span("embed")
+    assert profiler.stages == {} and profiler.stacks == {}
+
+
+if __name__ == "__main__":
+    print("🧪 Test du Profilage par Étape")
+    print("=" * 50)
+    test_nested_spans_self_time()
+    test_worker_thread_stacks()
+    test_disabled_spans_record_nothing()
+    print("\n🎉 Tous les tests sont passés !")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test du traitement des questions par lots
+Vérifie la lecture des questions, les lignes JSON écrites, les échecs et le résumé de latence
+"""
+
+import io
+import json
+
+import main
+from main import read_questions, run_question_batch
+
+
+class _Clock:
+    """Horloge simulée : chaque question « dure » le temps que lui donne le RAG factice"""
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class _FakeRAG:
+    """Remplace DyslexiaRAG : la question n°i dure i + 1 secondes ; « échec » lève une erreur"""
+    def __init__(self, clock=None):
+        self.clock = clock
+
+    def query(self, question):
+        number = int(question.split()[-1])
+        if self.clock is not None:
+            self.clock.now += number + 1
+        if question.startswith("échec"):
+            raise RuntimeError("API indisponible")
+        return {"question": question, "answer": f"Réponse {number}", "sources": [{"source": "guide.pdf"}],
+                "usage": {"total_tokens": 10}, "finish_reason": "stop"}
+
+
+def test_read_questions():
+    """Une question par ligne ; lignes vides et commentaires ignorés"""
+    questions = read_questions(io.StringIO("# questions du test\nQuestion 1 ?\n\n   \n  Question 2 ?  \n  # fin\n"))
+    print(f"   ✅ {len(questions)} questions lues")
+    assert questions == ["Question 1 ?", "Question 2 ?"]
+
+
+def test_records_keep_question_index():
+    """Les réponses arrivent dans l'ordre de fin, chacune avec la position de sa question"""
+    questions = [f"Question {i}" for i in range(12)] + ["échec 12"]
+    output = io.StringIO()
+    summary = run_question_batch(_FakeRAG(), questions, output, concurrency=4)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    print(f"   ✅ {len(records)} réponses, {summary['failed']} en échec")
+    assert sorted(record["index"] for record in records) == list(range(13))
+    for record in records:
+        assert record["question"] == questions[record["index"]]
+    failed = next(record for record in records if record["index"] == 12)
+    assert failed["error"] == "API indisponible" and failed["answer"] == ""
+    assert all(record["error"] is None for record in records if record["index"] != 12)
+    assert summary["questions"] == 13 and summary["failed"] == 1
+    assert summary["total_tokens"] == 120
+
+
+def test_latency_percentiles():
+    """La médiane et le 95e centile sont pris sur les latences triées"""
+    clock = _Clock()
+    saved = main.time
+    main.time = clock
+    try:
+        questions = [f"Question {i}" for i in range(19)] + ["échec 19"]
+        output = io.StringIO()
+        summary = run_question_batch(_FakeRAG(clock), questions, output, concurrency=1)
+    finally:
+        main.time = saved
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    print(f"   ✅ Latence médiane {summary['latency_p50']}s, p95 {summary['latency_p95']}s")
+    # Latences de 1 à 20 secondes, l'échec compris
+    assert [record["index"] for record in records] == list(range(20))
+    assert [record["latency_seconds"] for record in records] == [float(i + 1) for i in range(20)]
+    assert summary["latency_p50"] == 11.0 and summary["latency_p95"] == 20.0
+    assert summary["elapsed_seconds"] == 210.0
+    assert summary["questions_per_minute"] == round(20 / 210 * 60, 1)
+
+
+if __name__ == "__main__":
+    print("🧪 Test du Traitement des Questions par Lots")
+    print("=" * 50)
+    test_read_questions()
+    test_records_keep_question_index()
+    test_latency_percentiles()
+    print("\n🎉 Tous les tests sont passés !")
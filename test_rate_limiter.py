@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test du limiteur de débit
+Vérifie la comptabilité des deux seaux (requêtes et tokens) avec une horloge simulée, sans attente réelle
+"""
+
+import threading
+
+import rate_limiter
+from rate_limiter import RateLimiter
+
+
+class _Clock:
+    """Horloge simulée : le temps n'avance que pendant les attentes du limiteur"""
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+def _limiter(requests_per_minute, tokens_per_minute, clock):
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+
+    class Condition(threading.Condition):
+        def wait(self, timeout=None):
+            clock.now += timeout
+            return False
+
+    limiter._condition = Condition()
+    return limiter
+
+
+def _with_clock(test):
+    def run():
+        clock = _Clock()
+        saved = rate_limiter.time
+        rate_limiter.time = clock
+        try:
+            test(clock)
+        finally:
+            rate_limiter.time = saved
+    run.__name__, run.__doc__ = test.__name__, test.__doc__
+    return run
+
+
+@_with_clock
+def test_request_bucket(clock):
+    """Le budget de requêtes est consommé puis rechargé en continu"""
+    limiter = _limiter(60, 0, clock)
+    waits = [limiter.acquire() for _ in range(60)]
+    assert waits == [0.0] * 60
+
+    waited = limiter.acquire()
+    print(f"   ✅ 61e requête : {waited:.1f} s d'attente")
+    assert abs(waited - 1.0) < 1e-9
+    assert limiter.get_stats() == {"requests": 61, "tokens": 0, "wait_seconds": 1.0}
+
+
+@_with_clock
+def test_token_bucket(clock):
+    """Un appel attend que le seau de tokens puisse le payer ; un appel trop gros est plafonné"""
+    limiter = _limiter(0, 600, clock)
+    assert limiter.acquire(5000) == 0.0  # plafonné au budget entier
+    assert limiter.total_tokens == 600
+
+    waited = limiter.acquire(300)
+    print(f"   ✅ 300 tokens après un seau vide : {waited:.1f} s d'attente")
+    assert abs(waited - 30.0) < 1e-9
+
+    clock.now += 120  # deux minutes plus tard, le seau est plein, sans dépasser le budget
+    assert limiter.acquire(600) == 0.0
+
+
+@_with_clock
+def test_adjust_refunds_and_charges(clock):
+    """adjust rembourse une estimation trop haute et facture un dépassement"""
+    limiter = _limiter(0, 600, clock)
+    limiter.acquire(600)
+    limiter.adjust(-300)  # l'appel n'a coûté que 300 tokens
+    assert limiter.acquire(300) == 0.0
+    assert limiter.total_tokens == 600
+
+    limiter.adjust(300)  # l'appel suivant a coûté 300 tokens de plus que prévu
+    waited = limiter.acquire(0)
+    print(f"   ✅ Dépassement de 300 tokens : {waited:.1f} s d'attente")
+    assert abs(waited - 30.0) < 1e-9
+
+    limiter.adjust(-10_000)
+    assert limiter._token_allowance == 600
+
+
+if __name__ == "__main__":
+    print("🧪 Test du Limiteur de Débit")
+    print("=" * 50)
+    test_request_bucket()
+    test_token_bucket()
+    test_adjust_refunds_and_charges()
+    print("\n🎉 Tous les tests sont passés !")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test du fournisseur d'exemples réels
+Vérifie le rechargement du fichier d'exemples seulement quand il change, le classement TF-IDF
+et le choix par embeddings, écartés s'ils ne correspondent pas au modèle actuel
+"""
+
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from config import config
+from example_store import embeddings_sidecar_path
+from real_examples_provider import ExampleIndex, RealExamplesProvider, get_examples_provider
+
+SECTIONS = [
+    {"original": "Les Romains construisent des routes et des aqueducs dans tout l'empire.",
+     "adapted": "Les Romains font des routes.", "subject": "Histoire", "source": "6EME - CHAPITRE 2"},
+    {"original": "Le fleuve traverse la plaine avant de se jeter dans la mer.",
+     "adapted": "Le fleuve va jusqu'à la mer.", "subject": "Géographie", "source": "6EME - CHAPITRE 5"},
+    {"original": "Charlemagne est couronné empereur à Rome en 800.",
+     "adapted": "Charlemagne devient empereur en 800.", "subject": "Histoire", "source": "5EME - CHAPITRE 9"},
+]
+
+
+def _write_examples(path, sections, metadata=None):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"sections": sections, "metadata": metadata or {"version": 1}}, f, ensure_ascii=False)
+
+
+def test_reload_only_when_file_changes():
+    """Le fichier n'est relu que si sa date de modification ou sa taille change"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "examples.json")
+        _write_examples(path, SECTIONS[:2])
+
+        provider = get_examples_provider(path)
+        assert get_examples_provider(path) is provider
+        assert not provider.refresh()
+        assert provider.get_stats()["total_examples"] == 2
+
+        _write_examples(path, SECTIONS)
+        assert get_examples_provider(path) is provider
+        stats = provider.get_cache_stats()
+
+        print(f"   ✅ {stats['loads']} chargements, {stats['hits']} appels sans relecture")
+        assert stats["loads"] == 2 and stats["hits"] == 2
+        assert provider.get_stats()["total_examples"] == 3
+
+        # Même taille mais date de modification différente : relu aussi
+        os.utime(path, ns=(0, 0))
+        assert provider.refresh()
+
+
+def test_top_k_ranking():
+    """Les exemples sont classés par similarité TF-IDF, la matière demandée d'abord"""
+    index = ExampleIndex(SECTIONS)
+
+    # Deux termes en commun avec le 3e exemple (Charlemagne, Rome), un seul avec le 1er (routes)
+    ranking = index.top_k("Charlemagne fait construire des routes à Rome", k=3)
+    print(f"   ✅ Classement : {ranking}")
+    assert [i for i, _ in ranking] == [2, 0]
+    assert ranking[0][1] > ranking[1][1] > 0
+    assert index.top_k("Charlemagne fait construire des routes à Rome", k=1) == ranking[:1]
+
+    # Accents et majuscules ignorés ; un exemple sans terme commun n'est pas retourné
+    assert [i for i, _ in index.top_k("FLEUVE", k=3)] == [1]
+    assert index.top_k("photosynthèse", k=3) == []
+    # La matière restreint les candidats, sauf si elle n'a aucun exemple
+    assert [i for i, _ in index.top_k("Rome empereur fleuve", k=3, subject="géographie")] == [1]
+    assert [i for i, _ in index.top_k("Rome empereur fleuve", k=3, subject="Physique")] == [2, 1]
+
+
+def _embedded_examples(tmp, info):
+    """Fichier d'exemples et embeddings : un axe par exemple"""
+    path = os.path.join(tmp, "examples.json")
+    _write_examples(path, SECTIONS, {"version": 1, "embeddings": info})
+    np.save(embeddings_sidecar_path(path), np.eye(len(SECTIONS), 4, dtype=np.float32))
+    return path
+
+
+def test_embedding_selection_and_rejection():
+    """Les embeddings du modèle actuel choisissent l'exemple ; ceux d'un autre modèle sont écartés"""
+    current = {"model": config.EMBEDDING_MODEL, "dimension": config.EMBEDDING_DIMENSION}
+    # Contenu sans terme commun avec les exemples, proche du 2e par embedding
+    embedder = lambda text: [0.1, 0.9, 0.0, 0.2]
+    with tempfile.TemporaryDirectory() as tmp:
+        provider = RealExamplesProvider(_embedded_examples(tmp, current), embedder=embedder)
+        best = provider.get_best_examples("photosynthèse", k=2)
+        print(f"   ✅ Choix par embedding : {best[0]['subject']}")
+        assert provider.index.embeddings is not None
+        assert [example["original"] for example in best] == [SECTIONS[1]["original"], SECTIONS[0]["original"]]
+
+        other_model = RealExamplesProvider(_embedded_examples(tmp, {**current, "model": "autre-modele"}),
+                                           embedder=embedder)
+        assert other_model.index.embeddings is None
+        assert other_model.get_best_examples("photosynthèse") == []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = _embedded_examples(tmp, current)
+        np.save(embeddings_sidecar_path(path), np.eye(2, 4, dtype=np.float32))  # périmés : 2 lignes pour 3 exemples
+        assert RealExamplesProvider(path, embedder=embedder).index.embeddings is None
+
+
+if __name__ == "__main__":
+    print("🧪 Test du Fournisseur d'Exemples Réels")
+    print("=" * 50)
+    test_reload_only_when_file_changes()
+    test_top_k_ranking()
+    test_embedding_selection_and_rejection()
+    print("\n🎉 Tous les tests sont passés !")
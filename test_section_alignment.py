@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test de l'alignement des sections
+Vérifie que les sections d'un cours sont associées à leur version adaptée même quand l'ordre par indice est faux
+"""
+
+import time
+
+from section_alignment import align_sections
+
+ORIGINALS = [
+    "Rome est fondée selon la légende en 753 avant Jésus-Christ par Romulus et Rémus.",
+    "La république romaine est gouvernée par des magistrats élus chaque année par les citoyens.",
+    "Le Sénat rassemble les anciens magistrats et conseille la république romaine.",
+    "Les conquêtes romaines étendent le territoire autour de la mer Méditerranée.",
+]
+
+ADAPTED = [
+    "Avant de commencer : lis bien les consignes.",
+    "Rome est fondée en 753 avant Jésus-Christ. Selon la légende, Romulus et Rémus la fondent.",
+    "Les magistrats gouvernent la république romaine. Les citoyens les élisent chaque année.",
+    "Les conquêtes romaines étendent le territoire. Rome domine la mer Méditerranée.",
+]
+
+
+def test_sections_are_aligned_in_order():
+    """Une section ajoutée dans la version adaptée et une section supprimée sont ignorées"""
+    pairs = align_sections(ORIGINALS, ADAPTED)
+
+    print(f"   ✅ {len(pairs)} paires alignées")
+    assert [(i, j) for i, j, _ in pairs] == [(0, 1), (1, 2), (3, 3)]
+    assert all(score >= 0.2 for _, _, score in pairs)
+
+
+def test_unrelated_sections_are_not_paired():
+    """Aucune paire sous le seuil de similarité"""
+    pairs = align_sections(ORIGINALS[:1], ["Une aire urbaine regroupe une ville centre et sa banlieue."])
+
+    print("   ✅ Aucune paire pour des sections sans rapport")
+    assert pairs == []
+    assert align_sections([], ADAPTED) == []
+
+
+def test_long_documents():
+    """Des centaines de sections sont alignées rapidement"""
+    originals = [f"Chapitre {i} : le royaume numéro {i} et la ville {i * 7} au siècle {i % 20}." for i in range(400)]
+    adapted = [f"Au siècle {i % 20}, le royaume {i} domine la ville {i * 7}. Chapitre {i}." for i in range(400)]
+
+    start = time.perf_counter()
+    pairs = align_sections(originals, adapted)
+    elapsed = time.perf_counter() - start
+
+    print(f"   ✅ {len(pairs)} paires en {elapsed * 1000:.0f} ms")
+    assert [(i, j) for i, j, _ in pairs] == [(i, i) for i in range(400)]
+    assert elapsed < 5
+
+
+if __name__ == "__main__":
+    print("🧪 Test de l'Alignement des Sections")
+    print("=" * 50)
+    test_sections_are_aligned_in_order()
+    test_unrelated_sections_are_not_paired()
+    test_long_documents()
+    print("\n🎉 Tous les tests sont passés !")
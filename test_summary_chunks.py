@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test des résumés de documents et de sections
+Vérifie qu'un long document est résumé de sa première à sa dernière page, dans le budget de mots
+"""
+
+from pdf_processor import DocumentChunk, make_chunk_id, summary_chunks
+
+
+def _chunks(pages, source="guide.pdf", section="Content"):
+    texts = [f"page{page:03d} " + "mot " * 40 for page in range(1, pages + 1)]
+    return [DocumentChunk(text=text, source=source, author="Auteur", page_number=page, section=section,
+                          chunk_id=make_chunk_id(source, text))
+            for page, text in enumerate(texts, 1)]
+
+
+def _sampled_pages(summary):
+    return [int(word[4:]) for word in summary.text.split() if word.startswith("page")]
+
+
+def test_long_document_is_sampled_to_the_end():
+    """Les débuts de segments régulièrement espacés couvrent tout le document"""
+    summaries = summary_chunks(_chunks(200), max_words=300)
+    document = next(summary for summary in summaries if summary.section == "")
+    pages = _sampled_pages(document)
+
+    print(f"   ✅ {len(pages)} segments échantillonnés, pages {pages[0]} à {pages[-1]}")
+    assert len(document.text.split("\n", 1)[1].split()) <= 300
+    assert len(pages) == 300 // 8
+    assert pages[0] == 1 and pages[-1] > 190
+    gaps = {later - earlier for earlier, later in zip(pages, pages[1:])}
+    assert gaps <= {5, 6}
+
+
+def test_short_group_uses_every_chunk():
+    """Un petit groupe garde tous ses segments, avec une plus grande part du budget chacun"""
+    summaries = summary_chunks(_chunks(3, section="Introduction"), max_words=60)
+    section = next(summary for summary in summaries if summary.section == "Introduction")
+
+    print(f"   ✅ Section : {len(section.text.split())} mots")
+    assert section.text.startswith("guide.pdf — Introduction\n")
+    assert _sampled_pages(section) == [1, 2, 3]
+    assert len(section.text.split("\n", 1)[1].split()) == 60
+
+
+if __name__ == "__main__":
+    print("🧪 Test des Résumés de Documents")
+    print("=" * 50)
+    test_long_document_is_sampled_to_the_end()
+    test_short_group_uses_every_chunk()
+    print("\n🎉 Tous les tests sont passés !")
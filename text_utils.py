@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Normalisation de texte français
+Pliage des accents, mots vides et découpage en termes pour l'indexation
+"""
+
+import re
+import unicodedata
+from typing import List
+
+# Mots outils du français (déjà sans accents), sans intérêt pour la similarité
+FRENCH_STOP_WORDS = frozenset("""
+a ai aie ainsi alors apres au aucun aussi autre aux avait avant avec avoir bien c ca car ce ceci cela celle
+celles celui ces cet cette ceux chaque chez comme comment d dans de des deux doit donc dont du elle elles en
+encore entre es est et etaient etait ete etre eu eux fait faire il ils j je jusqu l la le les leur leurs lors
+lui m ma mais me meme mes moi mon n ne ni non nos notre nous on ont ou par parce pas peu peut plus pour
+pourquoi qu quand que quel quelle quelles quels qui s sa sans se selon ses si sont son sous sur t ta te tes
+toi ton tous tout toute toutes tres tu un une vers vos votre vous y
+""".split())
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def fold_accents(text: str) -> str:
+    """Minuscules sans accents ni ligatures : « Élève » → « eleve », « œuvre » → « oeuvre »
+
+    L'apostrophe typographique devient une apostrophe droite : sinon elle
+    disparaît au pliage et « l’élève » donnerait un seul terme « leleve ».
+    """
+    text = text.lower().replace("œ", "oe").replace("æ", "ae").replace("’", "'")
+    return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text: str, remove_stop_words: bool = True) -> List[str]:
+    """Termes normalisés d'un texte (accents pliés, apostrophes et ponctuation retirées)"""
+    tokens = _TOKEN_RE.findall(fold_accents(text))
+    if remove_stop_words:
+        return [token for token in tokens if token not in FRENCH_STOP_WORDS and len(token) > 1]
+    return tokens
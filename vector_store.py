@@ -1,13 +1,53 @@
 import openai
 import pinecone
 from pinecone import Pinecone
+import math
+import os
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
 from tqdm import tqdm
 import tiktoken
 
 from config import config
-from pdf_processor import DocumentChunk
+from rate_limiter import get_rate_limiter
+from profiling import span
+from pdf_processor import DocumentChunk, source_id_prefix, summary_chunks
+from chunk_store import ChunkSequence, ChunkStore
+from batch_jobs import BatchJob, EMBEDDINGS_URL, read_batch_results
+
+# Pinecone namespace of the document and section summaries (chunks live in the default one)
+SUMMARY_NAMESPACE = "summaries"
+
+
+def reduce_embedding(embedding: Sequence[float], dimension: int = None) -> List[float]:
+    """
+    Shorten an embedding to its first dimensions and re-normalize it.
+
+    text-embedding-3 models are trained so that a prefix of the vector is
+    itself a usable embedding (Matryoshka representation); after truncation
+    the vector is scaled back to unit length so cosine and dot product agree.
+
+    Args:
+        embedding: Full embedding returned by the model
+        dimension: Target dimension (config.EMBEDDING_DIMENSION by default)
+
+    Returns:
+        List[float]: The reduced vector, or the embedding unchanged if it
+        already has the target dimension
+
+    Raises:
+        ValueError: If the target dimension is larger than the embedding (a
+            shorter vector would not fit the index)
+    """
+    dimension = config.EMBEDDING_DIMENSION if dimension is None else dimension
+    if len(embedding) < dimension:
+        raise ValueError(f"Cannot reduce a {len(embedding)}-dimension embedding to {dimension} dimensions: "
+                         f"EMBEDDING_DIMENSION must not exceed the model's dimension")
+    if len(embedding) == dimension:
+        return list(embedding)
+    head = embedding[:dimension]
+    norm = math.sqrt(sum(value * value for value in head)) or 1.0
+    return [value / norm for value in head]
 
 
 class VectorStore:
@@ -30,6 +70,7 @@ class VectorStore:
         pc: Pinecone client for vector database operations
         index: Active Pinecone index instance
         encoding: Tokenizer for text length management
+        rate_limiter: Process-wide requests/tokens per minute budget for embeddings
     """
     def __init__(self) -> None:
         """
@@ -46,6 +87,7 @@ class VectorStore:
         self.pc = Pinecone(api_key=config.PINECONE_API_KEY)
         self.index: Optional[pinecone.Index] = None
         self.encoding = tiktoken.encoding_for_model("gpt-4")
+        self.rate_limiter = get_rate_limiter(config.EMBEDDING_MODEL)
         
     def initialize_pinecone_index(self) -> None:
         """
@@ -66,6 +108,13 @@ class VectorStore:
             # Check if index exists
             if config.PINECONE_INDEX_NAME in [index.name for index in self.pc.list_indexes()]:
                 print(f"Connecting to existing index: {config.PINECONE_INDEX_NAME}")
+                index_dimension = self.pc.describe_index(config.PINECONE_INDEX_NAME).dimension
+                if index_dimension != config.EMBEDDING_DIMENSION:
+                    raise ValueError(
+                        f"Index {config.PINECONE_INDEX_NAME} stores {index_dimension}-dimension vectors but "
+                        f"EMBEDDING_DIMENSION is {config.EMBEDDING_DIMENSION}: use a new PINECONE_INDEX_NAME "
+                        f"and run setup again"
+                    )
                 self.index = self.pc.Index(config.PINECONE_INDEX_NAME)
             else:
                 print(f"Creating new index: {config.PINECONE_INDEX_NAME}")
@@ -91,7 +140,7 @@ class VectorStore:
             print(f"Error initializing Pinecone: {e}")
             raise
     
-    def generate_embedding(self, text: str) -> List[float]:
+    def generate_embedding(self, text: str, dimension: int = None) -> List[float]:
         """
         Generate embedding vector for text using OpenAI's embedding model.
         
@@ -100,6 +149,8 @@ class VectorStore:
         
         Args:
             text: Input text to generate embedding for
+            dimension: Dimension of the returned vector (config.EMBEDDING_DIMENSION
+                       by default; see reduce_embedding)
         
         Returns:
             List[float]: Embedding vector of configured dimension
@@ -114,110 +165,393 @@ class VectorStore:
         """
         try:
             # Ensure text length is within embedding model limits
-            tokens = self.encoding.encode(text)
+            with span("tokenize"):
+                tokens = self.encoding.encode(text)
             if len(tokens) > 8000:  # Conservative limit for embedding models
                 # Truncate to safe length and decode back to text
                 text = self.encoding.decode(tokens[:8000])
             
-            response = self.openai_client.embeddings.create(
-                model=config.EMBEDDING_MODEL,
-                input=text
-            )
-            return response.data[0].embedding
+            self.rate_limiter.acquire(min(len(tokens), 8000))
+            with span("embed"):
+                response = self.openai_client.embeddings.create(
+                    model=config.EMBEDDING_MODEL,
+                    input=text
+                )
+            return reduce_embedding(response.data[0].embedding, dimension)
         except Exception as e:
             print(f"Error generating embedding: {e}")
             raise
     
-    def batch_generate_embeddings(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
-        """Generate embeddings for multiple texts in batches"""
+    def batch_generate_embeddings(self, texts: List[str], batch_size: int = 100,
+                                  show_progress: bool = True, dimension: int = None) -> List[List[float]]:
+        """Generate embeddings for multiple texts in batches (reduced to dimension, see reduce_embedding)
+        
+        A failed batch is retried text by text. A text that still fails raises
+        instead of getting a placeholder vector: stored under its content-hash
+        ID, a placeholder would count as unchanged and never be embedded again.
+        """
+        dimension = config.EMBEDDING_DIMENSION if dimension is None else dimension
         embeddings = []
         
-        for i in tqdm(range(0, len(texts), batch_size), desc="Génération des embeddings"):
+        batch_starts = range(0, len(texts), batch_size)
+        if show_progress:
+            batch_starts = tqdm(batch_starts, desc="Génération des embeddings")
+        
+        for i in batch_starts:
             batch = texts[i:i + batch_size]
             
             try:
-                response = self.openai_client.embeddings.create(
-                    model=config.EMBEDDING_MODEL,
-                    input=batch
-                )
-                batch_embeddings = [item.embedding for item in response.data]
+                with span("tokenize"):
+                    batch_tokens = sum(len(self.encoding.encode(text)) for text in batch)
+                self.rate_limiter.acquire(batch_tokens)
+                with span("embed"):
+                    response = self.openai_client.embeddings.create(
+                        model=config.EMBEDDING_MODEL,
+                        input=batch
+                    )
+                batch_embeddings = [reduce_embedding(item.embedding, dimension) for item in response.data]
                 embeddings.extend(batch_embeddings)
                 
-                # Rate limiting - be nice to OpenAI
-                time.sleep(0.1)
-                
             except Exception as e:
                 print(f"Error in batch {i//batch_size}: {e}")
                 # Fall back to individual embeddings for this batch
                 for text in batch:
-                    try:
-                        embedding = self.generate_embedding(text)
-                        embeddings.append(embedding)
-                    except:
-                        # Skip problematic texts
-                        embeddings.append([0.0] * config.EMBEDDING_DIMENSION)
+                    embeddings.append(self.generate_embedding(text, dimension))
         
         return embeddings
     
-    def upload_chunks_to_pinecone(self, chunks: List[DocumentChunk]):
-        """Upload document chunks to Pinecone with embeddings"""
+    @staticmethod
+    def _chunk_vector(position: int, chunk: DocumentChunk, embedding: List[float]) -> Dict[str, Any]:
+        """Build the Pinecone record of a chunk"""
+        return {
+            'id': chunk.chunk_id,
+            'values': embedding,
+            'metadata': {
+                'text': chunk.text,
+                'source': chunk.source,
+                'sources': [chunk.source] + chunk.duplicate_sources,
+                'author': chunk.author,
+                'page_number': chunk.page_number,
+                'section': chunk.section,
+                'chunk_index': position
+            }
+        }
+    
+    def upload_chunks_to_pinecone(self, chunks: ChunkSequence, batch_size: int = 100,
+                                  positions: Optional[Sequence[int]] = None,
+                                  namespace: str = "") -> Tuple[int, List[int]]:
+        """Upload document chunks to Pinecone with embeddings
+        
+        Accepts a list of DocumentChunk or a ChunkStore. Chunks are embedded and
+        upserted batch by batch, so only one batch of texts and vectors is held
+        in memory at a time.
+        
+        Args:
+            chunks: Chunks to upload
+            batch_size: Number of chunks embedded and upserted per request
+            positions: Optional subset of chunk positions to upload (all by default)
+            namespace: Pinecone namespace receiving the vectors
+        
+        Returns:
+            Tuple[int, List[int]]: Number of vectors successfully upserted, and
+            positions of the chunks whose embedding or upsert failed
+        """
         if not self.index:
             self.initialize_pinecone_index()
         
-        print(f"Traitement de {len(chunks)} segments pour téléchargement...")
-        
-        # Prepare texts for embedding
-        texts = [chunk.text for chunk in chunks]
-        
-        # Generate embeddings in batches
-        embeddings = self.batch_generate_embeddings(texts)
-        
-        # Prepare vectors for upload
-        vectors = []
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            vector = {
-                'id': chunk.chunk_id,
-                'values': embedding,
-                'metadata': {
-                    'text': chunk.text,
-                    'source': chunk.source,
-                    'author': chunk.author,
-                    'page_number': chunk.page_number,
-                    'section': chunk.section,
-                    'chunk_index': i
-                }
-            }
-            vectors.append(vector)
+        if positions is None:
+            positions = range(len(chunks))
         
-        # Upload in batches to Pinecone
-        batch_size = 100
-        for i in tqdm(range(0, len(vectors), batch_size), desc="Téléchargement vers Pinecone"):
-            batch = vectors[i:i + batch_size]
+        print(f"Traitement de {len(positions)} segments pour téléchargement...")
+        
+        uploaded = 0
+        failed: List[int] = []
+        for start in tqdm(range(0, len(positions), batch_size), desc="Embeddings et téléchargement vers Pinecone"):
+            batch_positions = positions[start:start + batch_size]
+            batch_chunks = [chunks[i] for i in batch_positions]
+            
+            # Generate embeddings for this batch only
             try:
-                self.index.upsert(vectors=batch)
+                embeddings = self.batch_generate_embeddings(
+                    [chunk.text for chunk in batch_chunks], batch_size=batch_size, show_progress=False
+                )
+            except Exception as e:
+                print(f"Erreur lors des embeddings du lot {start//batch_size}: {e}")
+                failed.extend(batch_positions)
+                continue
+            
+            # Prepare vectors for upload
+            vectors = [
+                self._chunk_vector(position, chunk, embedding)
+                for position, chunk, embedding in zip(batch_positions, batch_chunks, embeddings)
+            ]
+            
+            try:
+                with span("upsert"):
+                    self.index.upsert(vectors=vectors, namespace=namespace)
+                uploaded += len(vectors)
                 time.sleep(0.1)  # Rate limiting
             except Exception as e:
-                print(f"Erreur lors du téléchargement du lot {i//batch_size}: {e}")
+                print(f"Erreur lors du téléchargement du lot {start//batch_size}: {e}")
+                failed.extend(batch_positions)
         
-        print(f"Téléchargement réussi de {len(vectors)} vecteurs vers Pinecone")
+        print(f"Téléchargement réussi de {uploaded} vecteurs vers Pinecone")
+        return uploaded, failed
     
-    def search(self, query: str, top_k: int = None) -> List[Dict[str, Any]]:
-        """Search for similar documents"""
+    def list_ids(self, prefix: str = None, namespace: str = "") -> Set[str]:
+        """List the IDs of all vectors of a namespace (only those starting with prefix, if given)"""
+        if not self.index:
+            self.initialize_pinecone_index()
+        
+        ids: Set[str] = set()
+        for id_page in self.index.list(prefix=prefix, namespace=namespace):
+            ids.update(id_page)
+        return ids
+    
+    def sync_chunks(self, chunks: ChunkSequence, batch_size: int = 100, namespace: str = "",
+                    keep_sources: Sequence[str] = ()) -> Dict[str, int]:
+        """
+        Bring the index in line with the given chunks, embedding only what changed.
+        
+        Chunk IDs are derived from the source document and a hash of the chunk
+        text (see pdf_processor.make_chunk_id). Every ID stored in the namespace
+        is listed: only chunks with a new ID are embedded and upserted, and every
+        stored ID that is not among the chunks is deleted (chunks of removed
+        documents, of documents collapsed by deduplication, or IDs in an older
+        format). Unchanged chunks cost nothing.
+        
+        Nothing is lost when a run goes wrong: the vectors of keep_sources
+        (documents that failed to parse) are kept, and so are the old vectors of
+        a document whose new chunks could not all be embedded and upserted.
+        The next sync retries the failed chunks.
+        
+        Args:
+            chunks: All current chunks of the namespace (the whole corpus: the
+                    vectors of documents missing from chunks are deleted)
+            batch_size: Number of chunks embedded and upserted per request
+            namespace: Pinecone namespace holding the vectors
+            keep_sources: Source documents whose vectors must not be deleted
+        
+        Returns:
+            Dict with counts of 'unchanged', 'upserted', 'deleted' and 'failed' vectors
+        """
+        to_upload, to_delete, unchanged = self._plan_sync(chunks, namespace, keep_sources)
+        
+        upserted, failed = self.upload_chunks_to_pinecone(chunks, batch_size, positions=to_upload,
+                                                          namespace=namespace) if to_upload else (0, [])
+        to_delete = self._spare_failed_documents(to_delete, [self._chunk_id(chunks, position) for position in failed])
+        deleted = self._delete_ids(to_delete, namespace)
+        
+        return {'unchanged': unchanged, 'upserted': upserted, 'deleted': deleted, 'failed': len(failed)}
+    
+    def sync_summaries(self, chunks: ChunkSequence, batch_size: int = 100,
+                       keep_sources: Sequence[str] = ()) -> Dict[str, int]:
+        """
+        Bring the document and section summaries in line with the given chunks.
+        
+        Summaries (see pdf_processor.summary_chunks) are stored in their own
+        namespace and synced like chunks: only the summaries of groups whose
+        chunks changed are embedded again.
+        
+        Returns:
+            Dict with counts of 'unchanged', 'upserted', 'deleted' and 'failed' summaries
+        """
+        return self.sync_chunks(summary_chunks(chunks), batch_size, namespace=SUMMARY_NAMESPACE,
+                                keep_sources=keep_sources)
+    
+    @staticmethod
+    def _chunk_id(chunks: ChunkSequence, position: int) -> str:
+        return chunks.chunk_id(position) if isinstance(chunks, ChunkStore) else chunks[position].chunk_id
+    
+    def _plan_sync(self, chunks: ChunkSequence, namespace: str = "",
+                   keep_sources: Sequence[str] = ()) -> Tuple[List[int], List[str], int]:
+        """Compare chunks with the index: (positions to upload, IDs to delete, unchanged count)
+        
+        IDs of keep_sources are never deleted.
+        """
+        if not self.index:
+            self.initialize_pinecone_index()
+        
+        # First position of each chunk ID (a duplicated text keeps its first position)
+        wanted: Dict[str, int] = {}
+        for position in range(len(chunks)):
+            wanted.setdefault(self._chunk_id(chunks, position), position)
+        
+        print(f"Comparaison avec l'index pour {len(wanted)} segments...")
+        existing = self.list_ids(namespace=namespace)
+        kept_prefixes = tuple(source_id_prefix(source) for source in keep_sources)
+        to_upload = sorted(position for chunk_id, position in wanted.items() if chunk_id not in existing)
+        to_delete = sorted(vector_id for vector_id in existing - wanted.keys()
+                           if not (kept_prefixes and vector_id.startswith(kept_prefixes)))
+        unchanged = len(existing & wanted.keys())
+        
+        print(f"   • Segments inchangés : {unchanged}")
+        print(f"   • Segments nouveaux ou modifiés : {len(to_upload)}")
+        print(f"   • Segments disparus : {len(to_delete)}")
+        return to_upload, to_delete, unchanged
+    
+    @staticmethod
+    def _spare_failed_documents(to_delete: List[str], failed_ids: List[str]) -> List[str]:
+        """Remove from to_delete the IDs of the documents that have failed chunks
+        
+        The old vectors of such a document stay until the next sync indexes
+        its new chunks, so a failed run never leaves a document unsearchable.
+        """
+        if not failed_ids:
+            return to_delete
+        failed_prefixes = tuple({chunk_id.split('#', 1)[0] + '#' for chunk_id in failed_ids})
+        kept = [vector_id for vector_id in to_delete if not vector_id.startswith(failed_prefixes)]
+        print(f"{len(failed_ids)} segments en échec : {len(to_delete) - len(kept)} anciens vecteurs de leurs documents conservés")
+        return kept
+    
+    def _delete_ids(self, to_delete: List[str], namespace: str = "") -> int:
+        """Delete vectors by ID, 1000 at a time"""
+        deleted = 0
+        for i in range(0, len(to_delete), 1000):
+            batch = to_delete[i:i + 1000]
+            try:
+                self.index.delete(ids=batch, namespace=namespace)
+                deleted += len(batch)
+            except Exception as e:
+                print(f"Erreur lors de la suppression du lot {i//1000}: {e}")
+        return deleted
+    
+    def prepare_embedding_job(self, chunks: ChunkSequence, job_dir: str, batch_size: int = 100,
+                              keep_sources: Sequence[str] = ()) -> int:
+        """
+        Write the embeddings needed to sync the index as an offline batch job.
+        
+        The index is compared with chunks exactly as in sync_chunks, but instead
+        of calling the embedding API, one request per batch of new or modified
+        chunks is written to job_dir/requests.jsonl (provider batch format).
+        The chunks are saved next to it as a ChunkStore, so the job can be
+        finished later with ingest_embedding_results, from another process.
+        
+        Args:
+            chunks: Current chunks of one or more documents
+            job_dir: Directory of the batch job (overwritten)
+            batch_size: Number of chunks per embedding request
+            keep_sources: Source documents whose vectors must not be deleted
+        
+        Returns:
+            int: Number of requests written
+        """
+        to_upload, to_delete, unchanged = self._plan_sync(chunks, keep_sources=keep_sources)
+        
+        store = chunks if isinstance(chunks, ChunkStore) else ChunkStore.from_chunks(chunks)
+        with BatchJob.create(job_dir, "embeddings", chunk_store="chunks.store", to_delete=to_delete,
+                             unchanged=unchanged, keep_sources=list(keep_sources)) as job:
+            store.save(os.path.join(job_dir, "chunks.store"))
+            for start in range(0, len(to_upload), batch_size):
+                positions = to_upload[start:start + batch_size]
+                texts = []
+                for position in positions:
+                    # Same truncation as generate_embedding
+                    tokens = self.encoding.encode(store.text(position))
+                    texts.append(self.encoding.decode(tokens[:8000]) if len(tokens) > 8000 else store.text(position))
+                job.add_request(f"embeddings-{start // batch_size}", EMBEDDINGS_URL,
+                                {'model': config.EMBEDDING_MODEL, 'input': texts}, positions=positions)
+        
+        print(f"{len(job)} embedding requests written to {job.requests_path}")
+        return len(job)
+    
+    def ingest_embedding_results(self, job_dir: str, results_paths: List[str],
+                                 batch_size: int = 100) -> Dict[str, int]:
+        """
+        Upsert the embeddings of a finished batch job and delete vanished chunks.
+        
+        Args:
+            job_dir: Directory of a job written by prepare_embedding_job
+            results_paths: Provider output file(s) of the batch
+            batch_size: Number of vectors per upsert request
+        
+        Returns:
+            Dict with counts of 'unchanged', 'upserted', 'deleted' and 'failed'
+            chunks (failed chunks are picked up by the next sync), and of
+            'summaries' re-embedded when HIERARCHICAL_SEARCH is on
+        """
+        if not self.index:
+            self.initialize_pinecone_index()
+        
+        job = BatchJob.open(job_dir, "embeddings")
+        results = read_batch_results(*results_paths)
+        store = ChunkStore.load(os.path.join(job_dir, job.manifest["chunk_store"]))
+        
+        vectors: List[Dict[str, Any]] = []
+        upserted = 0
+        failed_ids: List[str] = []
+        
+        def upsert(batch: List[Dict[str, Any]]) -> int:
+            count = self._upsert_batch(batch)
+            if not count:
+                failed_ids.extend(vector['id'] for vector in batch)
+            return count
+        
+        keep_sources = job.manifest.get("keep_sources", [])
+        try:
+            for custom_id, request in job.manifest["requests"].items():
+                result = results.get(custom_id)
+                if result is None or result["error"]:
+                    failed_ids.extend(store.chunk_id(position) for position in request["positions"])
+                    continue
+                data = sorted(result["body"]["data"], key=lambda item: item["index"])
+                for position, item in zip(request["positions"], data):
+                    vectors.append(self._chunk_vector(position, store[position], reduce_embedding(item["embedding"])))
+                
+                while len(vectors) >= batch_size:
+                    upserted += upsert(vectors[:batch_size])
+                    vectors = vectors[batch_size:]
+            if vectors:
+                upserted += upsert(vectors)
+            if config.HIERARCHICAL_SEARCH:
+                # A few embeddings per document: computed directly rather than through the batch job
+                summaries = self.sync_summaries(store, keep_sources=keep_sources)['upserted']
+            else:
+                summaries = 0
+        finally:
+            store.close()
+        
+        deleted = self._delete_ids(self._spare_failed_documents(job.manifest["to_delete"], failed_ids))
+        if failed_ids:
+            print(f"{len(failed_ids)} chunks were not indexed; they will be retried by the next sync")
+        return {'unchanged': job.manifest["unchanged"], 'upserted': upserted, 'deleted': deleted,
+                'failed': len(failed_ids), 'summaries': summaries}
+    
+    def _upsert_batch(self, vectors: List[Dict[str, Any]]) -> int:
+        try:
+            with span("upsert"):
+                self.index.upsert(vectors=vectors)
+            return len(vectors)
+        except Exception as e:
+            print(f"Erreur lors du téléchargement d'un lot : {e}")
+            return 0
+    
+    def search(self, query: str, top_k: int = None, hierarchical: bool = None) -> List[Dict[str, Any]]:
+        """Search for similar documents
+        
+        With hierarchical search (config.HIERARCHICAL_SEARCH by default), the
+        query first selects the documents and sections whose summaries match it
+        best, and only their chunks are searched (see _coarse_filter).
+        """
         if not self.index:
             self.initialize_pinecone_index()
         
         if top_k is None:
             top_k = config.TOP_K_RESULTS
+        if hierarchical is None:
+            hierarchical = config.HIERARCHICAL_SEARCH
         
         try:
             # Generate embedding for query
             query_embedding = self.generate_embedding(query)
+            query_filter = self._coarse_filter(query_embedding) if hierarchical else None
             
             # Search Pinecone
             results = self.index.query(
                 vector=query_embedding,
                 top_k=top_k,
-                include_metadata=True
+                include_metadata=True,
+                filter=query_filter
             )
             
             # Format results
@@ -229,6 +563,7 @@ class VectorStore:
                     'author': match['metadata']['author'],
                     'page_number': match['metadata']['page_number'],
                     'section': match['metadata']['section'],
+                    'sources': match['metadata'].get('sources', [match['metadata']['source']]),
                     'score': match['score']
                 }
                 formatted_results.append(result)
@@ -239,6 +574,36 @@ class VectorStore:
             print(f"Error searching: {e}")
             return []
     
+    def _coarse_filter(self, query_embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """
+        Metadata filter restricting a chunk search to the best matching groups.
+        
+        The summaries namespace is searched with the query embedding; each of
+        the HIERARCHICAL_TOP_GROUPS matches keeps the chunks of its document
+        (document summary) or of its section (section summary). Documents are
+        matched on the 'sources' list so chunks merged by deduplication stay
+        reachable from every document containing them.
+        
+        Returns:
+            A Pinecone filter, or None (flat search) when no summary is indexed
+        """
+        with span("coarse_search"):
+            results = self.index.query(
+                vector=query_embedding,
+                top_k=config.HIERARCHICAL_TOP_GROUPS,
+                include_metadata=True,
+                namespace=SUMMARY_NAMESPACE
+            )
+        
+        clauses = []
+        for match in results['matches']:
+            clause = {'sources': {'$in': [match['metadata']['source']]}}
+            if match['metadata']['section']:
+                clause['section'] = {'$eq': match['metadata']['section']}
+            clauses.append(clause)
+        
+        return {'$or': clauses} if clauses else None
+    
     def delete_all_vectors(self):
         """Delete all vectors from the index (use with caution!)"""
         if not self.index:
@@ -246,6 +611,10 @@ class VectorStore:
         
         try:
             self.index.delete(delete_all=True)
+            try:
+                self.index.delete(delete_all=True, namespace=SUMMARY_NAMESPACE)
+            except Exception:
+                pass  # No summaries indexed
             print("All vectors deleted from index")
         except Exception as e:
             print(f"Error deleting vectors: {e}")